@@ -1,10 +1,56 @@
 #ici , on initialise l'application
+import os
 from flask import Flask
 
+def start_background_services(app):
+    """
+    Démarre les services en arrière-plan du processus courant (collecteur de données de marché).
+
+    Appelée après le fork de chaque worker (voir gunicorn.conf.py) ou, à défaut, à la
+    première requête : les threads ne survivent pas à un fork, ils ne doivent donc pas
+    être démarrés dans le processus maître qui précharge l'application.
+    """
+    # Sans effet si les services tournent déjà dans ce processus
+    for name in ("market_data_poller", "alert_watcher"):
+        service = app.extensions.get(name)
+        if service is not None:
+            service.start()
+    app.extensions["background_services_pid"] = os.getpid()
+
 def create_app():
     app =Flask(__name__)
 
-    from .routes import main
+    from .routes import main, limiter
+    from .utils.ratelimit import RATELIMIT_STORAGE_URI
+    from .utils import http_cache, instrumentation
+    instrumentation.init_app(app)
+    http_cache.init_app(app)
     app.register_blueprint(main)
-    
-    return app
\ No newline at end of file
+    # Limites communes à tous les workers de la machine (voir app/utils/ratelimit.py)
+    app.config.setdefault("RATELIMIT_STORAGE_URI", RATELIMIT_STORAGE_URI)
+    limiter.init_app(app)
+
+    # Entraînement hors ligne du modèle : `flask --app run train-lstm`
+    from .models.train import train_lstm_command
+    app.cli.add_command(train_lstm_command)
+
+    # Collecte des données de marché en arrière-plan (une seule par machine, voir app/utils/poller.py)
+    poller_enabled = os.getenv("POLLER_ENABLED", "0") == "1"
+    # Le flux /stream/prices n'a rien à diffuser sans collecteur : les pages ne l'ouvrent pas
+    app.config.setdefault("STREAM_ENABLED", poller_enabled)
+    if poller_enabled:
+        from .utils.poller import MarketDataPoller
+        app.extensions["market_data_poller"] = MarketDataPoller()
+    else:
+        # Sans collecteur, les alertes de prix sont évaluées par un surveillant périodique
+        from .utils.alerts import AlertWatcher
+        app.extensions["alert_watcher"] = AlertWatcher()
+
+    @app.before_request
+    def start_background_services_once():
+        # Repli pour `flask run` et run.py : sous gunicorn, post_worker_init a déjà démarré les
+        # services de ce processus et la vérification se réduit à comparer un pid
+        if app.extensions.get("background_services_pid") != os.getpid():
+            start_background_services(app)
+
+    return app
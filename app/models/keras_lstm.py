@@ -0,0 +1,56 @@
+import numpy as np
+
+
+class KerasForecaster:
+    """
+    Enveloppe un modèle Keras et exécute le déroulement autorégressif complet
+    (toutes les étapes de l'horizon) en un seul appel de graphe compilé.
+    """
+
+    def __init__(self, model):
+        import tensorflow as tf
+
+        self.model = model
+        self.lookback = int(model.input_shape[1])
+
+        @tf.function(reduce_retracing=True)
+        def rollout(window, horizon):
+            # `horizon` est un entier Python : la boucle est déroulée dans le graphe,
+            # qui est tracé une fois par horizon distinct puis réutilisé.
+            predictions = []
+            for _ in range(horizon):
+                prediction = model(window, training=False)
+                predictions.append(prediction)
+                window = tf.concat([window[:, 1:, :], prediction[:, None, :]], axis=1)
+            return tf.concat(predictions, axis=1)
+
+        self._rollout = rollout
+
+    def rollout(self, window, horizon=5):
+        """
+        Prédit les `horizon` prochaines valeurs en réinjectant chaque prédiction dans la fenêtre.
+
+        Paramètres:
+            window (np.ndarray): Fenêtres normalisées de forme (n, lookback, 1).
+            horizon (int): Nombre de pas à prédire.
+
+        Retourne:
+            np.ndarray: Prédictions normalisées de forme (n, horizon).
+        """
+        window = np.asarray(window, dtype=np.float32)
+        return self._rollout(window, int(horizon)).numpy()
+
+
+def load_keras_forecaster(model_path):
+    """
+    Charge un modèle Keras depuis le disque (sans recompiler l'optimiseur, inutile en inférence).
+
+    Paramètres:
+        model_path (str): Chemin du fichier du modèle.
+
+    Retourne:
+        KerasForecaster: Le modèle chargé, prêt pour le déroulement compilé.
+    """
+    import tensorflow as tf
+
+    return KerasForecaster(tf.keras.models.load_model(model_path, compile=False))
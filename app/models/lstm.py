@@ -1,10 +1,18 @@
-import tensorflow as tf
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
-from app.utils.scraper2 import get_stock_data
-from datetime import datetime, timedelta
 import os
+from app.utils.cache import TTLCache
+from app.utils.instrumentation import span
+from app.utils.quotes import UPSTREAM_TIMEOUT, run_concurrently
+from app.utils.scraper2 import get_recent_closes
+from app.models.registry import get_model_registry
+from datetime import datetime, timedelta
+
+# Le déroulement est calculé une fois sur l'horizon maximal : les horizons plus courts en sont des préfixes
+MAX_HORIZON = 30
+# Une prédiction ne dépend que des clôtures et du modèle, qui font partie de la clé : l'entrée ne devient pas fausse
+prediction_cache = TTLCache(ttl=float(os.getenv("PREDICTION_CACHE_TTL", "86400")),
+                            maxsize=int(os.getenv("PREDICTION_CACHE_SIZE", "64")), name="predictions")
 
 def get_next_prediction_dates(num_days=5):
     """
@@ -18,76 +26,225 @@ def get_next_prediction_dates(num_days=5):
     """
     return [(datetime.now() + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(1, num_days + 1)]
 
-def predict_lstm(model_path="lstm_model.h5"):
+def prediction_chart(recent_closes, predicted_prices):
+    """
+    Données du graphique de prédiction : les 5 dernières clôtures, suivies des prédictions.
+
+    Paramètres:
+        recent_closes (dict): Clôtures récentes ({"dates": [...], "prices": [...]}).
+        predicted_prices (list): Les prix prédits.
+
+    Retourne:
+        dict: {"dates": [...], "actualPrices": [...], "predictions": [...]}.
+    """
+    # Combiner les dates historiques, la date d'aujourd'hui, et les dates de prédictions
+    historical_dates = [(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(5, 0, -1)]
+    today_date = datetime.now().strftime("%Y-%m-%d")
+    return {
+        "dates": historical_dates + [today_date] + get_next_prediction_dates(len(predicted_prices)),
+        "actualPrices": recent_closes["prices"][-5:],
+        "predictions": predicted_prices,
+    }
+
+def model_path_for(stock_symbol, model_path="lstm_model.h5"):
+    """
+    Retourne le modèle propre au symbole (`lstm_model_<SYMBOLE>.h5`) s'il existe, sinon le modèle partagé.
+    """
+    root, ext = os.path.splitext(model_path)
+    candidate = f"{root}_{stock_symbol}{ext}"
+    return candidate if os.path.exists(candidate) else model_path
+
+
+def forecast_batch(forecaster, series, horizon=MAX_HORIZON):
+    """
+    Prédit les prochains cours de clôture de plusieurs séries en un seul déroulement.
+
+    Chaque série est normalisée entre 0 et 1 avec son propre minimum et maximum
+    (équivalent d'un MinMaxScaler par symbole), puis les dernières fenêtres sont
+    empilées en un tenseur (N, lookback, 1) passé une seule fois au modèle.
+
+    Paramètres:
+        forecaster: Le modèle chargé (voir `app.models.registry`).
+        series (list): Les clôtures récentes de chaque symbole, de la plus ancienne à la plus récente.
+        horizon (int): Nombre de jours à prédire.
+
+    Retourne:
+        list: Pour chaque série, la liste des prix prédits.
+
+    Raises:
+        ValueError: Si une série n'a pas assez de clôtures.
+    """
+    if any(len(prices) < 10 for prices in series):
+        raise ValueError("Pas assez de données pour effectuer une prédiction. Veuillez vérifier les données.")
+
+    # Normalisation par série, sur tout l'historique récent
+    lows = np.array([min(prices) for prices in series], dtype=np.float64)[:, None]
+    spans = np.array([max(prices) for prices in series], dtype=np.float64)[:, None] - lows
+    spans[spans == 0] = 1.0
+    windows = np.array([prices[-forecaster.lookback:] for prices in series], dtype=np.float64)
+    windows = (windows - lows) / spans
+
+    # Déroulement autorégressif de toutes les fenêtres en un seul appel
+    with span("forecast.rollout"):
+        predictions = forecaster.rollout(windows[:, :, None], horizon)
+
+    # Transformation inverse pour obtenir les prix réels
+    return (np.asarray(predictions, dtype=np.float64) * spans + lows).tolist()
+
+
+def forecast(forecaster, prices, horizon=MAX_HORIZON):
+    """
+    Prédit les prochains cours de clôture à partir des clôtures récentes d'un symbole.
+
+    Paramètres:
+        forecaster: Le modèle chargé (voir `app.models.registry`).
+        prices (list): Les clôtures récentes, de la plus ancienne à la plus récente.
+        horizon (int): Nombre de jours à prédire.
+
+    Retourne:
+        list: Les prix prédits.
+
+    Raises:
+        ValueError: S'il n'y a pas assez de clôtures.
+    """
+    return forecast_batch(forecaster, [prices], horizon)[0]
+
+
+def prediction_key(stock_symbol, recent_closes, model_version):
+    """
+    Clé d'une prédiction : symbole, dernière barre (date et clôture) et version du modèle.
+
+    La clôture fait partie de la clé car la barre du jour évolue pendant la séance ;
+    après la clôture, la clé ne change plus jusqu'à la barre suivante.
+    """
+    return (stock_symbol, recent_closes["dates"][-1], recent_closes["prices"][-1], model_version)
+
+
+def get_forecast(stock_symbol, recent_closes, horizon=5, model_path="lstm_model.h5", precomputed=None):
     """
-    Prédit les prix futurs d'une action (AAPL dans cet exemple) pour les 5 prochains jours
+    Retourne les prix prédits, depuis la prédiction précalculée par le collecteur si elle
+    correspond encore aux données et au modèle, sinon depuis le cache du processus.
+
+    Paramètres:
+        stock_symbol (str): Le symbole boursier.
+        recent_closes (dict): {"dates": [...], "prices": [...]} (voir `get_recent_closes`).
+        horizon (int): Nombre de jours à prédire (au plus MAX_HORIZON).
+        model_path (str): Chemin du modèle LSTM entraîné hors ligne.
+        precomputed (dict): Prédiction publiée dans l'instantané ({"key": [...], "predictions": [...]}).
+
+    Retourne:
+        list: Les `horizon` prix prédits.
+
+    Raises:
+        ModelNotAvailableError: Si aucun modèle n'a été entraîné et publié.
+    """
+    # Échoue immédiatement si aucun artefact n'est publié
+    with span("predict.model"):
+        handle = get_model_registry(model_path_for(stock_symbol, model_path)).get()
+    if not recent_closes["prices"]:
+        raise ValueError("Pas assez de données pour effectuer une prédiction. Veuillez vérifier les données.")
+    key = prediction_key(stock_symbol, recent_closes, handle.version)
+    if precomputed and tuple(precomputed.get("key", ())) == key:
+        return precomputed["predictions"][:horizon]
+    # Un échec de cache sous charge ne déclenche qu'un seul calcul pour la clé
+    with span("predict.forecast"):
+        predictions = prediction_cache.get(key, lambda: forecast(handle.model, recent_closes["prices"], MAX_HORIZON))
+    return predictions[:horizon]
+
+
+def predict_lstm_batch(stock_symbols, horizon=5, model_path="lstm_model.h5", recent_closes=None, precomputed=None):
+    """
+    Prédit les prix futurs de plusieurs symboles, avec un seul appel au modèle par
+    modèle distinct (en général le modèle partagé, donc un seul pour toute la liste).
+
+    Les prédictions déjà en cache (ou précalculées par le collecteur) sont réutilisées ;
+    seules les autres sont calculées, en lot.
+
+    Paramètres:
+        stock_symbols (list): Les symboles boursiers.
+        horizon (int): Nombre de jours à prédire (au plus MAX_HORIZON).
+        model_path (str): Chemin du modèle partagé.
+        recent_closes (dict): {symbole: clôtures récentes} déjà disponibles (instantané du collecteur).
+        precomputed (dict): {symbole: prédiction publiée dans l'instantané}.
+
+    Retourne:
+        dict: {"dates": [...], "predictions": {symbole: [...]}, "errors": {symbole: message}}.
+
+    Raises:
+        ModelNotAvailableError: Si le modèle d'un symbole n'a pas été entraîné et publié.
+    """
+    recent_closes = {symbol: closes for symbol, closes in (recent_closes or {}).items() if closes}
+    precomputed = precomputed or {}
+    missing = [symbol for symbol in stock_symbols if symbol not in recent_closes]
+    if missing:
+        # Clôtures absentes de l'instantané : lues en parallèle depuis le stockage local
+        recent_closes.update(run_concurrently(get_recent_closes, missing, timeout=UPSTREAM_TIMEOUT * 2))
+
+    predictions, errors, pending = {}, {}, {}
+    for symbol in stock_symbols:
+        closes = recent_closes.get(symbol)
+        if closes is None:
+            errors[symbol] = "Données indisponibles."
+            continue
+        if len(closes["prices"]) < 10:
+            errors[symbol] = "Pas assez de données pour effectuer une prédiction."
+            continue
+        path = model_path_for(symbol, model_path)
+        handle = get_model_registry(path).get()
+        key = prediction_key(symbol, closes, handle.version)
+        known = precomputed.get(symbol)
+        if known and tuple(known.get("key", ())) == key:
+            predictions[symbol] = known["predictions"][:horizon]
+            continue
+        cached = prediction_cache.peek(key)
+        if cached is not None:
+            predictions[symbol] = cached[:horizon]
+            continue
+        # Regroupement par modèle : un seul déroulement par modèle distinct
+        pending.setdefault(path, (handle, []))[1].append((symbol, key))
+
+    for handle, batch in pending.values():
+        series = [recent_closes[symbol]["prices"] for symbol, _ in batch]
+        for (symbol, key), values in zip(batch, forecast_batch(handle.model, series, MAX_HORIZON)):
+            prediction_cache.put(key, values)
+            predictions[symbol] = values[:horizon]
+
+    return {
+        "dates": get_next_prediction_dates(horizon),
+        "predictions": {symbol: predictions[symbol] for symbol in stock_symbols if symbol in predictions},
+        "errors": errors,
+    }
+
+
+def predict_lstm(model_path="lstm_model.h5", horizon=5, stock_symbol="AAPL"):
+    """
+    Prédit les prix futurs d'une action (AAPL dans cet exemple) pour les prochains jours
     en utilisant un modèle LSTM.
 
     Paramètres:
-        model_path (str): Chemin pour sauvegarder ou charger le modèle LSTM.
-    
+        model_path (str): Chemin du modèle LSTM entraîné hors ligne.
+        horizon (int): Nombre de jours à prédire (par défaut 5).
+        stock_symbol (str): Le symbole boursier.
+
     Retourne:
         dict: Un dictionnaire contenant les dates de prédiction et les prix prédits.
+
+    Raises:
+        ModelNotAvailableError: Si aucun modèle n'a été entraîné et publié.
     """
-    # Étape 1 : Récupération des données boursières
-    data = get_stock_data("AAPL")
-    if len(data) < 10:
-        raise ValueError("Pas assez de données pour entraîner le modèle. Veuillez vérifier les données.")
-
-    # Étape 2 : Normalisation des données avec MinMaxScaler
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    data = scaler.fit_transform(np.array(data).reshape(-1, 1))
-
-    # Étape 3 : Préparation des données pour l'entrée du modèle LSTM
-    X_train = []
-    y_train = []
-    for i in range(5, len(data)):
-        X_train.append(data[i-5:i, 0])  # 5 jours précédents
-        y_train.append(data[i, 0])     # Prix du jour actuel
-    
-    X_train = np.array(X_train)
-    y_train = np.array(y_train)
-    X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))  # Reshape pour LSTM
-
-    # Étape 4 : Vérification si un modèle pré-entraîné existe
-    if os.path.exists(model_path):
-        print(f"Loading model from {model_path}")
-        model = tf.keras.models.load_model(model_path)
-    else:
-        # Construction et entraînement du modèle si aucun modèle sauvegardé
-        model = tf.keras.Sequential([
-            tf.keras.layers.LSTM(50, return_sequences=True, input_shape=(X_train.shape[1], 1)),
-            tf.keras.layers.LSTM(50),
-            tf.keras.layers.Dense(1)
-        ])
-        model.compile(optimizer="adam", loss="mean_squared_error")
-
-        print("Training the model...")
-        model.fit(X_train, y_train, epochs=50, batch_size=32, verbose=1)
-        
-        # Sauvegarde du modèle après l'entraînement
-        print(f"Saving model to {model_path}")
-        model.save(model_path)
-
-    # Étape 5 : Préparation des données pour la prédiction
-    last_5_days = data[-5:].reshape(1, 5, 1)  # Les 5 derniers jours pour prédire le futur
-    predictions = []
-
-    # Génération des prédictions pour les 5 prochains jours
-    for _ in range(5):
-        prediction = model.predict(last_5_days, verbose=0)
-        predictions.append(prediction[0, 0])
-        # Met à jour les 5 derniers jours avec la nouvelle prédiction
-        last_5_days = np.append(last_5_days[:, 1:, :], [[[prediction[0, 0]]]], axis=1)
-
-    # Étape 6 : Transformation inverse pour obtenir les prix réels
-    predicted_prices = scaler.inverse_transform(np.array(predictions).reshape(-1, 1)).flatten()
-
-    # Étape 7 : Génération des dates correspondantes
-    prediction_dates = get_next_prediction_dates()
-
-    # Étape 8 : Retour des résultats sous forme de dictionnaire
+    # Étape 1 : Vérification du modèle partagé par le worker (entraîné hors ligne par `flask train-lstm`),
+    # avant tout téléchargement
+    get_model_registry(model_path).get()
+
+    # Étape 2 : Récupération des clôtures récentes
+    with span("predict.closes"):
+        recent_closes = get_recent_closes(stock_symbol)
+
+    # Étape 3 : Prédiction, mémoïsée sur la dernière barre et la version du modèle
+    predicted_prices = get_forecast(stock_symbol, recent_closes, horizon, model_path)
+
+    # Étape 4 : Retour des résultats avec les dates correspondantes
     return {
-        "predictions": predicted_prices.tolist(),
-        "dates": prediction_dates
+        "predictions": predicted_prices,
+        "dates": get_next_prediction_dates(horizon)
     }
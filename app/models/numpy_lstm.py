@@ -0,0 +1,172 @@
+import json
+
+import numpy as np
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "tanh": np.tanh,
+    "sigmoid": _sigmoid,
+    "relu": lambda x: np.maximum(x, 0.0),
+}
+
+
+class LSTMLayer:
+    """
+    Couche LSTM Keras (ordre des portes i, f, c, o) évaluée en NumPy.
+    """
+
+    def __init__(self, kernel, recurrent_kernel, bias, activation="tanh",
+                 recurrent_activation="sigmoid", return_sequences=False):
+        self.kernel = kernel
+        self.recurrent_kernel = recurrent_kernel
+        self.bias = bias
+        self.units = recurrent_kernel.shape[0]
+        self.activation = ACTIVATIONS[activation]
+        self.recurrent_activation = ACTIVATIONS[recurrent_activation]
+        self.return_sequences = return_sequences
+
+    def __call__(self, x):
+        n, timesteps, _ = x.shape
+        units = self.units
+        # Projection des entrées calculée pour tous les pas de temps en une seule multiplication
+        x_proj = x @ self.kernel + self.bias
+        h = np.zeros((n, units), dtype=x.dtype)
+        c = np.zeros((n, units), dtype=x.dtype)
+        outputs = []
+        for t in range(timesteps):
+            z = x_proj[:, t] + h @ self.recurrent_kernel
+            i = self.recurrent_activation(z[:, :units])
+            f = self.recurrent_activation(z[:, units:2 * units])
+            g = self.activation(z[:, 2 * units:3 * units])
+            o = self.recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * self.activation(c)
+            if self.return_sequences:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if self.return_sequences else h
+
+
+class DenseLayer:
+    """
+    Couche Dense Keras évaluée en NumPy.
+    """
+
+    def __init__(self, kernel, bias, activation="linear"):
+        self.kernel = kernel
+        self.bias = bias
+        self.activation = ACTIVATIONS[activation]
+
+    def __call__(self, x):
+        return self.activation(x @ self.kernel + self.bias)
+
+
+class NumpyLSTM:
+    """
+    Moteur d'inférence NumPy pour le modèle séquentiel LSTM de l'application.
+
+    Les poids sont lus directement dans le fichier .h5 via h5py : les workers web
+    n'ont pas besoin d'importer TensorFlow pour servir les prédictions.
+    """
+
+    def __init__(self, layers, lookback):
+        self.layers = layers
+        self.lookback = lookback
+
+    @classmethod
+    def from_h5(cls, model_path):
+        """
+        Construit le moteur à partir d'un modèle Keras sauvegardé au format .h5.
+
+        Paramètres:
+            model_path (str): Chemin du fichier .h5.
+
+        Retourne:
+            NumpyLSTM: Le moteur prêt pour l'inférence.
+
+        Raises:
+            ValueError: Si le modèle contient une couche non prise en charge.
+        """
+        import h5py
+
+        with h5py.File(model_path, "r") as f:
+            config = json.loads(f.attrs["model_config"])
+            weights_group = f["model_weights"] if "model_weights" in f else f
+            layers = []
+            lookback = None
+            for layer in config["config"]["layers"]:
+                class_name = layer["class_name"]
+                layer_config = layer["config"]
+                if class_name == "InputLayer":
+                    shape = layer_config.get("batch_shape") or layer_config.get("batch_input_shape")
+                    lookback = shape[1]
+                    continue
+                if lookback is None and "batch_input_shape" in layer_config:
+                    lookback = layer_config["batch_input_shape"][1]
+
+                group = weights_group[layer_config["name"]]
+                weights = [np.asarray(group[name], dtype=np.float32) for name in group.attrs["weight_names"]]
+                if class_name == "LSTM":
+                    layers.append(LSTMLayer(
+                        *weights,
+                        activation=layer_config["activation"],
+                        recurrent_activation=layer_config["recurrent_activation"],
+                        return_sequences=layer_config["return_sequences"],
+                    ))
+                elif class_name == "Dense":
+                    layers.append(DenseLayer(*weights, activation=layer_config["activation"]))
+                else:
+                    raise ValueError(f"Couche non prise en charge par le moteur NumPy : {class_name}")
+        return cls(layers, lookback)
+
+    def predict(self, x):
+        """
+        Passe avant du réseau.
+
+        Paramètres:
+            x (np.ndarray): Fenêtres de forme (n, lookback, 1).
+
+        Retourne:
+            np.ndarray: Prédictions de forme (n, 1).
+        """
+        x = np.asarray(x, dtype=np.float32)
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+    def rollout(self, window, horizon=5):
+        """
+        Prédit les `horizon` prochaines valeurs en réinjectant chaque prédiction dans la fenêtre.
+
+        Paramètres:
+            window (np.ndarray): Fenêtres normalisées de forme (n, lookback, 1).
+            horizon (int): Nombre de pas à prédire.
+
+        Retourne:
+            np.ndarray: Prédictions normalisées de forme (n, horizon).
+        """
+        window = np.asarray(window, dtype=np.float32)
+        n, lookback, _ = window.shape
+        # Tampon unique : la fenêtre glisse par vue au lieu d'être reconstruite à chaque pas
+        buffer = np.empty((n, lookback + horizon, 1), dtype=np.float32)
+        buffer[:, :lookback] = window
+        for step in range(horizon):
+            buffer[:, lookback + step] = self.predict(buffer[:, step:step + lookback])
+        return buffer[:, lookback:, 0]
+
+
+def load_numpy_forecaster(model_path):
+    """
+    Charge le modèle pour l'inférence NumPy (sans TensorFlow).
+
+    Paramètres:
+        model_path (str): Chemin du fichier du modèle.
+
+    Retourne:
+        NumpyLSTM: Le moteur chargé.
+    """
+    return NumpyLSTM.from_h5(model_path)
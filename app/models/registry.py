@@ -0,0 +1,226 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.models.keras_lstm import load_keras_forecaster
+from app.models.numpy_lstm import load_numpy_forecaster
+from app.utils.instrumentation import span
+
+# Moteurs d'inférence disponibles, sélectionnés par la variable d'environnement MODEL_BACKEND.
+# Le moteur NumPy (par défaut) évite d'importer TensorFlow dans les workers web.
+LOADERS = {
+    "numpy": load_numpy_forecaster,
+    "keras": load_keras_forecaster,
+}
+
+# Nombre de chargements tentés si le fichier du modèle change pendant le chargement
+LOAD_ATTEMPTS = 3
+
+
+def warm_forecaster(forecaster, horizon=5):
+    """
+    Exécute une prédiction à blanc pour préparer le chemin d'inférence avant la première requête.
+    """
+    forecaster.rollout(np.zeros((1, forecaster.lookback, 1), dtype=np.float32), horizon)
+
+
+def file_version(model_path):
+    """
+    Calcule une version courte du modèle à partir du contenu du fichier.
+
+    Paramètres:
+        model_path (str): Chemin du fichier du modèle.
+
+    Retourne:
+        str: Les 12 premiers caractères du SHA-256 du fichier.
+    """
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def read_model_metadata(model_path):
+    """
+    Lit le fichier de métadonnées publié à côté du modèle par le pipeline d'entraînement.
+
+    Paramètres:
+        model_path (str): Chemin du fichier du modèle.
+
+    Retourne:
+        dict: Les métadonnées, ou un dictionnaire vide si le fichier est absent ou illisible.
+    """
+    metadata_path = os.path.splitext(model_path)[0] + ".json"
+    try:
+        with open(metadata_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class ModelNotAvailableError(RuntimeError):
+    """
+    Levée lorsqu'aucun artefact de modèle n'est disponible pour l'inférence.
+    """
+
+
+class ModelHandle:
+    """
+    Instantané immuable d'un modèle chargé. Les requêtes en cours conservent leur handle
+    même si le registre bascule vers un nouvel artefact entre-temps.
+    """
+
+    __slots__ = ("model", "version", "path", "signature", "loaded_at", "load_seconds", "metadata")
+
+    def __init__(self, model, version, path, signature, loaded_at, load_seconds, metadata=None):
+        self.model = model
+        self.version = version
+        self.path = path
+        self.signature = signature
+        self.loaded_at = loaded_at
+        self.load_seconds = load_seconds
+        self.metadata = metadata or {}
+
+
+class ModelRegistry:
+    """
+    Registre de modèle partagé par tous les threads d'un worker.
+
+    Le modèle est chargé et préchauffé une seule fois, puis rechargé à chaud lorsque le
+    fichier change sur le disque. Le nouveau modèle est chargé à côté de l'ancien et
+    publié par une simple affectation : aucune requête en cours n'est interrompue.
+    """
+
+    def __init__(self, model_path, loader=None, warmer=warm_forecaster, check_interval=5.0):
+        self.model_path = model_path
+        self.loader = loader or LOADERS[os.getenv("MODEL_BACKEND", "numpy")]
+        self.warmer = warmer
+        self.check_interval = check_interval
+        self._handle = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.last_error = None
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.model_path)
+        except FileNotFoundError:
+            raise ModelNotAvailableError(
+                f"Aucun modèle disponible à {self.model_path}. Lancez `flask train-lstm` pour en entraîner un."
+            )
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, signature):
+        # Le fichier peut être remplacé pendant le chargement : sa version est calculée avant,
+        # puis vérifiée après, pour ne jamais associer les anciens poids à la nouvelle version
+        for _ in range(LOAD_ATTEMPTS):
+            version = file_version(self.model_path)
+            start = time.perf_counter()
+            model = self.loader(self.model_path)
+            if self.warmer is not None:
+                self.warmer(model)
+            load_seconds = time.perf_counter() - start
+
+            current = self._signature()
+            if current == signature and file_version(self.model_path) == version:
+                break
+            logging.warning(f"Modèle {self.model_path} remplacé pendant son chargement, nouvel essai")
+            signature = current
+        else:
+            raise RuntimeError(f"Le modèle {self.model_path} change en continu pendant son chargement")
+
+        # La version publiée par l'entraînement n'est retenue que si elle décrit bien ce fichier
+        metadata = read_model_metadata(self.model_path)
+        if metadata.get("sha256") == version:
+            version = metadata.get("version", version)
+        else:
+            metadata = {}
+
+        handle = ModelHandle(
+            model=model,
+            version=version,
+            path=self.model_path,
+            signature=signature,
+            loaded_at=datetime.now().isoformat(timespec="seconds"),
+            load_seconds=load_seconds,
+            metadata=metadata,
+        )
+        self.loads += 1
+        logging.info(f"Modèle {self.model_path} chargé (version {handle.version}) en {load_seconds:.3f}s")
+        return handle
+
+    def _refresh(self):
+        with self._lock:
+            # Un autre thread a peut-être déjà vérifié pendant l'attente du verrou
+            if self._handle is not None and time.monotonic() - self._last_check < self.check_interval:
+                return
+            try:
+                signature = self._signature()
+                if self._handle is None or signature != self._handle.signature:
+                    with span("model.load"):
+                        self._handle = self._load(signature)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                if self._handle is None:
+                    raise
+                # On continue à servir l'ancien modèle si le nouvel artefact est illisible
+                logging.error(f"Échec du rechargement du modèle {self.model_path} : {e}")
+            finally:
+                self._last_check = time.monotonic()
+
+    def get(self):
+        """
+        Retourne le handle du modèle actif, en le (re)chargeant si nécessaire.
+
+        Retourne:
+            ModelHandle: Le modèle actif et ses métadonnées.
+        """
+        if self._handle is None or time.monotonic() - self._last_check >= self.check_interval:
+            self._refresh()
+        return self._handle
+
+    def stats(self):
+        """
+        Retourne les informations du modèle actif (version, temps de chargement, etc.).
+        """
+        handle = self._handle
+        return {
+            "path": self.model_path,
+            "loaded": handle is not None,
+            "version": handle.version if handle else None,
+            "loaded_at": handle.loaded_at if handle else None,
+            "load_seconds": handle.load_seconds if handle else None,
+            "loads": self.loads,
+            "last_error": self.last_error,
+            "metadata": handle.metadata if handle else {},
+        }
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_model_registry(model_path="lstm_model.h5"):
+    """
+    Retourne le registre du processus associé au chemin donné (créé au premier appel).
+
+    Paramètres:
+        model_path (str): Chemin du fichier du modèle.
+
+    Retourne:
+        ModelRegistry: Le registre partagé pour ce chemin.
+    """
+    registry = _registries.get(model_path)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.setdefault(model_path, ModelRegistry(model_path))
+    return registry
@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+
+import click
+import numpy as np
+
+from app.models.registry import file_version
+
+LOOKBACK = 5
+
+
+def build_training_set(prices, lookback=LOOKBACK):
+    """
+    Normalise les prix et construit les fenêtres glissantes d'entraînement.
+
+    Paramètres:
+        prices (list): Prix de clôture, du plus ancien au plus récent.
+        lookback (int): Nombre de jours utilisés pour prédire le jour suivant.
+
+    Retourne:
+        tuple: (X_train de forme (n, lookback, 1), y_train de forme (n,), scaler ajusté).
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    data = scaler.fit_transform(np.array(prices).reshape(-1, 1))
+
+    # Fenêtres glissantes : les `lookback` jours précédents -> le prix du jour
+    windows = np.lib.stride_tricks.sliding_window_view(data[:, 0], lookback)[:-1]
+    X_train = windows.reshape(-1, lookback, 1)
+    y_train = data[lookback:, 0]
+    return X_train, y_train, scaler
+
+
+def build_model(lookback=LOOKBACK):
+    """
+    Construit le réseau LSTM à deux couches utilisé par l'application.
+    """
+    import tensorflow as tf
+
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(lookback, 1)),
+        tf.keras.layers.LSTM(50, return_sequences=True),
+        tf.keras.layers.LSTM(50),
+        tf.keras.layers.Dense(1)
+    ])
+    model.compile(optimizer="adam", loss="mean_squared_error")
+    return model
+
+
+def _atomic_copy(src, dst):
+    """Copie `src` vers `dst` via un fichier temporaire pour que les lecteurs ne voient jamais un fichier partiel."""
+    tmp = f"{dst}.tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def train_lstm(stock_symbol="AAPL", period="3mo", epochs=50, batch_size=32,
+               artifacts_dir="models", model_path="lstm_model.h5", publish=True):
+    """
+    Entraîne le modèle LSTM hors du chemin des requêtes et enregistre un artefact versionné.
+
+    L'artefact `<artifacts_dir>/lstm-<horodatage>.h5` est accompagné d'un fichier JSON de
+    métadonnées (fenêtre d'entraînement, perte, date). Si `publish` est vrai, il est ensuite
+    copié de façon atomique vers `model_path`, que le registre des workers recharge à chaud.
+
+    Paramètres:
+        stock_symbol (str): Le symbole boursier utilisé pour l'entraînement.
+        period (str): Profondeur d'historique téléchargée (ex. : '3mo', '5y').
+        epochs (int): Nombre d'époques d'entraînement.
+        batch_size (int): Taille des lots.
+        artifacts_dir (str): Répertoire des artefacts versionnés.
+        model_path (str): Chemin du modèle servi par l'application.
+        publish (bool): Publie l'artefact vers `model_path` après l'entraînement.
+
+    Retourne:
+        dict: Les métadonnées de l'artefact produit.
+    """
+    # Étape 1 : Récupération de l'historique
+    import yfinance as yf
+
+    history = yf.Ticker(stock_symbol).history(period=period)
+    if len(history) < 2 * LOOKBACK:
+        raise ValueError("Pas assez de données pour entraîner le modèle. Veuillez vérifier les données.")
+    prices = history['Close'].tolist()
+
+    # Étape 2 : Préparation des données et entraînement
+    X_train, y_train, _ = build_training_set(prices)
+    model = build_model()
+    logging.info(f"Entraînement du modèle sur {len(X_train)} fenêtres ({stock_symbol}, {period})...")
+    fit = model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, verbose=0)
+
+    # Étape 3 : Sauvegarde de l'artefact versionné et de ses métadonnées
+    trained_at = datetime.now()
+    version = f"lstm-{trained_at.strftime('%Y%m%dT%H%M%S')}"
+    os.makedirs(artifacts_dir, exist_ok=True)
+    artifact_path = os.path.join(artifacts_dir, f"{version}.h5")
+    model.save(artifact_path)
+
+    metadata = {
+        "version": version,
+        "sha256": file_version(artifact_path),
+        "stock_symbol": stock_symbol,
+        "period": period,
+        "training_start": history.index[0].strftime('%Y-%m-%d'),
+        "training_end": history.index[-1].strftime('%Y-%m-%d'),
+        "samples": int(len(X_train)),
+        "lookback": LOOKBACK,
+        "epochs": epochs,
+        "loss": float(fit.history["loss"][-1]),
+        "trained_at": trained_at.isoformat(timespec="seconds"),
+    }
+    metadata_path = os.path.join(artifacts_dir, f"{version}.json")
+    with open(metadata_path, "w") as f:
+        json.dump(metadata, f, indent=2)
+    logging.info(f"Artefact {artifact_path} enregistré (perte finale {metadata['loss']:.6f})")
+
+    # Étape 4 : Publication vers le modèle servi (métadonnées d'abord, puis le modèle)
+    if publish:
+        _atomic_copy(metadata_path, os.path.splitext(model_path)[0] + ".json")
+        _atomic_copy(artifact_path, model_path)
+        logging.info(f"Modèle {version} publié vers {model_path}")
+
+    return metadata
+
+
+@click.command("train-lstm")
+@click.option("--symbol", default="AAPL", show_default=True, help="Symbole boursier utilisé pour l'entraînement.")
+@click.option("--period", default="3mo", show_default=True, help="Profondeur d'historique (ex. : 3mo, 5y).")
+@click.option("--epochs", default=50, show_default=True, help="Nombre d'époques.")
+@click.option("--batch-size", default=32, show_default=True, help="Taille des lots.")
+@click.option("--artifacts-dir", default="models", show_default=True, help="Répertoire des artefacts versionnés.")
+@click.option("--model-path", default="lstm_model.h5", show_default=True, help="Modèle servi par l'application.")
+@click.option("--no-publish", is_flag=True, help="N'écrase pas le modèle servi.")
+def train_lstm_command(symbol, period, epochs, batch_size, artifacts_dir, model_path, no_publish):
+    """Entraîne le modèle LSTM et enregistre un artefact versionné."""
+    metadata = train_lstm(symbol, period=period, epochs=epochs, batch_size=batch_size,
+                          artifacts_dir=artifacts_dir, model_path=model_path, publish=not no_publish)
+    click.echo(json.dumps(metadata, indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    train_lstm_command()
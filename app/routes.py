@@ -1,109 +1,44 @@
-from flask import Flask, Blueprint, jsonify, render_template, redirect, url_for, request, session
+from flask import Blueprint, Response, current_app, jsonify, render_template, redirect, url_for, request, session
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from app.utils.scraper import get_stock_data
-from app.models.lstm import predict_lstm
-from pydantic import BaseModel
+from app.utils.scraper import get_price_history, get_chart_history, CHART_INTERVALS
+from app.utils.scraper2 import get_recent_closes
+from app.models.lstm import get_forecast, prediction_chart, predict_lstm_batch, MAX_HORIZON
+from app.models.registry import get_model_registry, ModelNotAvailableError
 from app.utils.metrics import get_financial_metrics
+from app.utils.cache import cache_stats
+from app.utils.singleflight import flight_stats
+from app.utils.instrumentation import span, render_metrics
+from app.utils.aggregation import prices_by_year, FREQUENCIES, REDUCTIONS
+from app.utils.poller import get_snapshot
+from app.utils.alerts import Alert, get_alert_engine
+from app.utils.firebase_auth import get_token_verifier
+from app.utils.quotes import get_watchlist_quotes, submit, result_or_default, WATCHLIST, UPSTREAM_TIMEOUT
+from app.utils.news import get_news_cache, NEWS_FIELDS, DEFAULT_NEWS_FIELDS
+from app.utils.stream import get_price_broadcaster, StreamFullError
+from app.utils.http_cache import conditional_json
 from flask_pydantic import validate
-import yfinance as yf
-import pyrebase
-import smtplib
-from email.mime.text import MIMEText
+import threading
 from dotenv import load_dotenv
 import os
 import logging
-from collections import defaultdict
-from datetime import datetime, timedelta
-from firebase_admin import auth
-import yfinance as yf
-
-import yfinance as yf
-from datetime import datetime
-import logging
-
-import yfinance as yf
-from datetime import datetime
-import logging
+from datetime import datetime, timezone
 
 import pandas as pd
 
-def get_historical_data(stock_symbol="AAPL", start_date="2020-01-01", end_date=None):
-    """
-    Fetch historical stock data (dates and actual prices) for a given stock symbol.
-    Args:
-        stock_symbol (str): The stock ticker symbol (e.g., 'AAPL').
-        start_date (str): The start date for the data in the format 'YYYY-MM-DD'.
-        end_date (str): The end date for the data in the format 'YYYY-MM-DD'. Defaults to today if not provided.
-
-    Returns:
-        dict: A dictionary containing 'dates' and 'actualPrices'.
-    """
-    try:
-        # Default to today's date if end_date is not provided
-        if end_date is None:
-            end_date = datetime.now().strftime('%Y-%m-%d')
-        
-        # Fetch historical data using Yahoo Finance
-        data = yf.download(stock_symbol, start=start_date, end=end_date, progress=False)
-
-        # Log the raw data for debugging
-        logging.debug(f"Données récupérées pour {stock_symbol} :\n{data.head()}")
-
-        # Vérifiez si les données sont vides
-        if data.empty:
-            logging.error(f"Aucune donnée disponible pour {stock_symbol} entre {start_date} et {end_date}.")
-            return {
-                "dates": [],
-                "actualPrices": []
-            }
-
-        # Aplatir les colonnes si elles sont multi-indexées
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = [' '.join(col).strip() for col in data.columns]
-            logging.debug(f"Colonnes après aplatissement : {data.columns}")
-
-        # Vérifiez si la colonne 'Close' existe
-        if 'Close' not in data.columns:
-            logging.error(f"La colonne 'Close' est introuvable dans les données pour {stock_symbol}.")
-            return {
-                "dates": [],
-                "actualPrices": []
-            }
-
-        # Extract dates and closing prices
-        dates = list(data.index.strftime('%Y-%m-%d'))  # Format index and convert to a list
-        actual_prices = data['Close'].tolist()  # Convert 'Close' column to a list
-        
-        return {
-            "dates": dates,
-            "actualPrices": actual_prices
-        }
-    except Exception as e:
-        logging.error(f"Erreur lors de la récupération des données historiques : {e}")
-        return {
-            "dates": [],
-            "actualPrices": []
-        }
-
 # ========================= CONFIGURATION =========================
 
 # Configuration du système de logs pour capturer les erreurs
 logging.basicConfig(level=logging.ERROR)
 
-# Initialisation de l'application Flask et du middleware de limitation de débit (rate limiting)
-app = Flask(__name__)
-limiter = Limiter(get_remote_address, app=app)
+# Middleware de limitation de débit (rate limiting), rattaché à l'application dans `create_app`
+limiter = Limiter(get_remote_address)
 main = Blueprint("main", __name__)
 
 # Chargement des variables d'environnement depuis un fichier .env
 load_dotenv()
 
-# Lecture des variables sensibles pour l'envoi d'e-mails
-SMTP_SERVER = os.getenv("SMTP_SERVER")
-SMTP_PORT = os.getenv("SMTP_PORT")
-SMTP_EMAIL = os.getenv("SMTP_EMAIL")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+# Les variables SMTP sont lues par la file d'envoi des alertes (voir app/utils/mailer.py)
 
 firebaseConfig = {
     "apiKey": os.getenv("FIREBASE_API_KEY"),
@@ -116,8 +51,23 @@ firebaseConfig = {
     "databaseURL": "https://apple-stock-prediction-default-rtdb.firebaseio.com/"
 }
 
-firebase = pyrebase.initialize_app(firebaseConfig)
-auth = firebase.auth()
+_firebase_auth = None
+_firebase_lock = threading.Lock()
+
+
+def get_firebase_auth():
+    """
+    Retourne le client d'authentification Firebase (pyrebase), initialisé à la première utilisation :
+    l'import du module ne charge ni pyrebase ni ses dépendances.
+    """
+    global _firebase_auth
+    if _firebase_auth is None:
+        with _firebase_lock:
+            if _firebase_auth is None:
+                import pyrebase
+
+                _firebase_auth = pyrebase.initialize_app(firebaseConfig).auth()
+    return _firebase_auth
 
 
 # Vérification de la présence des variables d'environnement obligatoires
@@ -131,10 +81,11 @@ if missing_vars:
 def create_user_and_update(email, password):
     try:
         # Créer l'utilisateur
-        user = auth.create_user(
-            email=email,
-            password=password
-        )
+        with span("firebase.create_user"):
+            user = get_firebase_auth().create_user(
+                email=email,
+                password=password
+            )
         user_id = user.uid
 
         # Définir le displayName (par exemple, l'email sans le domaine)
@@ -145,6 +96,41 @@ def create_user_and_update(email, password):
     except Exception as e:
         print(f"Erreur lors de la création ou mise à jour du compte : {e}")
         return None
+def snapshot_value(stock_symbol, key):
+    """
+    Lit une valeur de l'instantané du collecteur (None si l'instantané est absent, trop ancien ou incomplet).
+    """
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return None
+    return snapshot["symbols"].get(stock_symbol, {}).get(key)
+
+
+def cached_news(stock_symbol):
+    """
+    Retourne le cache d'actualités à jour pour un symbole : les actualités publiées par le collecteur
+    y sont fusionnées, sinon Yahoo n'est interrogé que si les dernières sont trop anciennes.
+    """
+    cache = get_news_cache()
+    snapshot = get_snapshot()
+    if snapshot is not None and stock_symbol in snapshot["news"]:
+        cache.merge(stock_symbol, snapshot["news"][stock_symbol])
+    else:
+        cache.refresh(stock_symbol)
+    return cache
+
+
+def latest_news(stock_symbol, limit=5):
+    """
+    Retourne les dernières actualités d'un symbole (tous les champs, pour l'affichage),
+    ou une liste vide si elles sont indisponibles.
+    """
+    try:
+        return cached_news(stock_symbol).latest(stock_symbol, limit)
+    except Exception as e:
+        logging.error(f"Actualités {stock_symbol} indisponibles : {e}")
+        return []
+
 # Décorateur pour enregistrer le filtre `datetimeformat` sur l'application Flask
 # Enregistrement d'un filtre Jinja pour formater les timestamps
 def datetimeformat(value):
@@ -153,46 +139,8 @@ def datetimeformat(value):
     """
     return datetime.utcfromtimestamp(value).strftime('%Y-%m-%d %H:%M:%S')
 
-# Enregistrement du filtre `datetimeformat` dans l'application Flask
-app.jinja_env.filters['datetimeformat'] = datetimeformat
-def format_prices_with_month(prices_data, year=None, start_date="2024-01-01"):
-    month_prices = defaultdict(list)  # Dictionnaire pour regrouper les prix par mois
-
-    # Vérifie si les données contiennent des dates associées aux prix
-    if all(isinstance(price, dict) for price in prices_data):
-        for price in prices_data:
-            date_str = price.get('date')
-            price_value = price.get('price')
-            if date_str and price_value:
-                date = datetime.strptime(date_str, "%Y-%m-%d")
-                if not year or date.year == int(year):
-                    month_prices[date.month].append(price_value)
-            else:
-                logging.error(f"Format inattendu pour les données de prix : {price}")
-    elif all(isinstance(price, (int, float)) for price in prices_data):
-        logging.warning("Données sans date détectées, création de dates artificielles.")
-        current_date = datetime.strptime(start_date, "%Y-%m-%d")
-        for price in prices_data:
-            month_prices[current_date.month].append(price)
-            current_date += timedelta(days=1)
-    else:
-        logging.error("Format des données de prix non reconnu.")
-        return []
-
-    # Génère les données formatées en choisissant le dernier prix pour chaque mois
-    formatted_data = []
-    for month in range(1, 13):
-        if month_prices[month]:
-            month_price = month_prices[month][-1]
-            month_name = datetime(year=int(year), month=month, day=1).strftime('%B')
-            formatted_data.append({
-                "année": year,
-                "date": f"{year}-{str(month).zfill(2)}-01",
-                "mois": month_name,
-                "prix": month_price
-            })
-
-    return formatted_data
+# Enregistrement du filtre `datetimeformat` dans l'application qui enregistre le blueprint
+main.add_app_template_filter(datetimeformat, 'datetimeformat')
 # ========================= ROUTES =========================
 
 @main.route('/financial-metrics/<string:stock_symbol>', methods=['GET'])
@@ -203,41 +151,44 @@ def financial_metrics(stock_symbol):
     except RuntimeError as e:
         logging.error(f"Erreur lors de la récupération des métriques pour {stock_symbol} : {e}")
         return jsonify({"error": str(e)}), 500
-class Alert(BaseModel):
-    """
-    Modèle de données pour gérer les alertes via Pydantic.
-    """
-    email: str
-    price: float
 
+@main.route('/metrics', methods=['GET'])
+def metrics():
+    """Métriques du worker au format texte de Prometheus (durées par étape et par route, caches, envois)."""
+    return Response(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
-def send_email_alert(email: str, price: float):
-    try:
-        msg = MIMEText(f"Le prix de l'action Apple a atteint votre seuil : ${price}")
-        msg['Subject'] = 'Alerte de prix !'
-        msg['From'] = SMTP_EMAIL
-        msg['To'] = email
-
-        with smtplib.SMTP(SMTP_SERVER, int(SMTP_PORT)) as server:
-            server.starttls()
-            server.login(SMTP_EMAIL, SMTP_PASSWORD)
-            server.sendmail(SMTP_EMAIL, email, msg.as_string())
-    except Exception as e:
-        logging.error(f"Échec de l'envoi de l'e-mail à {email} : {e}")
+
+@main.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Compteurs des caches du worker (succès, échecs, rafraîchissements) et des appels regroupés."""
+    return jsonify({**cache_stats(), "coalescing": flight_stats(), "news": get_news_cache().stats()}), 200
 
 
 @main.route('/set-alert/', methods=['POST'])
 @validate()
 @limiter.limit("10 per minute")
-def set_alert(alert: Alert):
-    send_email_alert(alert.email, alert.price)
-    return jsonify({"message": "Alerte configurée avec succès !"}), 200
+def set_alert(body: Alert):
+    alert = body
+    alert.symbol = alert.symbol.upper()
+
+    # Le prix actuel détermine le sens de l'alerte (franchissement à la hausse ou à la baisse)
+    current_price = snapshot_value(alert.symbol, "price")
+    if current_price is None:
+        current_price = get_watchlist_quotes([alert.symbol], timeout=UPSTREAM_TIMEOUT).get(alert.symbol)
+    if current_price is None:
+        return jsonify({"error": f"Prix actuel indisponible pour {alert.symbol}."}), 503
+
+    # L'alerte est enregistrée ; elle sera évaluée à chaque nouveau cours par le collecteur,
+    # ou périodiquement par le surveillant d'alertes s'il est désactivé (voir create_app)
+    alert_id, direction = get_alert_engine().add(alert, current_price)
+    return jsonify({"message": "Alerte configurée avec succès !", "id": alert_id, "direction": direction}), 202
 
 
 def send_password_reset_email(email):
     """Envoie un e-mail pour réinitialiser le mot de passe."""
     try:
-        auth.send_password_reset_email(email)
+        with span("firebase.password_reset"):
+            get_firebase_auth().send_password_reset_email(email)
         logging.info(f"Un e-mail de réinitialisation de mot de passe a été envoyé à {email}")
     except Exception as e:
         logging.error(f"Erreur lors de l'envoi de l'e-mail de réinitialisation : {e}")
@@ -253,7 +204,8 @@ def register():
         password = request.form.get('password')
         try:
             # Création de l'utilisateur
-            user = auth.create_user_with_email_and_password(email, password)
+            with span("firebase.create_user"):
+                user = get_firebase_auth().create_user_with_email_and_password(email, password)
             user_id = user['localId']
 
             # Définir le displayName (par exemple, l'email sans le domaine)
@@ -287,12 +239,13 @@ def login():
         password = request.form.get('password')
         try:
             # Connexion de l'utilisateur
-            user = auth.sign_in_with_email_and_password(email, password)
+            with span("firebase.sign_in"):
+                user = get_firebase_auth().sign_in_with_email_and_password(email, password)
             user_id_token = user['idToken']
 
-            # Récupérer les informations de l'utilisateur
-            user_info = auth.get_account_info(user_id_token)
-            user_name = user_info['users'][0].get('displayName', email.split('@')[0])  # Utiliser l'email si displayName est absent
+            # Vérification locale de l'idToken (aucun appel supplémentaire à Firebase)
+            claims = get_token_verifier().verify(user_id_token)
+            user_name = claims.get('name') or email.split('@')[0]  # Utiliser l'email si le nom est absent
 
             # Stocker le nom dans la session
             session['user'] = user_name
@@ -341,7 +294,8 @@ def reset_password():
     if request.method == 'POST':
         email = request.form.get('email')
         try:
-            auth.send_password_reset_email(email)
+            with span("firebase.password_reset"):
+                get_firebase_auth().send_password_reset_email(email)
             return render_template('reset_password.html', success="Un e-mail de réinitialisation a été envoyé à votre adresse e-mail.")
         except Exception as e:
             logging.error(f"Erreur lors de la réinitialisation du mot de passe : {e}")
@@ -358,9 +312,9 @@ def home():
             return redirect(url_for('main.login'))  # Redirigez si l'utilisateur n'est pas connecté
 
         try:
-            # Appelez Firebase pour obtenir les informations utilisateur
-            user_info = auth.get_account_info(user_id_token)
-            user_name = user_info['users'][0].get('displayName', 'Utilisateur')  # Utilisez un nom par défaut si displayName est absent
+            # Vérifiez l'idToken localement (certificats et revendications en cache, aucun appel réseau)
+            claims = get_token_verifier().verify(user_id_token)
+            user_name = claims.get('name') or 'Utilisateur'  # Utilisez un nom par défaut si le nom est absent
             
             # Stockez le nom de l'utilisateur dans la session
             session['user'] = user_name
@@ -368,10 +322,12 @@ def home():
             logging.error(f"Erreur lors de la récupération des informations utilisateur : {e}")
             return redirect(url_for('main.login'))  # Redirigez si l'idToken est invalide ou expiré
 
-    # Afficher la page d'accueil avec des métriques
+    # Afficher la page d'accueil avec des métriques (instantané du collecteur si disponible)
     stock_symbol = "AAPL"
     try:
-        previous_day_metrics = get_financial_metrics(stock_symbol)
+        previous_day_metrics = snapshot_value(stock_symbol, "metrics")
+        if previous_day_metrics is None:
+            previous_day_metrics = get_financial_metrics(stock_symbol)
         return render_template('index.html', stock_symbol=stock_symbol,
                                previous_day_metrics=previous_day_metrics or {},
                                user=session['user'])
@@ -382,131 +338,289 @@ def home():
                                error="Impossible de récupérer les métriques.",
                                user=session['user'])
 
+def parse_years(value, max_years=10):
+    """
+    Lit la liste d'années du paramètre `years` (ex. : '2021,2022,2023').
+    Par défaut : l'année en cours et les trois précédentes.
+
+    Raises:
+        ValueError: Si une année est invalide ou si la liste est trop longue.
+    """
+    current_year = datetime.now().year
+    if not value:
+        return list(range(current_year - 3, current_year + 1))
+    years = sorted({int(year) for year in value.split(",") if year.strip()})
+    if not years or len(years) > max_years or years[0] < 1980 or years[-1] > current_year:
+        raise ValueError(f"Liste d'années invalide : {value}")
+    return years
+
+
+def parse_symbols(value, max_symbols=20):
+    """
+    Lit une liste de symboles ('AAPL,MSFT' ou liste JSON). Par défaut : la liste de suivi.
+
+    Raises:
+        ValueError: Si un symbole est invalide ou si la liste est trop longue.
+    """
+    if not value:
+        return list(WATCHLIST)
+    items = value.split(",") if isinstance(value, str) else value
+    symbols = list(dict.fromkeys(str(symbol).strip().upper() for symbol in items if str(symbol).strip()))
+    if not symbols or len(symbols) > max_symbols or \
+            not all(len(symbol) <= 10 and symbol.replace(".", "").replace("-", "").isalnum() for symbol in symbols):
+        raise ValueError(f"Liste de symboles invalide : {value}")
+    return symbols
+
+
+def parse_horizon(value, default=5):
+    """
+    Lit l'horizon de prédiction (nombre de séances). Par défaut : 5.
+
+    Raises:
+        ValueError: Si l'horizon n'est pas un entier entre 1 et MAX_HORIZON.
+    """
+    if value is None:
+        return default
+    horizon = int(value) if isinstance(value, str) and value.strip().lstrip("-").isdigit() else value
+    if not isinstance(horizon, int) or isinstance(horizon, bool) or not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"Horizon invalide : {value} (entier entre 1 et {MAX_HORIZON})")
+    return horizon
+
+
 @main.route('/stock-data', methods=['GET'])
 def stock_data():
+    stock_symbol = request.args.get("symbol", "AAPL").upper()
+    freq = request.args.get("freq", "M")
+    how = request.args.get("how", "last")
+    try:
+        years = parse_years(request.args.get("years"))
+        if freq not in FREQUENCIES or how not in REDUCTIONS:
+            raise ValueError(f"Agrégation non prise en charge : freq={freq}, how={how}")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
-        stock_symbol = "AAPL"
-        previous_years = [
-            {"start_date": "2021-01-01", "end_date": "2021-12-31"},
-            {"start_date": "2022-01-01", "end_date": "2022-12-31"},
-            {"start_date": "2023-01-01", "end_date": "2023-12-31"},
-        ]
-
-        # Collecte des prix pour les années précédentes
-        previous_year_prices = {}
-        for year in previous_years:
-            try:
-                data = get_stock_data(stock_symbol, start_date=year["start_date"], end_date=year["end_date"], interval="1d")
-                if isinstance(data, dict) and "recent_prices" in data:
-                    year_label = year["start_date"][:4]
-                    previous_year_prices[year_label] = format_prices_with_month(data["recent_prices"], year=year_label)
-                else:
-                    raise ValueError(f"Format inattendu pour {year['start_date'][:4]}")
-            except Exception as e:
-                logging.error(f"Erreur pour {year['start_date'][:4]} : {e}")
-                previous_year_prices[year["start_date"][:4]] = []
-
-        # Collecte des prix pour l'année actuelle
-        current_year_start = "2024-01-01"
-        current_year_end = datetime.now().strftime('%Y-%m-%d')
-        current_year_prices = format_prices_with_month(
-            get_stock_data(stock_symbol, start_date=current_year_start, end_date=current_year_end)["recent_prices"], year="2024"
-        )
-
-        # Prix du jour actuel
-        today_price = get_stock_data(stock_symbol, period="1d", interval="1d")["recent_prices"][-1]
-
-        return jsonify({
-            "stock_symbol": stock_symbol,
-            "2021_prices": previous_year_prices.get("2021", []),
-            "2022_prices": previous_year_prices.get("2022", []),
-            "2023_prices": previous_year_prices.get("2023", []),
-            "2024_prices": current_year_prices,
-            "today_price": today_price
-        }), 200
+        # Une seule lecture couvrant toutes les années demandées, découpée ensuite en mémoire
+        history = get_price_history(stock_symbol, start_date=f"{years[0]}-01-01")
+        closes = history["Close"]
+
+        # Dernier cours de clôture de chaque mois (par défaut), calculé en une passe vectorisée
+        response = {"stock_symbol": stock_symbol, "today_price": float(closes.iloc[-1])}
+        for year, records in prices_by_year(closes, years, freq=freq, how=how).items():
+            response[f"{year}_prices"] = records
+        # Revalidable : ETag du contenu et date de la dernière barre
+        return conditional_json(response, last_modified=closes.index[-1].to_pydatetime())
     except Exception as e:
         logging.error(f"Erreur lors de la récupération des données boursières : {e}")
         return jsonify({"error": str(e)}), 500
 
 
+@main.route('/history/<string:stock_symbol>', methods=['GET'])
+def history(stock_symbol):
+    """
+    Clôtures d'un symbole pour les graphiques (`?start=2020-01-01&end=2025-01-01&interval=1d&max_points=500`),
+    réduites côté serveur par LTTB : un graphique sur cinq ans reçoit environ 500 points au lieu
+    de plus de 1 200, avec la même allure.
+    """
+    stock_symbol = stock_symbol.upper()
+    start_date = request.args.get("start")
+    end_date = request.args.get("end")
+    interval = request.args.get("interval", "1d")
+    try:
+        for value in (start_date, end_date):
+            if value:
+                datetime.strptime(value, '%Y-%m-%d')
+        if start_date and end_date and start_date >= end_date:
+            raise ValueError(f"Plage de dates vide : {start_date} - {end_date}")
+        if interval not in CHART_INTERVALS:
+            raise ValueError(f"Intervalle non pris en charge : {interval}")
+        max_points = int(request.args.get("max_points", 500))
+        if not 3 <= max_points <= 5000:
+            raise ValueError(f"Nombre de points invalide : {max_points} (entre 3 et 5000)")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        series = get_chart_history(stock_symbol, start_date, end_date, interval, max_points)
+    except Exception as e:
+        logging.error(f"Erreur lors de la récupération de l'historique de {stock_symbol} : {e}")
+        return jsonify({"error": str(e)}), 500
+
+    response = {"stock_symbol": stock_symbol, "interval": interval, **series}
+    # Revalidable : la date de la dernière barre sert de Last-Modified (ETag seul si la plage est vide)
+    last_modified = pd.Timestamp(series["dates"][-1]).to_pydatetime() if series["dates"] else None
+    return conditional_json(response, last_modified=last_modified)
+
+
+def prediction_response():
+    """
+    Données du graphique de prédiction d'AAPL (clôtures récentes et prédictions), revalidables par ETag.
+    """
+    try:
+        # Horizon configurable, borné pour limiter le coût
+        horizon = parse_horizon(request.args.get("horizon"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        # Une seule lecture des clôtures récentes (instantané du collecteur, sinon stockage local),
+        # partagée par les cours affichés et la prédiction
+        recent_closes = snapshot_value("AAPL", "recent_closes") or get_recent_closes("AAPL")
+
+        # Obtenir les prédictions : précalculées par le collecteur après la clôture,
+        # sinon mémoïsées sur la dernière barre et la version du modèle
+        predicted_prices = get_forecast("AAPL", recent_closes, horizon,
+                                        precomputed=snapshot_value("AAPL", "prediction"))
+
+        return conditional_json(prediction_chart(recent_closes, predicted_prices),
+                                last_modified=pd.Timestamp(recent_closes["dates"][-1]).to_pydatetime())
+
+    except ModelNotAvailableError as e:
+        logging.error(f"Modèle indisponible : {e}")
+        return jsonify({"error": "Le modèle de prédiction n'est pas disponible."}), 503
+    except Exception as e:
+        logging.error(f"Erreur lors de la génération des prédictions : {e}")
+        return jsonify({"error": "Une erreur est survenue."}), 500
+
+
 @main.route('/prediction', methods=['GET', 'POST'])
 def prediction():
     if request.method == "GET":
         return render_template("prediction.html")
     elif request.method == "POST":
-        try:
-            # Récupérer les données historiques (5 jours précédents)
-            historical_data = get_stock_data(stock_symbol="AAPL", period="5d", interval="1d")
-            actual_prices = historical_data["recent_prices"]
+        return prediction_response()
 
-            # Ajouter le prix d'aujourd'hui s'il n'est pas déjà dans `actualPrices`
-            today_data = get_stock_data(stock_symbol="AAPL", period="1d", interval="1d")
-            today_price = today_data["recent_prices"][-1]  # Dernier prix du jour actuel
 
-            # Vérifiez si le dernier prix historique est différent du prix d'aujourd'hui
-            if actual_prices[-1] != today_price:
-                actual_prices.append(today_price)  # Ajoute uniquement si nécessaire
+@main.get('/prediction/chart')
+def prediction_chart_data():
+    """
+    Variante GET de POST /prediction, utilisée par la page : le navigateur revalide sa copie
+    avec If-None-Match et reçoit une 304 sans corps tant que la dernière barre et le modèle
+    n'ont pas changé (les réponses aux POST ne sont jamais revalidées).
+    """
+    return prediction_response()
 
-            # Obtenir les prédictions
-            prediction = predict_lstm()
-            predicted_prices = prediction["predictions"]
-            prediction_dates = prediction["dates"]
 
-            # Combiner les dates historiques, la date d'aujourd'hui, et les dates de prédictions
-            historical_dates = [(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(5, 0, -1)]
-            today_date = datetime.now().strftime("%Y-%m-%d")
+@main.route('/prediction/batch', methods=['GET', 'POST'])
+def prediction_batch():
+    """
+    Prédictions de plusieurs symboles en une réponse (`?symbols=AAPL,MSFT&horizon=5`,
+    ou corps JSON {"symbols": [...], "horizon": 5}). Le modèle n'est appelé qu'une fois
+    pour tous les symboles qui partagent le même modèle.
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        symbols = parse_symbols(body.get("symbols") or request.args.get("symbols"))
+        horizon = body.get("horizon")
+        horizon = parse_horizon(request.args.get("horizon") if horizon is None else horizon)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Clôtures et prédictions précalculées disponibles dans l'instantané du collecteur
+    snapshot = get_snapshot()
+    published = snapshot["symbols"] if snapshot is not None else {}
+    recent_closes = {symbol: published.get(symbol, {}).get("recent_closes") for symbol in symbols}
+    precomputed = {symbol: published.get(symbol, {}).get("prediction") for symbol in symbols}
+    try:
+        result = predict_lstm_batch(symbols, horizon, recent_closes=recent_closes, precomputed=precomputed)
+        return conditional_json(result)
+    except ModelNotAvailableError as e:
+        logging.error(f"Modèle indisponible : {e}")
+        return jsonify({"error": "Le modèle de prédiction n'est pas disponible."}), 503
+    except Exception as e:
+        logging.error(f"Erreur lors de la génération des prédictions groupées : {e}")
+        return jsonify({"error": "Une erreur est survenue."}), 500
+
 
-            # Évitez les doublons dans les dates
-            combined_dates = historical_dates + [today_date] + prediction_dates
+@main.route('/stream/prices', methods=['GET'])
+def stream_prices():
+    """
+    Flux Server-Sent Events des prix et des prédictions, alimenté par l'instantané du collecteur
+    (POLLER_ENABLED=1). Le nombre de flux par worker est borné (STREAM_MAX_SUBSCRIBERS) ; pour des
+    milliers de connexions, utiliser des workers gevent (voir gunicorn.conf.py).
 
-            response_data = {
-                "dates": combined_dates,
-                "actualPrices": actual_prices,
-                "predictions": predicted_prices,
-            }
+    Une réponse 503 ferme l'EventSource sans reconnexion : la page interroge alors le serveur périodiquement.
+    """
+    if not current_app.config.get("STREAM_ENABLED"):
+        return jsonify({"error": "Flux indisponible : le collecteur de données de marché est désactivé."}), 503
+    try:
+        stream = get_price_broadcaster().subscribe(request.headers.get("Last-Event-ID"))
+    except StreamFullError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "60"}
+    return Response(stream, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
-            return jsonify(response_data), 200
 
-        except Exception as e:
-            logging.error(f"Erreur lors de la génération des prédictions : {e}")
-            return jsonify({"error": "Une erreur est survenue."}), 500
+@main.route('/model-info', methods=['GET'])
+def model_info():
+    """Retourne la version du modèle actif et son temps de chargement (suivi des démarrages à froid)."""
+    return jsonify(get_model_registry().stats()), 200
 
 
 @main.route('/investisseur', methods=['GET'])
 def investisseur():
-    # Liste des symboles boursiers des entreprises à analyser
-    companies = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "NFLX", "META", "NVDA"]
-
-    # Liste pour stocker les informations des entreprises
-    data = []
-
-    # Boucle sur chaque entreprise de la liste
-    for company in companies:
-        try:
-            # Initialisation d'un objet `Ticker` pour récupérer les données de l'entreprise
-            stock = yf.Ticker(company)
-
-            # Récupère les 5 dernières actualités uniquement pour Apple
-            if company == "AAPL":
-                news = stock.news[:5] if stock.news else []  # Dernières actualités (max 5 articles)
-            else:
-                news = []  # Pas d'actualités pour les autres entreprises
-            info = {                "symbol": company,
-                "price": stock.history(period="1d")['Close'].iloc[-1],  # Dernier prix de clôture
-                "news": news  # Dernières actualités pour Apple ou vide pour les autres entreprises
-            }
-
-            # Ajout des informations de l'entreprise à la liste principale
-            data.append(info)
-
-        # Gestion des exceptions (si une erreur survient, elle est affichée dans la console)
-        except Exception as e:
-            print(f"Erreur lors de la récupération des données pour {company} : {e}")
+    # Liste des symboles boursiers des entreprises à analyser (configurable via WATCHLIST)
+    companies = WATCHLIST
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        # Instantané publié par le collecteur en arrière-plan : aucun appel à Yahoo
+        quotes = {symbol: values["price"] for symbol, values in snapshot["symbols"].items()
+                  if values.get("price") is not None}
+        apple_news = latest_news("AAPL")
+    else:
+        # Les actualités d'Apple sont récupérées en parallèle des cours
+        news_future = submit(latest_news, "AAPL")
+
+        # Un appel groupé pour tous les cours, puis des appels individuels bornés pour les manquants
+        quotes = get_watchlist_quotes(companies, timeout=UPSTREAM_TIMEOUT)
+        apple_news = result_or_default(news_future, UPSTREAM_TIMEOUT, default=[], label="actualités AAPL")
+
+    # Les symboles indisponibles sont omis : la page s'affiche avec des résultats partiels
+    data = [
+        {
+            "symbol": company,
+            "price": quotes[company],  # Dernier prix de clôture
+            "news": apple_news if company == "AAPL" else []  # Dernières actualités pour Apple uniquement
+        }
+        for company in companies if company in quotes
+    ]
 
     # Rendu de la page HTML `financial_corner.html`, en passant les données récupérées
     return render_template('financial_corner.html', data=data)
 @main.get("/news")
 def get_news():
-    stock = yf.Ticker("AAPL")
-    news_data = stock.news
-    return {"news": news_data}
\ No newline at end of file
+    """
+    Actualités d'un symbole, de la plus récente à la plus ancienne, réduites aux champs demandés.
+
+    Paramètres de requête :
+        symbol: Symbole de la liste suivie (AAPL par défaut).
+        since: Timestamp UNIX ; seules les actualités publiées après sont retournées
+               (passer la valeur `latest` de la réponse précédente pour ne recevoir que les nouvelles).
+        before: Timestamp UNIX ; curseur de la page suivante (`next_before` de la réponse précédente).
+        limit: Taille de la page (20 par défaut, 100 au plus).
+        fields: Champs retournés, séparés par des virgules (title,link,publisher,time par défaut).
+    """
+    stock_symbol = request.args.get("symbol", "AAPL").upper()
+    try:
+        if stock_symbol not in WATCHLIST:
+            raise ValueError(f"Symbole non suivi : {stock_symbol}")
+        since = int(request.args["since"]) if request.args.get("since") else None
+        before = int(request.args["before"]) if request.args.get("before") else None
+        limit = int(request.args.get("limit", 20))
+        if not 1 <= limit <= 100:
+            raise ValueError(f"Taille de page invalide : {limit}")
+        fields = tuple(request.args["fields"].split(",")) if request.args.get("fields") else DEFAULT_NEWS_FIELDS
+        if not set(fields) <= set(NEWS_FIELDS):
+            raise ValueError(f"Champs non pris en charge : {','.join(sorted(set(fields) - set(NEWS_FIELDS)))}")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        page = cached_news(stock_symbol).page(stock_symbol, since=since, before=before, limit=limit, fields=fields)
+    except Exception as e:
+        logging.error(f"Erreur lors de la récupération des actualités : {e}")
+        return jsonify({"error": str(e)}), 500
+    # Revalidable : la date de l'actualité la plus récente sert de Last-Modified
+    latest = page["latest"]
+    return conditional_json(page, last_modified=datetime.fromtimestamp(latest, timezone.utc) if latest else None)
\ No newline at end of file
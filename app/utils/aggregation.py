@@ -0,0 +1,135 @@
+import logging
+
+import pandas as pd
+
+# Fréquences d'agrégation : (règle de rééchantillonnage, période correspondante)
+FREQUENCIES = {
+    "W": ("W-FRI", "W-FRI"),
+    "M": ("ME", "M"),
+    "Q": ("QE", "Q"),
+    "Y": ("YE", "Y"),
+}
+
+REDUCTIONS = ("last", "first", "mean", "min", "max", "ohlc")
+
+
+def to_price_series(prices):
+    """
+    Convertit des prix en série indexée par date.
+
+    Paramètres:
+        prices: Une pd.Series à DatetimeIndex, un DataFrame avec une colonne 'Close',
+                ou une liste de dictionnaires {'date': 'YYYY-MM-DD', 'price': float}.
+
+    Retourne:
+        pd.Series: Les prix triés par date, ou None si le format n'est pas reconnu.
+    """
+    if isinstance(prices, pd.DataFrame):
+        prices = prices["Close"]
+    if isinstance(prices, pd.Series):
+        if not isinstance(prices.index, pd.DatetimeIndex):
+            logging.error("Les prix doivent être indexés par date (DatetimeIndex).")
+            return None
+        return prices.sort_index()
+    if prices and all(isinstance(price, dict) for price in prices):
+        frame = pd.DataFrame(prices)
+        if not {"date", "price"} <= set(frame.columns):
+            logging.error(f"Format inattendu pour les données de prix : {prices[0]}")
+            return None
+        return pd.Series(frame["price"].to_numpy(dtype=float), index=pd.to_datetime(frame["date"])).sort_index()
+    # Des prix sans date ne peuvent pas être rattachés à des mois de bourse réels
+    logging.error("Format des données de prix non reconnu (des dates sont nécessaires).")
+    return None
+
+
+def aggregate_prices(prices, freq="M", how="last", years=None):
+    """
+    Agrège une série de prix par période en une seule passe vectorisée.
+
+    Paramètres:
+        prices (pd.Series): Prix indexés par date.
+        freq (str): 'W' (semaine), 'M' (mois), 'Q' (trimestre) ou 'Y' (année).
+        how (str): Réduction : 'last', 'first', 'mean', 'min', 'max' ou 'ohlc'.
+        years (list): Années à conserver (toutes si None).
+
+    Retourne:
+        pd.Series | pd.DataFrame: Une valeur par période (colonnes open/high/low/close pour 'ohlc'),
+        indexée par la date de fin de période.
+
+    Raises:
+        ValueError: Si la fréquence ou la réduction n'est pas prise en charge.
+    """
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Fréquence non prise en charge : {freq}")
+    if how not in REDUCTIONS:
+        raise ValueError(f"Réduction non prise en charge : {how}")
+
+    prices = prices.dropna()
+    if years:
+        prices = prices[prices.index.year.isin(years)]
+    resampled = prices.resample(FREQUENCIES[freq][0])
+    return getattr(resampled, how)().dropna(how="all")
+
+
+def to_records(aggregated, freq="M"):
+    """
+    Met en forme les périodes agrégées pour le tableau de bord.
+
+    Retourne:
+        list: Un dictionnaire par période : {'année', 'date' (début de période), 'mois', 'prix'},
+              ou les clés 'open', 'high', 'low', 'close' à la place de 'prix' pour une agrégation OHLC.
+    """
+    starts = aggregated.index.to_period(FREQUENCIES[freq][1]).start_time
+    columns = {
+        "année": aggregated.index.year.astype(str).tolist(),
+        "date": starts.strftime('%Y-%m-%d').tolist(),
+        "mois": aggregated.index.strftime('%B').tolist(),
+    }
+    if isinstance(aggregated, pd.DataFrame):
+        for column in aggregated.columns:
+            columns[column] = aggregated[column].tolist()
+    else:
+        columns["prix"] = aggregated.tolist()
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def prices_by_year(prices, years, freq="M", how="last"):
+    """
+    Agrège les prix de plusieurs années en une passe, puis les regroupe par année.
+
+    Paramètres:
+        prices: Prix datés (voir `to_price_series`).
+        years (list): Années souhaitées.
+        freq (str): Fréquence d'agrégation (voir `aggregate_prices`).
+        how (str): Réduction (voir `aggregate_prices`).
+
+    Retourne:
+        dict: {année (int): liste de périodes mises en forme}.
+    """
+    series = to_price_series(prices)
+    by_year = {year: [] for year in years}
+    if series is None:
+        return by_year
+    aggregated = aggregate_prices(series, freq, how, years=years)
+    for record in to_records(aggregated, freq):
+        by_year[int(record["année"])].append(record)
+    return by_year
+
+
+def format_prices_with_month(prices_data, year=None, freq="M", how="last"):
+    """
+    Retourne le dernier prix de chaque mois (ou d'une autre période) pour une année donnée.
+
+    Paramètres:
+        prices_data: Prix datés (voir `to_price_series`).
+        year (str|int): Année à conserver (toutes si None).
+        freq (str): Fréquence d'agrégation (voir `aggregate_prices`).
+        how (str): Réduction (voir `aggregate_prices`).
+
+    Retourne:
+        list: Les périodes mises en forme (voir `to_records`).
+    """
+    series = to_price_series(prices_data)
+    if series is None:
+        return []
+    return to_records(aggregate_prices(series, freq, how, years=[int(year)] if year else None), freq)
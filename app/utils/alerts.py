@@ -0,0 +1,319 @@
+import bisect
+import heapq
+import logging
+import os
+import sqlite3
+import threading
+import time
+from operator import itemgetter
+
+from pydantic import BaseModel
+
+from app.utils.leader import LeaderThread
+from app.utils.mailer import get_mail_dispatcher
+from app.utils.quotes import UPSTREAM_TIMEOUT, get_watchlist_quotes
+
+ABOVE = "above"
+BELOW = "below"
+
+# Intervalle (en secondes) d'évaluation des alertes quand le collecteur de données de marché est désactivé
+ALERT_CHECK_INTERVAL = float(os.getenv("ALERT_CHECK_INTERVAL", "60"))
+
+
+class Alert(BaseModel):
+    """
+    Modèle de données pour gérer les alertes via Pydantic.
+    """
+    email: str
+    price: float
+    symbol: str = "AAPL"
+
+
+class AlertBook:
+    """
+    Index des alertes d'un symbole, trié par seuil.
+
+    Les alertes « au-dessus » sont déclenchées quand le prix atteint ou dépasse leur
+    seuil, les alertes « en dessous » quand il l'atteint ou passe sous leur seuil. Chaque
+    côté est trié pour que les alertes déclenchées soient toujours les dernières de la
+    liste (seuils décroissants au-dessus, croissants en dessous) : une recherche
+    dichotomique donne la tranche à déclencher, retirée en fin de liste sans déplacer
+    les alertes restantes.
+
+    L'index ne conserve que l'identifiant et l'e-mail de chaque alerte ; les objets
+    `Alert` ne sont construits que pour les alertes déclenchées.
+    """
+
+    # Au-delà de ce nombre d'alertes ajoutées d'un coup, on fusionne les listes triées
+    # au lieu d'insérer les alertes une à une
+    MERGE_THRESHOLD = 64
+
+    def __init__(self, symbol="AAPL"):
+        self.symbol = symbol
+        # Clés de tri croissantes : seuil opposé au-dessus, seuil en dessous
+        self.keys = {ABOVE: [], BELOW: []}
+        self.entries = {ABOVE: [], BELOW: []}
+
+    def __len__(self):
+        return len(self.entries[ABOVE]) + len(self.entries[BELOW])
+
+    @staticmethod
+    def _key(direction, threshold):
+        return -threshold if direction == ABOVE else threshold
+
+    def add(self, alert_id, alert, direction):
+        """
+        Ajoute une alerte à l'index.
+
+        Paramètres:
+            alert_id (int): Identifiant de l'alerte.
+            alert (Alert): L'alerte.
+            direction (str): ABOVE ou BELOW.
+        """
+        keys, entries = self.keys[direction], self.entries[direction]
+        key = self._key(direction, alert.price)
+        index = bisect.bisect_right(keys, key)
+        keys.insert(index, key)
+        entries.insert(index, (alert_id, alert.email))
+
+    def extend(self, rows, direction):
+        """
+        Ajoute un lot d'alertes de même sens : le lot est trié une fois, puis copié tel quel
+        dans un index vide ou fusionné avec l'index existant (insertions une à une pour
+        les petits lots).
+
+        Paramètres:
+            rows (list): Les triplets (identifiant, e-mail, seuil).
+            direction (str): ABOVE ou BELOW.
+        """
+        keys, entries = self.keys[direction], self.entries[direction]
+        if keys and len(rows) <= self.MERGE_THRESHOLD:
+            for alert_id, email, threshold in rows:
+                key = self._key(direction, threshold)
+                index = bisect.bisect_right(keys, key)
+                keys.insert(index, key)
+                entries.insert(index, (alert_id, email))
+            return
+        batch = sorted(((self._key(direction, threshold), (alert_id, email)) for alert_id, email, threshold in rows),
+                       key=itemgetter(0))
+        if keys:
+            batch = list(heapq.merge(zip(keys, entries), batch, key=itemgetter(0)))
+        keys[:] = [key for key, _ in batch]
+        entries[:] = [entry for _, entry in batch]
+
+    def crossed(self, price):
+        """
+        Retire et retourne les alertes franchies par le prix.
+
+        Paramètres:
+            price (float): Le nouveau prix.
+
+        Retourne:
+            list: Les couples (identifiant, alerte) déclenchés.
+        """
+        triggered = []
+        for direction in (ABOVE, BELOW):
+            keys, entries = self.keys[direction], self.entries[direction]
+            index = bisect.bisect_left(keys, self._key(direction, price))
+            if index < len(keys):
+                triggered += [(alert_id, Alert(email=email, price=self._key(direction, key), symbol=self.symbol))
+                              for key, (alert_id, email) in zip(keys[index:], entries[index:])]
+                del keys[index:]
+                del entries[index:]
+        return triggered
+
+
+class AlertEngine:
+    """
+    Moteur d'alertes de prix persistant.
+
+    Les alertes sont enregistrées dans SQLite par n'importe quel worker ; le moteur
+    qui reçoit les cours (le collecteur de la machine) charge les nouvelles alertes
+    à chaque tick, puis n'évalue que celles franchies par le nouveau prix.
+    """
+
+    def __init__(self, path, notify=None):
+        self.path = path
+        self.notify = notify or (lambda email, price, symbol: get_mail_dispatcher().submit(email, price, symbol))
+        self.books = {}
+        self._last_id = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    threshold REAL NOT NULL,
+                    direction TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    triggered_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS alerts_active ON alerts (id) WHERE triggered_at IS NULL;
+            """)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, alert, current_price):
+        """
+        Enregistre une alerte. Son sens est déduit du prix actuel : un seuil supérieur
+        se déclenche à la hausse, un seuil inférieur à la baisse.
+
+        Paramètres:
+            alert (Alert): L'alerte à enregistrer.
+            current_price (float): Le dernier prix connu du symbole.
+
+        Retourne:
+            tuple: (identifiant de l'alerte, sens).
+        """
+        direction = ABOVE if alert.price >= current_price else BELOW
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO alerts (symbol, email, threshold, direction, created_at) VALUES (?, ?, ?, ?, ?)",
+                (alert.symbol, alert.email, alert.price, direction, time.time()),
+            )
+        return cursor.lastrowid, direction
+
+    def active_symbols(self):
+        """
+        Retourne les symboles ayant au moins une alerte en attente.
+        """
+        rows = self._connection().execute(
+            "SELECT DISTINCT symbol FROM alerts WHERE triggered_at IS NULL"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def sync(self):
+        """
+        Charge dans l'index les alertes enregistrées depuis le dernier chargement.
+        """
+        rows = self._connection().execute(
+            "SELECT id, symbol, email, threshold, direction FROM alerts "
+            "WHERE id > ? AND triggered_at IS NULL ORDER BY id",
+            (self._last_id,),
+        ).fetchall()
+        if not rows:
+            return
+        # Regroupées par symbole et par sens, les alertes sont triées une fois par lot
+        batches = {}
+        for alert_id, symbol, email, threshold, direction in rows:
+            batches.setdefault((symbol, direction), []).append((alert_id, email, threshold))
+        for (symbol, direction), batch in batches.items():
+            if symbol not in self.books:
+                self.books[symbol] = AlertBook(symbol)
+            self.books[symbol].extend(batch, direction)
+        self._last_id = rows[-1][0]
+
+    def on_tick(self, stock_symbol, price):
+        """
+        Évalue un nouveau prix : déclenche, notifie et marque les alertes franchies.
+
+        Paramètres:
+            stock_symbol (str): Le symbole boursier.
+            price (float): Le nouveau prix.
+
+        Retourne:
+            list: Les alertes déclenchées.
+        """
+        with self._lock:
+            self.sync()
+            book = self.books.get(stock_symbol)
+            if not book:
+                return []
+            triggered = book.crossed(price)
+            if not triggered:
+                return []
+            now = time.time()
+            with self._connection() as conn:
+                conn.executemany("UPDATE alerts SET triggered_at = ? WHERE id = ?",
+                                 [(now, alert_id) for alert_id, _ in triggered])
+        for _, alert in triggered:
+            try:
+                self.notify(alert.email, alert.price, alert.symbol)
+            except Exception as e:
+                logging.error(f"Échec de la notification de l'alerte pour {alert.email} : {e}")
+        return [alert for _, alert in triggered]
+
+    def check(self, quotes=None):
+        """
+        Évalue les alertes en attente avec les cours fournis ; les cours des autres symboles
+        faisant l'objet d'alertes sont demandés à Yahoo (aucun appel s'il n'y a pas d'alerte).
+
+        Paramètres:
+            quotes (dict): Derniers cours connus, {symbole: prix}.
+
+        Retourne:
+            list: Les alertes déclenchées.
+        """
+        quotes = dict(quotes or {})
+        extra = [symbol for symbol in self.active_symbols() if symbol not in quotes]
+        if extra:
+            quotes.update(get_watchlist_quotes(extra, timeout=UPSTREAM_TIMEOUT))
+        triggered = []
+        for symbol, price in quotes.items():
+            try:
+                triggered += self.on_tick(symbol, price)
+            except Exception as e:
+                logging.error(f"Échec de l'évaluation des alertes pour {symbol} : {e}")
+        return triggered
+
+
+class AlertWatcher(LeaderThread):
+    """
+    Évalue les alertes à intervalle régulier lorsque le collecteur de données de marché est
+    désactivé (sinon il les évalue lui-même à chaque tick, voir app/utils/poller.py).
+
+    Chaque worker démarre un surveillant, mais un seul processus par machine évalue les alertes
+    (verrou de fichier, voir app/utils/leader.py) : un franchissement n'est notifié qu'une fois.
+    """
+
+    thread_name = "alert-watcher"
+
+    def __init__(self, engine=None, interval=ALERT_CHECK_INTERVAL, lock_path=None):
+        self.engine = engine
+        self.interval = interval
+        super().__init__(lock_path or f"{os.getenv('ALERTS_DB_PATH', 'data/alerts.sqlite3')}.lock")
+
+    def check(self):
+        """
+        Évalue les alertes en attente si ce processus détient le verrou.
+
+        Retourne:
+            list: Les alertes déclenchées, ou None si un autre processus évalue les alertes.
+        """
+        if not self._acquire_leadership():
+            return None
+        return (self.engine or get_alert_engine()).check()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f"Échec de l'évaluation des alertes : {e}")
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_alert_engine():
+    """
+    Retourne le moteur d'alertes du processus (base configurable via ALERTS_DB_PATH).
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AlertEngine(os.getenv("ALERTS_DB_PATH", "data/alerts.sqlite3"))
+    return _engine
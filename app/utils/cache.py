@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from app.utils.singleflight import SingleFlight
+
+# Caches nommés du processus, pour exposer leurs compteurs
+CACHES = {}
+
+
+class TTLCache:
+    """
+    Cache LRU borné avec durée de vie (TTL) et rafraîchissement en arrière-plan.
+
+    Une entrée fraîche est servie directement. Une entrée périmée est servie
+    immédiatement elle aussi, pendant qu'un unique rafraîchissement est lancé en
+    arrière-plan pour cette clé. Seule une absence d'entrée bloque l'appelant, et
+    les absences simultanées d'une même clé ne déclenchent qu'un seul chargement.
+    """
+
+    def __init__(self, ttl, maxsize=128, name=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._data = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+        if name:
+            CACHES[name] = self
+
+    def _set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _refresh(self, key, loader):
+        try:
+            self._set(key, loader())
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            with self._lock:
+                self.refresh_errors += 1
+            logging.error(f"Échec du rafraîchissement du cache {self.name} pour {key} : {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _load(self, key, loader):
+        value = loader()
+        self._set(key, value)
+        return value
+
+    def get(self, key, loader):
+        """
+        Retourne la valeur associée à `key`, en la chargeant avec `loader()` si nécessaire.
+
+        Paramètres:
+            key: La clé du cache.
+            loader (callable): Fonction sans argument qui calcule la valeur.
+
+        Retourne:
+            La valeur en cache (éventuellement périmée, le temps du rafraîchissement).
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                self._data.move_to_end(key)
+                if time.monotonic() - stored_at < self.ttl:
+                    self.hits += 1
+                    return value
+                self.stale_hits += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                return value
+            self.misses += 1
+
+        return self._flight.do(key, lambda: self._load(key, loader))
+
+    def peek(self, key):
+        """
+        Retourne la valeur associée à `key` si elle est en cache (même périmée), sinon None.
+
+        Contrairement à `get`, ne charge ni ne rafraîchit rien : l'appelant peut regrouper
+        le calcul des valeurs manquantes et les enregistrer avec `put`.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            self._data.move_to_end(key)
+            if time.monotonic() - stored_at < self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Enregistre une valeur calculée hors du cache.
+        """
+        self._set(key, value)
+
+    def invalidate(self, key=None):
+        """
+        Supprime une entrée, ou tout le cache si `key` est None.
+        """
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        """
+        Retourne les compteurs du cache (succès, échecs, rafraîchissements, taille).
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "evictions": self.evictions,
+                "coalesced": self._flight.coalesced,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+def cache_stats():
+    """
+    Retourne les compteurs de tous les caches nommés du processus.
+    """
+    return {name: cache.stats() for name, cache in CACHES.items()}
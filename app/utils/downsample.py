@@ -0,0 +1,54 @@
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Sélectionne `threshold` points d'une série avec l'algorithme Largest-Triangle-Three-Buckets.
+
+    Le premier et le dernier point sont conservés ; les autres points sont répartis en
+    `threshold - 2` groupes consécutifs, et dans chaque groupe on garde le point qui forme
+    le plus grand triangle avec le point retenu dans le groupe précédent et la moyenne du
+    groupe suivant. Les pics et les creux sont ainsi préservés, contrairement à un
+    échantillonnage régulier.
+
+    Paramètres:
+        x (array-like): Abscisses croissantes (par exemple des timestamps).
+        y (array-like): Ordonnées (par exemple des prix de clôture).
+        threshold (int): Nombre de points souhaité (au moins 3).
+
+    Retourne:
+        np.ndarray: Les indices des points retenus, croissants (tous si la série est assez courte).
+
+    Raises:
+        ValueError: Si les séries n'ont pas la même longueur ou si `threshold` est inférieur à 3.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if len(y) != n:
+        raise ValueError("Les abscisses et les ordonnées doivent avoir la même longueur.")
+    if threshold < 3:
+        raise ValueError(f"Nombre de points invalide : {threshold} (au moins 3).")
+    if n <= threshold:
+        return np.arange(n)
+
+    # Bornes des groupes (le premier et le dernier point forment chacun leur propre groupe)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    # Moyennes de chaque groupe (calculées en une passe), la dernière étant le point final
+    counts = np.diff(edges)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    next_x = np.append(sums_x[1:] / counts[1:], x[-1])
+    next_y = np.append(sums_y[1:] / counts[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Double de l'aire des triangles (point précédent, candidat, moyenne du groupe suivant)
+        areas = np.abs((x[previous] - next_x[bucket]) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y[bucket] - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
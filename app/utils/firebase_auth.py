@@ -0,0 +1,186 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+import requests
+from cryptography.x509 import load_pem_x509_certificate
+
+from app.utils.instrumentation import span
+
+# Certificats publics avec lesquels Firebase signe les idTokens (remplaçables par un bouchon local)
+CERTS_URL = os.getenv("FIREBASE_CERTS_URL",
+                      "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com")
+FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID", "apple-stock-prediction")
+
+
+class InvalidIdTokenError(RuntimeError):
+    """
+    Levée lorsqu'un idToken est invalide, expiré ou signé par une clé inconnue.
+    """
+
+
+def fetch_public_certs(url=CERTS_URL, timeout=5.0):
+    """
+    Télécharge les certificats publics de Firebase.
+
+    Paramètres:
+        url (str): L'adresse des certificats.
+        timeout (float): Délai maximal de la requête, en secondes.
+
+    Retourne:
+        tuple: ({kid: certificat PEM}, durée de validité en secondes tirée de Cache-Control).
+    """
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    return response.json(), int(match.group(1)) if match else 0
+
+
+class PublicKeyCache:
+    """
+    Clés publiques de vérification, conservées aussi longtemps que l'autorise
+    l'en-tête Cache-Control de Google, puis retéléchargées.
+
+    Un identifiant de clé inconnu provoque un rechargement anticipé (rotation des
+    clés), au plus une fois toutes les `min_refresh_interval` secondes.
+    """
+
+    def __init__(self, fetch=fetch_public_certs, clock=time.time, min_refresh_interval=60.0):
+        self.fetch = fetch
+        self.clock = clock
+        self.min_refresh_interval = min_refresh_interval
+        self._keys = {}
+        self._expires_at = 0.0
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def _refresh(self):
+        with span("firebase.certs"):
+            certs, max_age = self.fetch()
+        self._keys = {kid: load_pem_x509_certificate(pem.encode()).public_key() for kid, pem in certs.items()}
+        self._fetched_at = self.clock()
+        self._expires_at = self._fetched_at + max_age
+        self.fetches += 1
+
+    def get(self, kid):
+        """
+        Retourne la clé publique associée à `kid`.
+
+        Raises:
+            InvalidIdTokenError: Si la clé est inconnue, même après rechargement.
+        """
+        now = self.clock()
+        key = self._keys.get(kid) if now < self._expires_at else None
+        if key is None:
+            with self._lock:
+                now = self.clock()
+                expired = now >= self._expires_at
+                recently_fetched = self._fetched_at is not None and now - self._fetched_at < self.min_refresh_interval
+                if expired or (kid not in self._keys and not recently_fetched):
+                    self._refresh()
+                key = self._keys.get(kid)
+        if key is None:
+            raise InvalidIdTokenError(f"Clé de signature inconnue : {kid}")
+        return key
+
+
+class TokenVerifier:
+    """
+    Vérification locale des idTokens Firebase (signature RS256, audience, émetteur, expiration).
+
+    Les revendications décodées sont conservées jusqu'à l'expiration du jeton :
+    une page authentifiée ne déclenche ni appel réseau ni vérification de signature.
+    """
+
+    def __init__(self, project_id=FIREBASE_PROJECT_ID, keys=None, clock=time.time, leeway=60, maxsize=10000):
+        self.project_id = project_id
+        self.issuer = f"https://securetoken.google.com/{project_id}"
+        self.keys = keys or PublicKeyCache(clock=clock)
+        self.clock = clock
+        self.leeway = leeway
+        self.maxsize = maxsize
+        self._claims = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _decode(self, id_token):
+        try:
+            kid = jwt.get_unverified_header(id_token).get("kid")
+            claims = jwt.decode(
+                id_token,
+                self.keys.get(kid),
+                algorithms=["RS256"],
+                audience=self.project_id,
+                issuer=self.issuer,
+                leeway=self.leeway,
+                options={"require": ["exp", "iat", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise InvalidIdTokenError(f"idToken invalide : {e}") from e
+        if not claims["sub"] or claims.get("auth_time", 0) > self.clock() + self.leeway:
+            raise InvalidIdTokenError("idToken invalide : sujet ou date d'authentification incorrects")
+        return claims
+
+    def verify(self, id_token):
+        """
+        Vérifie un idToken et retourne ses revendications.
+
+        Paramètres:
+            id_token (str): Le jeton obtenu à la connexion.
+
+        Retourne:
+            dict: Les revendications (uid dans 'sub', 'email', 'name'...).
+
+        Raises:
+            InvalidIdTokenError: Si le jeton est invalide ou expiré.
+        """
+        digest = hashlib.sha256(id_token.encode()).digest()
+        now = self.clock()
+        with self._lock:
+            entry = self._claims.get(digest)
+            if entry is not None:
+                if now < entry["exp"] + self.leeway:
+                    self._claims.move_to_end(digest)
+                    self.hits += 1
+                    return entry
+                del self._claims[digest]
+            self.misses += 1
+
+        with span("firebase.verify_token"):
+            claims = self._decode(id_token)
+        with self._lock:
+            self._claims[digest] = claims
+            while len(self._claims) > self.maxsize:
+                self._claims.popitem(last=False)
+        return claims
+
+    def stats(self):
+        """
+        Retourne les compteurs de vérification.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._claims),
+                    "cert_fetches": self.keys.fetches}
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_token_verifier():
+    """
+    Retourne le vérificateur d'idTokens du processus.
+    """
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = TokenVerifier()
+    return _verifier
+
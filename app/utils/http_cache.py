@@ -0,0 +1,229 @@
+import gzip
+import mimetypes
+import os
+import threading
+
+import click
+from flask import current_app, jsonify, request, send_from_directory
+from werkzeug.security import safe_join
+
+from app.models.registry import file_version
+from app.utils.cache import TTLCache
+
+try:
+    # Dépendance optionnelle : sans le paquet `brotli`, seul gzip est proposé
+    import brotli
+except ImportError:
+    brotli = None
+
+# Types de réponses compressés à la volée (si le client l'accepte)
+COMPRESSIBLE_TYPES = {"application/json", "text/html", "text/plain", "text/css", "text/javascript",
+                      "application/javascript", "image/svg+xml"}
+# En dessous de cette taille, la compression ne fait pas gagner de paquet réseau
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Ressources statiques versionnées (?v=<empreinte>) : mises en cache un an, sans revalidation
+STATIC_MAX_AGE = 365 * 24 * 3600
+# Fichiers précompressés par `flask precompress-static` (les polices woff/woff2 le sont déjà)
+PRECOMPRESS_DIR = "assets/vendor"
+PRECOMPRESS_EXTENSIONS = (".js", ".css", ".svg", ".ttf", ".eot", ".json", ".map", ".html", ".txt")
+
+# Corps compressés des réponses dynamiques, par (ETag, encodage) : une réponse inchangée n'est compressée qu'une fois
+compressed_cache = TTLCache(ttl=3600, maxsize=256, name="compressed_responses")
+
+_static_versions = {}
+_static_versions_lock = threading.Lock()
+
+
+def conditional_json(payload, last_modified=None, status=200):
+    """
+    Réponse JSON revalidable : ETag calculé sur le contenu, Last-Modified (ex. : date de la
+    dernière barre) et réponse 304 sans corps si le client possède déjà cette version.
+
+    Paramètres:
+        payload: Les données sérialisées en JSON.
+        last_modified (datetime | float): Date de dernière modification des données.
+        status (int): Le code HTTP de la réponse complète.
+
+    Retourne:
+        Response: La réponse, ou une réponse 304 (requêtes GET et HEAD uniquement).
+    """
+    response = jsonify(payload)
+    response.status_code = status
+    response.add_etag()
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Le navigateur garde la réponse mais la revalide à chaque utilisation
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def negotiate_encoding():
+    """
+    Retourne l'encodage préféré par le client parmi ceux disponibles ('br', 'gzip'), ou None.
+    """
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+    accepted = [(request.accept_encodings.quality(encoding), encoding) for encoding in available]
+    quality, encoding = max(accepted, key=lambda item: item[0])
+    return encoding if quality > 0 else None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response):
+    """
+    Compresse le corps des réponses textuelles selon l'en-tête Accept-Encoding.
+    Les fichiers (servis tels quels), les flux et les réponses déjà encodées ne sont pas modifiés.
+    """
+    response.vary.add("Accept-Encoding")
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed \
+            or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    if etag:
+        body = compressed_cache.get((etag, encoding), lambda: compress(data, encoding))
+        # Même contenu, autre représentation : l'ETag devient faible (If-None-Match reste valide)
+        response.set_etag(etag, weak=True)
+    else:
+        body = compress(data, encoding)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def revalidate_page(response):
+    """
+    Ajoute un ETag aux pages HTML (GET) et répond 304 si le navigateur possède déjà la même page.
+    """
+    if request.method in ("GET", "HEAD") and response.status_code == 200 and response.mimetype == "text/html" \
+            and not response.direct_passthrough and not response.is_streamed and not response.get_etag()[0]:
+        response.add_etag()
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+    return response
+
+
+def static_version(filename):
+    """
+    Empreinte courte du contenu d'un fichier statique (recalculée si le fichier change).
+    """
+    path = safe_join(current_app.static_folder, filename)
+    if path is None:
+        return None
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _static_versions.get(filename)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, file_version(path))
+        with _static_versions_lock:
+            _static_versions[filename] = cached
+    return cached[1]
+
+
+def add_static_version(endpoint, values):
+    """
+    `url_for('static', ...)` ajoute `?v=<empreinte>` : l'URL change avec le contenu, ce qui
+    permet de mettre les fichiers en cache comme immuables.
+    """
+    if endpoint == "static" and "filename" in values and "v" not in values:
+        version = static_version(values["filename"])
+        if version:
+            values["v"] = version
+
+
+def send_static(filename):
+    """
+    Sert un fichier statique, dans sa version précompressée (.br ou .gz) si elle existe et que
+    le client l'accepte. Les URL versionnées sont déclarées immuables.
+    """
+    static_folder = current_app.static_folder
+    response = None
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        path = safe_join(static_folder, filename + suffix)
+        if request.accept_encodings.quality(encoding) > 0 and path and os.path.isfile(path):
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            response = send_from_directory(static_folder, filename + suffix, mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+            break
+    if response is None:
+        response = send_from_directory(static_folder, filename)
+    response.vary.add("Accept-Encoding")
+    if request.args.get("v"):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+def precompress_static(static_folder, directory=PRECOMPRESS_DIR):
+    """
+    Écrit les versions .gz (et .br si `brotli` est installé) des fichiers statiques de `directory`.
+    Les fichiers à jour sont ignorés, ainsi que ceux que la compression ne réduit pas d'au moins 10 %.
+
+    Retourne:
+        list: Les chemins des fichiers écrits.
+    """
+    encodings = [(".gz", "gzip")] + ([(".br", "br")] if brotli is not None else [])
+    written = []
+    for root, _, files in os.walk(os.path.join(static_folder, directory)):
+        for name in files:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            mtime = os.stat(path).st_mtime
+            data = None
+            for suffix, encoding in encodings:
+                target = path + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime >= mtime:
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                body = gzip.compress(data, compresslevel=9, mtime=0) if encoding == "gzip" \
+                    else brotli.compress(data, quality=9)
+                if len(body) > len(data) * 0.9:
+                    continue
+                tmp = f"{target}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, target)
+                written.append(target)
+    return written
+
+
+@click.command("precompress-static")
+def precompress_static_command():
+    """Précompresse les ressources statiques volumineuses (gzip, et brotli si installé)."""
+    written = precompress_static(current_app.static_folder)
+    click.echo(f"{len(written)} fichier(s) écrit(s)")
+
+
+def init_app(app):
+    """
+    Active la revalidation des pages, la compression des réponses et le service des
+    ressources statiques précompressées et versionnées.
+    """
+    app.view_functions["static"] = send_static
+    app.url_defaults(add_static_version)
+    app.after_request(compress_response)
+    # Exécuté avant la compression (les hooks after_request sont appelés en ordre inverse)
+    app.after_request(revalidate_page)
+    app.cli.add_command(precompress_static_command)
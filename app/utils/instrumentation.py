@@ -0,0 +1,302 @@
+import bisect
+import os
+import threading
+import time
+
+# Instrumentation activée par défaut ; INSTRUMENTATION_ENABLED=0 remplace les mesures par des no-ops
+ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "1") == "1"
+
+# Bornes des histogrammes de durée (secondes), de 1 ms à 30 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Métriques nommées du processus, et fonctions produisant des échantillons au moment de la lecture
+METRICS = {}
+COLLECTORS = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Base des métriques : nom, description et noms d'étiquettes, enregistrées dans METRICS.
+    """
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        METRICS[name] = self
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    """
+    Compteur croissant, par combinaison d'étiquettes.
+    """
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                                for labels, value in values]
+
+
+class Gauge(Counter):
+    """
+    Valeur instantanée (requêtes en cours, taille d'une file...).
+    """
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Histogramme de durées à bornes fixes : une recherche dichotomique et trois
+    additions par observation.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [effectifs par borne (+Inf en dernier), somme, nombre]
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self, *labels):
+        """
+        Retourne (effectifs par borne, somme, nombre) pour une combinaison d'étiquettes.
+        """
+        with self._lock:
+            state = self._values.get(labels)
+            return (list(state[0]), state[1], state[2]) if state else ([0] * (len(self.buckets) + 1), 0.0, 0)
+
+    def render(self):
+        with self._lock:
+            values = [(labels, list(state[0]), state[1], state[2]) for labels, state in self._values.items()]
+        lines = self.header()
+        for labels, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+SPAN_SECONDS = Histogram("app_span_seconds", "Durée des étapes instrumentées (appels Yahoo, SMTP, Firebase, prédiction).",
+                         ["span"])
+SPAN_ERRORS = Counter("app_span_errors_total", "Étapes instrumentées terminées par une exception.", ["span"])
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Durée des requêtes HTTP par route.",
+                            ["route", "method"])
+REQUESTS = Counter("http_requests_total", "Requêtes HTTP par route, méthode et statut.", ["route", "method", "status"])
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requêtes HTTP en cours de traitement par route.", ["route"])
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        SPAN_SECONDS.observe(time.perf_counter() - self.start, self.name)
+        if exc_type is not None:
+            SPAN_ERRORS.inc(self.name)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """
+    Mesure la durée d'un bloc dans l'histogramme `app_span_seconds{span=name}`.
+
+    Usage :
+        with span("yfinance.history"):
+            ...
+    """
+    return _Span(name) if ENABLED else _NO_SPAN
+
+
+def register_collector(collector):
+    """
+    Ajoute une fonction appelée à chaque lecture de /metrics, qui retourne des lignes
+    au format texte de Prometheus (compteurs tenus ailleurs : caches, file d'envoi...).
+    """
+    COLLECTORS.append(collector)
+    return collector
+
+
+def render_metrics():
+    """
+    Retourne toutes les métriques du processus au format texte de Prometheus.
+    """
+    lines = []
+    for metric in list(METRICS.values()):
+        lines.extend(metric.render())
+    for collector in COLLECTORS:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+def samples(name, kind, documentation, rows):
+    """
+    Met en forme une famille d'échantillons pour un collecteur.
+
+    Paramètres:
+        name (str): Nom de la métrique.
+        kind (str): 'counter' ou 'gauge'.
+        documentation (str): Description.
+        rows (list): Couples ({étiquette: valeur}, valeur) ; les valeurs None sont ignorées.
+    """
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in rows:
+        if value is not None:
+            lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+    return lines
+
+
+@register_collector
+def application_samples():
+    """
+    Compteurs tenus par les composants de l'application : caches, file d'envoi
+    d'e-mails, modèles chargés, flux de prix et vérification des idTokens.
+    """
+    from app.models import registry
+    from app.utils import firebase_auth, mailer, stream
+    from app.utils.cache import cache_stats
+    from app.utils.singleflight import flight_stats
+
+    caches = cache_stats()
+    events = ("hits", "stale_hits", "misses", "refreshes", "refresh_errors", "evictions", "coalesced")
+    lines = samples("app_cache_events_total", "counter", "Événements des caches nommés.",
+                    [({"cache": name, "event": event}, stats[event]) for name, stats in caches.items()
+                     for event in events])
+    lines += samples("app_cache_size", "gauge", "Nombre d'entrées des caches nommés.",
+                     [({"cache": name}, stats["size"]) for name, stats in caches.items()])
+
+    dispatcher = mailer._dispatcher if mailer._dispatcher_pid == os.getpid() else None
+    if dispatcher is not None:
+        stats = dispatcher.stats()
+        lines += samples("app_mail_events_total", "counter", "Envois d'e-mails d'alerte.",
+                         [({"event": event}, stats[event]) for event in ("sent", "failed", "retries", "connections")])
+        lines += samples("app_mail_queue_depth", "gauge", "E-mails en attente d'envoi.", [({}, stats["queued"])])
+
+    models = [model.stats() for model in list(registry._registries.values())]
+    lines += samples("app_model_loads_total", "counter", "Chargements de modèle.",
+                     [({"path": stats["path"]}, stats["loads"]) for stats in models])
+    lines += samples("app_model_load_seconds", "gauge", "Durée du dernier chargement de modèle.",
+                     [({"path": stats["path"], "version": stats["version"]}, stats["load_seconds"]) for stats in models])
+
+    flights = flight_stats()
+    lines += samples("app_singleflight_calls_total", "counter",
+                     "Appels amont par issue : exécutés, regroupés sur un appel en cours, échoués, délai dépassé.",
+                     [({"name": name, "result": result}, stats[key]) for name, stats in flights.items()
+                      for result, key in (("executed", "executions"), ("coalesced", "coalesced"),
+                                          ("error", "errors"), ("timeout", "timeouts"))])
+
+    broadcaster = stream._broadcaster
+    if broadcaster is not None:
+        stats = broadcaster.stats()
+        lines += samples("app_stream_subscribers", "gauge", "Clients connectés à /stream/prices.",
+                         [({}, stats["subscribers"])])
+        lines += samples("app_stream_events_total", "counter", "Événements de prix diffusés.", [({}, stats["events"])])
+        lines += samples("app_stream_rejected_total", "counter", "Flux refusés (nombre maximal par worker atteint).",
+                         [({}, stats["rejected"])])
+
+    verifier = firebase_auth._verifier
+    if verifier is not None:
+        stats = verifier.stats()
+        lines += samples("app_id_token_verifications_total", "counter", "Vérifications d'idToken (cache ou signature).",
+                         [({"result": "cached"}, stats["hits"]), ({"result": "verified"}, stats["misses"])])
+        lines += samples("app_firebase_cert_fetches_total", "counter", "Téléchargements des certificats Firebase.",
+                         [({}, stats["cert_fetches"])])
+    return lines
+
+
+def init_app(app):
+    """
+    Mesure chaque requête de l'application : durée et nombre par route (modèle d'URL,
+    pas le chemin, pour borner le nombre de séries) et requêtes en cours.
+    """
+    if not ENABLED:
+        return
+    from flask import g, request
+
+    def start_request():
+        g.instrumentation_route = request.url_rule.rule if request.url_rule else "<inconnue>"
+        g.instrumentation_start = time.perf_counter()
+        IN_FLIGHT.inc(g.instrumentation_route)
+
+    def record_status(response):
+        REQUESTS.inc(g.get("instrumentation_route", "<inconnue>"), request.method, str(response.status_code))
+        return response
+
+    def end_request(exc):
+        route = g.pop("instrumentation_route", None)
+        if route is None:
+            return
+        REQUEST_SECONDS.observe(time.perf_counter() - g.pop("instrumentation_start"), route, request.method)
+        IN_FLIGHT.dec(route)
+
+    # Premier hook exécuté, pour que la durée inclue les autres hooks de l'application
+    app.before_request_funcs.setdefault(None, []).insert(0, start_request)
+    app.after_request(record_status)
+    app.teardown_request(end_request)
@@ -0,0 +1,67 @@
+import fcntl
+import os
+import threading
+
+
+class LeaderThread:
+    """
+    Tâche de fond démarrée dans un thread démon par chaque worker, dont le travail est
+    réservé à un seul processus par machine par un verrou de fichier (`flock`) : les autres
+    restent en attente et prennent le relais si le processus détenteur du verrou s'arrête.
+
+    Les sous-classes définissent `_run` (la boucle du thread, qui s'arrête quand `_stop`
+    est positionné) et n'effectuent leur travail que si `_acquire_leadership()` est vrai.
+
+    Paramètres:
+        lock_path (str): Chemin du fichier verrou, partagé par les processus de la machine.
+    """
+
+    thread_name = "leader"
+
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self._lock_file = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def _acquire_leadership(self):
+        if self._lock_file is None:
+            directory = os.path.dirname(self.lock_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _run(self):
+        raise NotImplementedError
+
+    def start(self):
+        """
+        Démarre le thread démon (une seule fois par processus, à nouveau après un fork).
+        """
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # Après un fork, le verrou hérité appartient au parent : on ouvre notre propre descripteur
+            self._lock_file = None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Arrête le thread et libère le verrou.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
@@ -0,0 +1,232 @@
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+
+from app.utils.instrumentation import span
+
+
+def build_alert_message(sender, email, price, symbol="AAPL"):
+    """
+    Construit l'e-mail d'alerte de prix.
+
+    Paramètres:
+        sender (str): Adresse de l'expéditeur.
+        email (str): Adresse du destinataire.
+        price (float): Le seuil de prix atteint.
+        symbol (str): Le symbole boursier de l'alerte.
+
+    Retourne:
+        MIMEText: Le message prêt à être envoyé.
+    """
+    msg = MIMEText(f"Le prix de l'action {symbol} a atteint votre seuil : ${price}")
+    msg['Subject'] = f'Alerte de prix {symbol} !'
+    msg['From'] = sender
+    msg['To'] = email
+    return msg
+
+
+class MailDispatcher:
+    """
+    File d'envoi d'e-mails asynchrone.
+
+    Des threads d'envoi consomment la file ; chacun conserve sa propre session SMTP
+    authentifiée (le pool de connexions a donc la taille du nombre de threads) et
+    envoie les rafales par lots sur cette même connexion. Les échecs transitoires
+    sont retentés avec un délai exponentiel, après reconnexion.
+    """
+
+    def __init__(self, host, port, username=None, password=None, sender=None, workers=2,
+                 batch_size=20, max_retries=3, backoff=1.0, use_starttls=True,
+                 idle_timeout=30.0, maxsize=1000, timeout=10.0):
+        self.host = host
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.sender = sender or username
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.use_starttls = use_starttls
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.connections = 0
+
+    def _count(self, counter):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def submit(self, email, price, symbol="AAPL"):
+        """
+        Met une alerte en file d'envoi sans bloquer.
+
+        Retourne:
+            bool: False si la file est pleine.
+        """
+        try:
+            self._queue.put_nowait((email, price, symbol))
+            return True
+        except queue.Full:
+            logging.error(f"File d'envoi pleine, alerte pour {email} refusée.")
+            return False
+
+    def _connect(self):
+        with span("smtp.connect"):
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            server.ehlo()
+            if self.use_starttls:
+                server.starttls()
+                server.ehlo()
+            if self.username:
+                server.login(self.username, self.password)
+        self._count("connections")
+        return server
+
+    @staticmethod
+    def _close(server):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _send(self, server, email, price, symbol):
+        """Envoie un message, en rouvrant la session si nécessaire. Retourne la session à réutiliser."""
+        message = build_alert_message(self.sender, email, price, symbol).as_string()
+        for attempt in range(self.max_retries + 1):
+            try:
+                if server is None:
+                    server = self._connect()
+                with span("smtp.send"):
+                    server.sendmail(self.sender, [email], message)
+                self._count("sent")
+                return server
+            except smtplib.SMTPRecipientsRefused as e:
+                # Erreur permanente : inutile de retenter
+                logging.error(f"Destinataire refusé {email} : {e}")
+                break
+            except (smtplib.SMTPException, OSError) as e:
+                self._close(server)
+                server = None
+                if attempt == self.max_retries:
+                    logging.error(f"Échec de l'envoi de l'e-mail à {email} après {attempt + 1} tentatives : {e}")
+                    break
+                self._count("retries")
+                self._stop.wait(self.backoff * 2 ** attempt)
+        self._count("failed")
+        return server
+
+    def _worker(self):
+        server = None
+        while True:
+            try:
+                job = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                # Session inactive : on la ferme pour ne pas garder de connexion inutile
+                self._close(server)
+                server = None
+                if self._stop.is_set():
+                    return
+                continue
+            if job is None:
+                self._queue.task_done()
+                self._close(server)
+                return
+
+            # Rafale : on vide la file (jusqu'à batch_size messages) sur la même connexion
+            batch = [job]
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    # Signal d'arrêt : remis en file pour être traité après le lot
+                    self._queue.task_done()
+                    self._queue.put(None)
+                    break
+                batch.append(job)
+            for email, price, symbol in batch:
+                server = self._send(server, email, price, symbol)
+            for _ in batch:
+                self._queue.task_done()
+
+    def start(self):
+        """
+        Démarre les threads d'envoi.
+        """
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"mail-dispatcher-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=10.0):
+        """
+        Envoie les messages restants puis arrête les threads.
+        """
+        self._stop.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        self._threads = []
+
+    def join(self):
+        """
+        Attend que tous les messages en file aient été traités.
+        """
+        self._queue.join()
+
+    def stats(self):
+        """
+        Retourne les compteurs d'envoi.
+        """
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "sent": self.sent,
+                "failed": self.failed,
+                "retries": self.retries,
+                "connections": self.connections,
+            }
+
+
+_dispatcher = None
+_dispatcher_pid = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_mail_dispatcher():
+    """
+    Retourne la file d'envoi du processus, créée et démarrée au premier appel
+    (et recréée après un fork, les threads n'étant pas hérités).
+    """
+    global _dispatcher, _dispatcher_pid
+    if _dispatcher is None or _dispatcher_pid != os.getpid():
+        with _dispatcher_lock:
+            if _dispatcher is None or _dispatcher_pid != os.getpid():
+                _dispatcher = MailDispatcher(
+                    os.getenv("SMTP_SERVER"),
+                    os.getenv("SMTP_PORT"),
+                    username=os.getenv("SMTP_EMAIL"),
+                    password=os.getenv("SMTP_PASSWORD"),
+                    workers=int(os.getenv("SMTP_WORKERS", "2")),
+                    use_starttls=os.getenv("SMTP_STARTTLS", "1") == "1",
+                )
+                _dispatcher.start()
+                _dispatcher_pid = os.getpid()
+    return _dispatcher
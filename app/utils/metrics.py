@@ -1,9 +1,40 @@
-import yfinance as yf
 import logging
+import os
+from app.utils.cache import TTLCache
+from app.utils.instrumentation import span
+from app.utils.quotes import UPSTREAM_TIMEOUT
+from app.utils.singleflight import coalesce
+
+# Les métriques changent au plus une fois par jour : elles sont servies depuis un cache
+# par symbole, rafraîchi en arrière-plan une fois la durée de vie écoulée.
+metrics_cache = TTLCache(
+    ttl=int(os.getenv("METRICS_CACHE_TTL", "3600")),
+    maxsize=int(os.getenv("METRICS_CACHE_SIZE", "256")),
+    name="financial_metrics",
+)
+
 
 def get_financial_metrics(stock_symbol):
+    """
+    Retourne les métriques financières d'un symbole depuis le cache (voir `fetch_financial_metrics`).
+
+    Paramètres:
+        stock_symbol (str): Le symbole boursier (exemple : 'AAPL' pour Apple).
+
+    Retourne:
+        dict: Un dictionnaire contenant les métriques financières du jour précédent.
+
+    Raises:
+        RuntimeError: En cas d'erreur lors de la récupération des données (absentes du cache).
+    """
+    return metrics_cache.get(stock_symbol, lambda: fetch_financial_metrics(stock_symbol))
+
+
+@coalesce("yfinance.metrics", timeout=UPSTREAM_TIMEOUT * 2)
+def fetch_financial_metrics(stock_symbol):
     """
     Récupère les métriques financières clés pour un symbole boursier spécifique.
+    Les appels simultanés pour un même symbole partagent un seul téléchargement.
 
     Paramètres:
         stock_symbol (str): Le symbole boursier (exemple : 'AAPL' pour Apple).
@@ -15,11 +46,14 @@ def get_financial_metrics(stock_symbol):
         RuntimeError: En cas d'erreur lors de la récupération des données.
     """
     try:
-        # Initialisation de l'objet Ticker
+        # Initialisation de l'objet Ticker (yfinance n'est importé qu'à la première utilisation)
+        import yfinance as yf
+
         stock = yf.Ticker(stock_symbol)
 
         # Récupération des informations de base
-        info = stock.info
+        with span("yfinance.info"):
+            info = stock.info
 
         # Extraction des métriques financières importantes
         metrics = {
@@ -33,7 +67,8 @@ def get_financial_metrics(stock_symbol):
         logging.info(f"Métriques actuelles pour {stock_symbol} : {metrics}")
 
         # Récupérer les données historiques pour les 5 derniers jours
-        historical_data = stock.history(period="5d")  # Getting data for the last 5 days
+        with span("yfinance.history"):
+            historical_data = stock.history(period="5d")  # Getting data for the last 5 days
 
         # Log des données historiques
         logging.info(f"Données historiques pour {stock_symbol} :\n{historical_data}")
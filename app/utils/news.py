@@ -1,27 +1,243 @@
-import yfinance as yf
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from app.utils.instrumentation import span
+from app.utils.quotes import UPSTREAM_TIMEOUT
+from app.utils.singleflight import coalesce
+
+# Délai (en secondes) au-delà duquel les actualités d'un symbole sont redemandées à Yahoo
+NEWS_REFRESH_INTERVAL = float(os.getenv("NEWS_REFRESH_INTERVAL", "300"))
+
+# Nombre maximal d'actualités conservées par symbole (les plus anciennes sont oubliées)
+NEWS_MAX_ITEMS = 200
+
+# Champs disponibles pour chaque actualité, et ceux retournés par défaut par /news
+NEWS_FIELDS = ("uuid", "title", "link", "publisher", "time", "thumbnail")
+DEFAULT_NEWS_FIELDS = ("title", "link", "publisher", "time")
+
+
+@coalesce("yfinance.news", timeout=UPSTREAM_TIMEOUT)
+def fetch_news(stock_symbol):
+    """
+    Récupère les actualités d'un symbole via Yahoo Finance (liste vide si aucune).
+    Les appels simultanés pour un même symbole partagent un seul téléchargement.
+    """
+    import yfinance as yf
+
+    with span("yfinance.news"):
+        return yf.Ticker(stock_symbol).news or []
+
+def _publish_time(value):
+    # Ancien format : timestamp UNIX ; nouveau format : date ISO 8601 (« 2025-01-02T14:30:00Z »)
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value:
+        try:
+            return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+        except ValueError:
+            return None
+    return None
+
+
+def _small_thumbnail(thumbnail):
+    # Plus petite résolution disponible (les vignettes de la page font 60 px)
+    resolutions = (thumbnail or {}).get("resolutions") or []
+    sized = [r for r in resolutions if r.get("url") and r.get("width")]
+    if sized:
+        return min(sized, key=lambda r: r["width"])["url"]
+    return (thumbnail or {}).get("originalUrl") or (resolutions[0].get("url") if resolutions else None)
+
+
+def normalize_news_item(item):
+    """
+    Réduit une actualité Yahoo Finance aux champs utilisés par l'application.
+
+    Deux formats sont pris en charge : l'ancien (uuid, title, link, publisher, providerPublishTime)
+    et le nouveau, où les champs sont imbriqués sous `content` (id, pubDate, provider, canonicalUrl).
+
+    Retourne:
+        dict: {"uuid", "title", "link", "publisher", "time", "thumbnail"}, ou None si l'actualité
+              n'a ni identifiant ni date de publication.
+    """
+    content = item.get("content")
+    if isinstance(content, dict):
+        link = (content.get("canonicalUrl") or {}).get("url") or (content.get("clickThroughUrl") or {}).get("url")
+        normalized = {
+            "uuid": item.get("id") or content.get("id"),
+            "title": content.get("title"),
+            "link": link,
+            "publisher": (content.get("provider") or {}).get("displayName"),
+            "time": _publish_time(content.get("pubDate") or content.get("displayTime")),
+            "thumbnail": _small_thumbnail(content.get("thumbnail")),
+        }
+    else:
+        thumbnail = item.get("thumbnail")
+        normalized = {
+            "uuid": item.get("uuid"),
+            "title": item.get("title"),
+            "link": item.get("link"),
+            "publisher": item.get("publisher"),
+            "time": _publish_time(item.get("providerPublishTime", item.get("time"))),
+            # Une actualité déjà normalisée porte directement l'URL de sa vignette
+            "thumbnail": thumbnail if isinstance(thumbnail, str) else _small_thumbnail(thumbnail),
+        }
+    if not normalized["uuid"] or normalized["time"] is None:
+        return None
+    return normalized
+
+
+class NewsCache:
+    """
+    Actualités par symbole, dédoublonnées par uuid et triées de la plus récente à la plus ancienne.
+
+    Les nouvelles actualités sont fusionnées au fil des rafraîchissements : une actualité déjà connue
+    n'est pas dupliquée et celles qui ont disparu du flux Yahoo restent consultables (dans la limite
+    de `max_items` par symbole). Les réponses ne contiennent que les champs demandés.
+
+    Paramètres:
+        fetch (callable): Fonction qui télécharge les actualités brutes d'un symbole.
+        refresh_interval (float): Âge maximal des actualités avant un nouveau téléchargement, en secondes.
+        max_items (int): Nombre maximal d'actualités conservées par symbole.
+    """
+
+    def __init__(self, fetch=None, refresh_interval=NEWS_REFRESH_INTERVAL, max_items=NEWS_MAX_ITEMS):
+        self.fetch = fetch or fetch_news
+        self.refresh_interval = refresh_interval
+        self.max_items = max_items
+        self._items = {}
+        self._uuids = {}
+        self._refreshed_at = {}
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def merge(self, symbol, raw_items):
+        """
+        Ajoute les actualités encore inconnues d'un symbole.
+
+        Retourne:
+            int: Le nombre d'actualités ajoutées.
+        """
+        with self._lock:
+            # La même liste (instantané du collecteur inchangé) n'est pas parcourue deux fois
+            if self._sources.get(symbol) is raw_items:
+                return 0
+            self._sources[symbol] = raw_items
+            self._refreshed_at[symbol] = time.monotonic()
+            uuids = self._uuids.setdefault(symbol, set())
+            added = []
+            for raw in raw_items or []:
+                item = normalize_news_item(raw)
+                if item is not None and item["uuid"] not in uuids:
+                    uuids.add(item["uuid"])
+                    added.append(item)
+            if added:
+                items = sorted(self._items.get(symbol, []) + added, key=lambda i: (i["time"], i["uuid"]),
+                               reverse=True)
+                for dropped in items[self.max_items:]:
+                    uuids.discard(dropped["uuid"])
+                self._items[symbol] = items[:self.max_items]
+            return len(added)
+
+    def refresh(self, symbol):
+        """
+        Télécharge les actualités d'un symbole si la dernière tentative date de plus de `refresh_interval`.
+        Un échec compte comme une tentative : pendant une panne de Yahoo, les actualités déjà
+        connues sont servies sans nouvel appel jusqu'à la fin de l'intervalle.
+
+        Raises:
+            Exception: L'erreur du téléchargement, si aucune actualité n'est encore connue pour ce symbole.
+        """
+        attempted_at = self._refreshed_at.get(symbol)
+        if attempted_at is not None and time.monotonic() - attempted_at < self.refresh_interval:
+            return 0
+        try:
+            raw_items = self.fetch(symbol)
+        except Exception as e:
+            self._refreshed_at[symbol] = time.monotonic()
+            logging.error(f"Actualités {symbol} indisponibles, nouvel essai dans {self.refresh_interval:.0f}s : {e}")
+            if symbol not in self._items:
+                raise
+            return 0
+        return self.merge(symbol, raw_items)
+
+    def page(self, symbol, since=None, before=None, limit=20, fields=DEFAULT_NEWS_FIELDS):
+        """
+        Retourne une page d'actualités, de la plus récente à la plus ancienne.
+
+        Paramètres:
+            since (int): Ne retourne que les actualités publiées après ce timestamp (exclu).
+            before (int): Ne retourne que les actualités publiées avant ce timestamp (exclu).
+            limit (int): Nombre maximal d'actualités ; la page est prolongée pour ne pas couper
+                         un groupe d'actualités publiées à la même seconde.
+            fields (tuple): Champs conservés pour chaque actualité.
+
+        Retourne:
+            dict: {"news": [...], "latest": timestamp de l'actualité la plus récente du symbole,
+                   "next_before": curseur de la page suivante (None si c'est la dernière)}
+        """
+        with self._lock:
+            items = self._items.get(symbol, [])
+        selected = [i for i in items
+                    if (since is None or i["time"] > since) and (before is None or i["time"] < before)]
+        end = min(limit, len(selected))
+        while 0 < end < len(selected) and selected[end]["time"] == selected[end - 1]["time"]:
+            end += 1
+        return {
+            "news": [{field: item[field] for field in fields} for item in selected[:end]],
+            "latest": items[0]["time"] if items else None,
+            "next_before": selected[end - 1]["time"] if end < len(selected) else None,
+        }
+
+    def latest(self, symbol, limit, fields=NEWS_FIELDS):
+        """
+        Retourne les `limit` actualités les plus récentes d'un symbole.
+        """
+        return self.page(symbol, limit=limit, fields=fields)["news"]
+
+    def stats(self):
+        with self._lock:
+            return {symbol: len(items) for symbol, items in self._items.items()}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_news_cache():
+    """
+    Retourne le cache d'actualités du processus.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = NewsCache()
+    return _cache
+
 
 def get_apple_news():
     """
-    Récupère les actualités récentes concernant l'action Apple (AAPL) via l'API Yahoo Finance.
+    Récupère les actualités récentes concernant l'action Apple (AAPL) via le cache d'actualités.
 
     Retourne:
         list: Une liste contenant les actualités relatives à Apple, où chaque élément est un dictionnaire
-              avec des informations telles que le titre, le lien, la source et la date de publication.
+              avec le titre, le lien, la source et la date de publication (timestamp UNIX).
 
     Raises:
         RuntimeError: Si aucune actualité n'est trouvée ou en cas d'erreur lors de la récupération.
     """
     try:
-        # Initialisation de l'objet Ticker pour le symbole Apple (AAPL)
-        stock = yf.Ticker("AAPL")
-        
-        # Récupération des données d'actualités liées à l'action
-        news_data = stock.news
-        
+        cache = get_news_cache()
+        cache.refresh("AAPL")
+        news_data = cache.latest("AAPL", NEWS_MAX_ITEMS, fields=DEFAULT_NEWS_FIELDS)
+
         # Vérification que des données ont été récupérées
-        if not news_data or len(news_data) == 0:
+        if not news_data:
             raise ValueError("Aucune actualité disponible pour l'action AAPL.")
-        
+
         return news_data
     except Exception as e:
         # Gestion des erreurs, renvoie une exception détaillée
@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from app.models.lstm import MAX_HORIZON, forecast, model_path_for, prediction_key
+from app.models.registry import get_model_registry, ModelNotAvailableError
+from app.utils.alerts import get_alert_engine
+from app.utils.leader import LeaderThread
+from app.utils.metrics import fetch_financial_metrics
+from app.utils.news import fetch_news
+from app.utils.price_store import get_price_store, period_to_start
+from app.utils.quotes import WATCHLIST, UPSTREAM_TIMEOUT, get_watchlist_quotes, run_concurrently
+from app.utils.scraper2 import get_recent_closes
+
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "data/market_snapshot.json")
+POLLER_INTERVAL = float(os.getenv("POLLER_INTERVAL", "60"))
+# Au-delà de cet âge, l'instantané est ignoré et les routes interrogent Yahoo directement
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE", str(POLLER_INTERVAL * 5)))
+NEWS_SYMBOLS = ["AAPL"]
+PREDICTION_SYMBOLS = ["AAPL"]
+
+
+def write_snapshot(snapshot, path=SNAPSHOT_PATH):
+    """
+    Publie l'instantané de façon atomique : les lecteurs voient l'ancien ou le nouveau fichier, jamais un fichier partiel.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, path)
+
+
+class SnapshotReader:
+    """
+    Lecture de l'instantané publié par le collecteur.
+
+    Le fichier n'est relu que lorsqu'il change (un simple `stat` par appel) :
+    les handlers obtiennent le dictionnaire déjà décodé en O(1). Il est partagé
+    entre les threads et ne doit pas être modifié.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH, max_age=SNAPSHOT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._signature = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Retourne l'instantané courant, ou None s'il est absent ou trop ancien.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    try:
+                        with open(self.path) as f:
+                            self._snapshot = json.load(f)
+                        self._signature = signature
+                    except (OSError, ValueError) as e:
+                        logging.error(f"Instantané illisible {self.path} : {e}")
+                        return None
+        snapshot = self._snapshot
+        if snapshot is None or time.time() - snapshot["generated_at"] > self.max_age:
+            return None
+        return snapshot
+
+
+class MarketDataPoller(LeaderThread):
+    """
+    Collecteur en arrière-plan : rafraîchit cours, clôtures récentes, métriques et
+    actualités d'un ensemble de symboles, et publie un instantané dans un fichier local.
+
+    Chaque worker démarre un collecteur, mais un verrou de fichier garantit qu'un seul
+    par machine interroge Yahoo ; les autres restent en attente et prennent le relais
+    si le processus détenteur du verrou s'arrête (voir app/utils/leader.py).
+    """
+
+    thread_name = "market-data-poller"
+
+    def __init__(self, symbols=None, snapshot_path=SNAPSHOT_PATH, interval=POLLER_INTERVAL, news_symbols=None,
+                 prediction_symbols=None):
+        self.symbols = symbols or WATCHLIST
+        self.news_symbols = news_symbols or NEWS_SYMBOLS
+        self.prediction_symbols = prediction_symbols or PREDICTION_SYMBOLS
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self._previous = None
+        super().__init__(f"{snapshot_path}.lock")
+
+    def _recent_closes(self, stock_symbol):
+        store = get_price_store()
+        # Force la vérification de la fin de l'historique : les routes n'ont plus à le faire
+        store.sync(stock_symbol, period_to_start("3mo"), force=True)
+        return get_recent_closes(stock_symbol)
+
+    def _news(self, stock_symbol):
+        return fetch_news(stock_symbol)
+
+    def _evaluate_alerts(self, quotes):
+        # Seul le collecteur de la machine reçoit les cours : chaque alerte est déclenchée une fois
+        get_alert_engine().check(quotes)
+
+    def _prediction(self, stock_symbol, recent_closes, previous):
+        # Recalculée seulement quand la dernière barre ou le modèle change : une fois par clôture
+        try:
+            handle = get_model_registry(model_path_for(stock_symbol)).get()
+        except ModelNotAvailableError:
+            return None
+        key = prediction_key(stock_symbol, recent_closes, handle.version)
+        if previous and tuple(previous.get("key", ())) == key:
+            return previous
+        return {"key": list(key), "predictions": forecast(handle.model, recent_closes["prices"], MAX_HORIZON)}
+
+    def refresh(self):
+        """
+        Construit et publie un nouvel instantané. Les éléments dont la récupération
+        échoue conservent leur valeur de l'instantané précédent.
+
+        Retourne:
+            dict: L'instantané publié.
+        """
+        # Au démarrage (ou après reprise du verrou), on repart du dernier instantané publié
+        previous = self._previous or SnapshotReader(self.snapshot_path, max_age=float("inf")).get() \
+            or {"symbols": {}, "news": {}}
+        quotes = get_watchlist_quotes(self.symbols, timeout=UPSTREAM_TIMEOUT)
+        self._evaluate_alerts(quotes)
+        closes = run_concurrently(self._recent_closes, self.symbols, timeout=UPSTREAM_TIMEOUT * 2)
+        metrics = run_concurrently(fetch_financial_metrics, self.symbols, timeout=UPSTREAM_TIMEOUT * 2)
+        news = run_concurrently(self._news, self.news_symbols, timeout=UPSTREAM_TIMEOUT)
+
+        symbols = {}
+        for symbol in self.symbols:
+            old = previous["symbols"].get(symbol, {})
+            symbols[symbol] = {
+                "price": quotes.get(symbol, old.get("price")),
+                "recent_closes": closes.get(symbol, old.get("recent_closes")),
+                "metrics": metrics.get(symbol, old.get("metrics")),
+                "prediction": old.get("prediction"),
+            }
+            if symbol in self.prediction_symbols and (symbols[symbol]["recent_closes"] or {}).get("prices"):
+                try:
+                    symbols[symbol]["prediction"] = self._prediction(
+                        symbol, symbols[symbol]["recent_closes"], old.get("prediction"))
+                except Exception as e:
+                    logging.error(f"Échec du précalcul de la prédiction pour {symbol} : {e}")
+        snapshot = {
+            "generated_at": time.time(),
+            "symbols": symbols,
+            "news": {symbol: news.get(symbol, previous["news"].get(symbol, [])) for symbol in self.news_symbols},
+        }
+        write_snapshot(snapshot, self.snapshot_path)
+        self._previous = snapshot
+        return snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._acquire_leadership():
+                start = time.monotonic()
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logging.error(f"Échec de la collecte des données de marché : {e}")
+                self._stop.wait(max(self.interval - (time.monotonic() - start), 0))
+            else:
+                # Un autre processus collecte déjà : on retente plus tard
+                self._stop.wait(self.interval)
+
+
+snapshot_reader = SnapshotReader()
+
+
+def get_snapshot():
+    """
+    Retourne l'instantané de marché courant, ou None s'il est indisponible ou trop ancien.
+    """
+    return snapshot_reader.get()
@@ -0,0 +1,222 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app.utils.instrumentation import span
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Date de départ utilisée lorsque l'historique complet est demandé (period="max")
+EARLIEST_DATE = "1980-01-01"
+
+
+def period_to_start(period, today=None):
+    """
+    Convertit une période yfinance ('5d', '3mo', '5y', 'ytd', 'max') en date de début.
+
+    Paramètres:
+        period (str): La période au format yfinance.
+        today (datetime): Date de référence (aujourd'hui par défaut).
+
+    Retourne:
+        str: La date de début (format 'YYYY-MM-DD').
+
+    Raises:
+        ValueError: Si la période n'est pas reconnue.
+    """
+    today = today or datetime.now()
+    if period == "max":
+        return EARLIEST_DATE
+    if period == "ytd":
+        return f"{today.year}-01-01"
+    if period.endswith("d"):
+        # Les jours de bourse excluent les week-ends et jours fériés : on prend une marge
+        start = today - timedelta(days=int(period[:-1]) * 2 + 7)
+    elif period.endswith("mo"):
+        start = today - pd.DateOffset(months=int(period[:-2]))
+    elif period.endswith("y"):
+        start = today - pd.DateOffset(years=int(period[:-1]))
+    else:
+        raise ValueError(f"Période non reconnue : {period}")
+    return start.strftime('%Y-%m-%d')
+
+
+def fetch_daily_bars(stock_symbol, start, end=None):
+    """
+    Télécharge les barres journalières OHLCV depuis Yahoo Finance.
+
+    Paramètres:
+        stock_symbol (str): Le symbole boursier.
+        start (str): Date de début incluse (format 'YYYY-MM-DD').
+        end (str): Date de fin exclue (format 'YYYY-MM-DD'), aujourd'hui inclus si None.
+
+    Retourne:
+        pd.DataFrame: Les barres, indexées par date, avec les colonnes OHLCV et 'Stock Splits'.
+    """
+    import yfinance as yf
+
+    with span("yfinance.history"):
+        return yf.Ticker(stock_symbol).history(start=start, end=end, interval="1d")
+
+
+class PriceStore:
+    """
+    Stockage local (SQLite) des barres journalières OHLCV par symbole.
+
+    Seule la fin manquante de l'historique (depuis la dernière barre stockée) est
+    téléchargée ; les requêtes par plage sont ensuite servies depuis le disque.
+    """
+
+    def __init__(self, path, fetcher=fetch_daily_bars, refresh_interval=900):
+        self.path = path
+        self.fetcher = fetcher
+        self.refresh_interval = refresh_interval
+        self._local = threading.local()
+        self._symbol_locks = {}
+        self._locks_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS bars (
+                    symbol TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    open REAL, high REAL, low REAL, close REAL, volume REAL,
+                    PRIMARY KEY (symbol, date)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS coverage (
+                    symbol TEXT PRIMARY KEY,
+                    first_date TEXT NOT NULL,
+                    last_date TEXT NOT NULL,
+                    checked_at REAL NOT NULL
+                );
+            """)
+
+    def _connection(self):
+        # Une connexion par thread ; le mode WAL permet aux workers de lire pendant une écriture
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _symbol_lock(self, stock_symbol):
+        with self._locks_lock:
+            return self._symbol_locks.setdefault(stock_symbol, threading.Lock())
+
+    def _coverage(self, stock_symbol):
+        return self._connection().execute(
+            "SELECT first_date, last_date, checked_at FROM coverage WHERE symbol = ?", (stock_symbol,)
+        ).fetchone()
+
+    def _store(self, stock_symbol, bars, first_date, replace_all=False):
+        conn = self._connection()
+        rows = []
+        if not bars.empty:
+            dates = bars.index.strftime('%Y-%m-%d')
+            values = bars[COLUMNS].to_numpy(dtype=float)
+            rows = [(stock_symbol, date, *row) for date, row in zip(dates, values.tolist())]
+        with conn:
+            if replace_all:
+                conn.execute("DELETE FROM bars WHERE symbol = ?", (stock_symbol,))
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            last_date = conn.execute(
+                "SELECT MAX(date) FROM bars WHERE symbol = ?", (stock_symbol,)
+            ).fetchone()[0] or first_date
+            conn.execute(
+                "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)",
+                (stock_symbol, first_date, last_date, time.time()),
+            )
+
+    def sync(self, stock_symbol, start, force=False):
+        """
+        Complète le stockage local pour couvrir `start` jusqu'à aujourd'hui.
+
+        Paramètres:
+            stock_symbol (str): Le symbole boursier.
+            start (str): Date de début souhaitée (format 'YYYY-MM-DD').
+            force (bool): Vérifie la fin de l'historique même si la dernière vérification est récente.
+        """
+        with self._symbol_lock(stock_symbol):
+            coverage = self._coverage(stock_symbol)
+            if coverage is None:
+                self._store(stock_symbol, self.fetcher(stock_symbol, start), start)
+                return
+
+            first_date, last_date, checked_at = coverage
+            if start < first_date:
+                # Début d'historique manquant
+                self._store(stock_symbol, self.fetcher(stock_symbol, start, first_date), start)
+                first_date = start
+
+            if force or time.time() - checked_at >= self.refresh_interval:
+                # Fin manquante : on repart de la dernière barre, qui peut être une séance en cours
+                tail = self.fetcher(stock_symbol, last_date)
+                splits = tail.get("Stock Splits")
+                if splits is not None and (splits.loc[tail.index.strftime('%Y-%m-%d') > last_date] != 0).any():
+                    # Un split rend les prix ajustés déjà stockés obsolètes : on recharge tout
+                    logging.info(f"Split détecté pour {stock_symbol}, rechargement de l'historique.")
+                    self._store(stock_symbol, self.fetcher(stock_symbol, first_date), first_date, replace_all=True)
+                else:
+                    self._store(stock_symbol, tail, first_date)
+
+    def history(self, stock_symbol, start=None, end=None, period=None):
+        """
+        Retourne les barres journalières d'un symbole, servies depuis le stockage local.
+
+        Paramètres:
+            stock_symbol (str): Le symbole boursier.
+            start (str): Date de début incluse (format 'YYYY-MM-DD').
+            end (str): Date de fin exclue (format 'YYYY-MM-DD'), aujourd'hui inclus si None.
+            period (str): Période yfinance ('5d', '3mo', '5y'...) utilisée si `start` est absent.
+
+        Retourne:
+            pd.DataFrame: Les barres OHLCV indexées par date (DatetimeIndex).
+        """
+        period = period or "5y"
+        query_start = start or period_to_start(period)
+        try:
+            self.sync(stock_symbol, query_start)
+        except Exception as e:
+            # Yahoo indisponible : on sert ce qui est déjà stocké
+            if self._coverage(stock_symbol) is None:
+                raise
+            logging.error(f"Échec de la mise à jour des prix pour {stock_symbol}, données locales servies : {e}")
+
+        sql = "SELECT date, open, high, low, close, volume FROM bars WHERE symbol = ? AND date >= ?"
+        params = [stock_symbol, query_start]
+        if end:
+            sql += " AND date < ?"
+            params.append(end)
+        rows = self._connection().execute(sql + " ORDER BY date", params).fetchall()
+
+        data = pd.DataFrame(rows, columns=["Date"] + COLUMNS)
+        data.index = pd.DatetimeIndex(pd.to_datetime(data.pop("Date")), name="Date")
+        if not start and period.endswith("d"):
+            # Une période en jours désigne des jours de bourse, comme dans yfinance
+            data = data.tail(int(period[:-1]))
+        return data
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """
+    Retourne le stockage de prix du processus (chemin configurable via PRICE_STORE_PATH).
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceStore(os.getenv("PRICE_STORE_PATH", "data/prices.sqlite3"))
+    return _store
@@ -0,0 +1,119 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from app.utils.instrumentation import span
+
+# Symboles suivis (page investisseur, collecte en arrière-plan) et délai maximal des appels à Yahoo Finance
+WATCHLIST = [symbol.strip().upper() for symbol in
+             os.getenv("WATCHLIST", "AAPL,GOOGL,MSFT,TSLA,AMZN,NFLX,META,NVDA").split(",") if symbol.strip()]
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "5"))
+
+# Pool borné partagé par les requêtes pour les appels qui ne peuvent pas être groupés
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("UPSTREAM_MAX_WORKERS", "8")),
+                               thread_name_prefix="upstream")
+
+
+def submit(fn, *args):
+    """
+    Soumet un appel au pool partagé et retourne son `Future`.
+    """
+    return _executor.submit(fn, *args)
+
+
+def result_or_default(future, timeout=5.0, default=None, label=""):
+    """
+    Attend le résultat d'un `Future` au plus `timeout` secondes ; retourne `default` en cas d'erreur ou de délai.
+    """
+    try:
+        return future.result(timeout=timeout)
+    except Exception as e:
+        future.cancel()
+        logging.error(f"Erreur ou délai dépassé pour {label} : {e!r}")
+        return default
+
+
+def run_concurrently(fn, items, timeout=5.0):
+    """
+    Exécute `fn(item)` pour chaque élément dans le pool partagé, avec un délai global.
+
+    Les appels en erreur ou trop lents sont journalisés et absents du résultat :
+    l'appelant peut afficher des résultats partiels au lieu de bloquer.
+
+    Paramètres:
+        fn (callable): Fonction appelée avec un élément.
+        items (iterable): Les éléments à traiter.
+        timeout (float): Délai maximal d'attente, en secondes, pour l'ensemble des appels.
+
+    Retourne:
+        dict: {élément: résultat} pour les appels terminés avec succès.
+    """
+    futures = {submit(fn, item): item for item in items}
+    done, not_done = wait(futures, timeout=timeout)
+    results = {}
+    for future in done:
+        item = futures[future]
+        try:
+            results[item] = future.result()
+        except Exception as e:
+            logging.error(f"Erreur lors de la récupération des données pour {item} : {e}")
+    for future in not_done:
+        future.cancel()
+        logging.error(f"Délai dépassé ({timeout}s) pour {futures[future]}")
+    return results
+
+
+def get_quotes(symbols):
+    """
+    Récupère en un seul appel groupé le dernier cours de clôture de plusieurs symboles.
+
+    Paramètres:
+        symbols (list): Les symboles boursiers.
+
+    Retourne:
+        dict: {symbole: dernier cours} pour les symboles disponibles.
+    """
+    import yfinance as yf
+
+    with span("yfinance.download"):
+        data = yf.download(list(symbols), period="5d", interval="1d", group_by="column",
+                           progress=False, threads=True, auto_adjust=True)
+    if data.empty:
+        return {}
+    closes = data["Close"]
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(symbols[0])
+    last = closes.ffill().iloc[-1].dropna()
+    return {symbol: float(price) for symbol, price in last.items()}
+
+
+def get_last_price(stock_symbol):
+    """
+    Récupère le dernier cours de clôture d'un symbole (appel individuel).
+    """
+    import yfinance as yf
+
+    with span("yfinance.history"):
+        history = yf.Ticker(stock_symbol).history(period="1d")
+    return float(history['Close'].iloc[-1])
+
+
+def get_watchlist_quotes(symbols, timeout=5.0):
+    """
+    Récupère les cours d'une liste de symboles : un appel groupé, puis des appels
+    individuels en parallèle pour les symboles absents de la réponse groupée.
+
+    Paramètres:
+        symbols (list): Les symboles boursiers.
+        timeout (float): Délai maximal pour chaque phase, en secondes.
+
+    Retourne:
+        dict: {symbole: dernier cours} (partiel si certains appels échouent).
+    """
+    quotes = result_or_default(submit(get_quotes, symbols), timeout, default={}, label="cours groupés")
+    missing = [symbol for symbol in symbols if symbol not in quotes]
+    if missing:
+        quotes.update(run_concurrently(get_last_price, missing, timeout=timeout))
+    return quotes
@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import Storage
+
+# Compteurs partagés par tous les workers de la machine (URI au format de SQLAlchemy :
+# sqlite:///chemin/relatif ou sqlite:////chemin/absolu)
+RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "sqlite:///data/ratelimit.sqlite3")
+
+# Fréquence (en vérifications par connexion) de la suppression des compteurs expirés
+PURGE_EVERY = 10000
+
+# Une seule instruction par vérification : le compteur est remis à zéro si sa fenêtre est écoulée,
+# sinon incrémenté, et sa nouvelle valeur retournée
+_INCR = """
+    INSERT INTO counters (key, count, expires_at) VALUES (:key, :amount, :expires_at)
+    ON CONFLICT (key) DO UPDATE SET
+        count = CASE WHEN expires_at <= :now THEN :amount ELSE count + :amount END,
+        expires_at = CASE WHEN expires_at <= :now OR :elastic THEN :expires_at ELSE expires_at END
+    RETURNING count
+"""
+
+
+class SQLiteStorage(Storage):
+    """
+    Stockage des compteurs de Flask-Limiter dans une base SQLite en mode WAL, partagée
+    par les workers gunicorn d'une même machine sans service externe.
+
+    Chaque vérification est une seule instruction UPSERT ... RETURNING en autocommit,
+    sans synchronisation disque (des compteurs perdus en cas de panne n'ont pas d'importance).
+    Stratégie prise en charge : fenêtre fixe (celle de Flask-Limiter par défaut).
+    """
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri.split("://", 1)[1][1:]
+        self._local = threading.local()
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # Une connexion par thread, ouverte à la première vérification et rouverte après un fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters "
+                         "(key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID")
+            self._local.conn, self._local.pid, self._local.calls = conn, os.getpid(), 0
+        return conn
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        now = time.time()
+        conn = self._connection()
+        self._local.calls += 1
+        if self._local.calls % PURGE_EVERY == 0:
+            # Une clé par client et par limite : les compteurs expirés sont supprimés de temps en temps
+            conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+        return conn.execute(_INCR, {"key": key, "amount": amount, "now": now,
+                                     "expires_at": now + expiry, "elastic": elastic_expiry}).fetchone()[0]
+
+    def get(self, key):
+        row = self._connection().execute("SELECT count FROM counters WHERE key = ? AND expires_at > ?",
+                                          (key, time.time())).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connection().execute("SELECT expires_at FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self):
+        try:
+            self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self._connection().execute("DELETE FROM counters").rowcount
+
+    def clear(self, key):
+        self._connection().execute("DELETE FROM counters WHERE key = ?", (key,))
@@ -1,10 +1,44 @@
-import yfinance as yf
+import os
 from datetime import datetime, timedelta
 
+from app.utils.aggregation import aggregate_prices
+from app.utils.cache import TTLCache
+from app.utils.downsample import lttb_indices
+from app.utils.instrumentation import span
+from app.utils.price_store import get_price_store
+from app.utils.quotes import UPSTREAM_TIMEOUT
+from app.utils.singleflight import coalesce
+
+# Intervalles des séries de graphiques : barres journalières, ou agrégées (dernière clôture de la période)
+CHART_INTERVALS = {"1d": None, "1wk": "W", "1mo": "M"}
+
+# Séries de graphiques déjà réduites, par (symbole, plage, intervalle, nombre de points)
+history_cache = TTLCache(
+    ttl=int(os.getenv("HISTORY_CACHE_TTL", "900")),
+    maxsize=int(os.getenv("HISTORY_CACHE_SIZE", "512")),
+    name="chart_history",
+)
+
+
+@coalesce("yfinance.history", timeout=UPSTREAM_TIMEOUT * 2)
+def fetch_history(stock_symbol, period="5y", interval="1d", start_date=None, end_date=None):
+    """
+    Télécharge les barres d'un symbole depuis Yahoo Finance. Les appels simultanés avec les
+    mêmes arguments partagent un seul téléchargement (le DataFrame retourné ne doit pas être modifié).
+    """
+    import yfinance as yf
+
+    stock = yf.Ticker(stock_symbol)
+    with span("yfinance.history"):
+        if start_date and end_date:
+            return stock.history(start=start_date, end=end_date, interval=interval)
+        return stock.history(period=period, interval=interval)
+
 def get_stock_data(stock_symbol, period="5y", interval="1d", start_date=None, end_date=None):
     """
     Récupère les données historiques d'un symbole boursier pour la période spécifiée.
     Si start_date et end_date sont fournis, ils seront utilisés pour récupérer les données spécifiques.
+    Les données journalières sont servies par le stockage local, qui ne télécharge que les barres manquantes.
 
     Paramètres:
         stock_symbol (str): Le symbole boursier (exemple : 'AAPL').
@@ -17,13 +51,15 @@ def get_stock_data(stock_symbol, period="5y", interval="1d", start_date=None, en
         dict: Données boursières pour la période donnée.
     """
     try:
-        stock = yf.Ticker(stock_symbol)
-
         # Si start_date et end_date sont fournis, on les utilise, sinon on se base sur 'period'
-        if start_date and end_date:
-            historical_data = stock.history(start=start_date, end=end_date, interval=interval)
+        if interval == "1d":
+            if start_date and end_date:
+                historical_data = get_price_store().history(stock_symbol, start=start_date, end=end_date)
+            else:
+                historical_data = get_price_store().history(stock_symbol, period=period)
         else:
-            historical_data = stock.history(period=period, interval=interval)
+            # Les intervalles intrajournaliers ou agrégés ne sont pas stockés localement
+            historical_data = fetch_history(stock_symbol, period, interval, start_date, end_date)
 
         if historical_data.empty:
             raise ValueError(f"Aucune donnée disponible pour {stock_symbol}.")
@@ -35,3 +71,71 @@ def get_stock_data(stock_symbol, period="5y", interval="1d", start_date=None, en
 
     except Exception as e:
         raise RuntimeError(f"Erreur lors de la récupération des données pour {stock_symbol}: {str(e)}")
+
+
+def get_price_history(stock_symbol, start_date=None, end_date=None, period="5y"):
+    """
+    Récupère en une seule lecture les barres journalières OHLCV d'un symbole sur une plage contiguë.
+
+    Paramètres:
+        stock_symbol (str): Le symbole boursier (exemple : 'AAPL').
+        start_date (str): La date de début (format : 'YYYY-MM-DD').
+        end_date (str): La date de fin exclue (format : 'YYYY-MM-DD'), aujourd'hui inclus si None.
+        period (str): La période utilisée si start_date est absent (ex. : '3mo', '5y').
+
+    Retourne:
+        pd.DataFrame: Les barres indexées par date (DatetimeIndex).
+    """
+    try:
+        historical_data = get_price_store().history(stock_symbol, start=start_date, end=end_date, period=period)
+        if historical_data.empty:
+            raise ValueError(f"Aucune donnée disponible pour {stock_symbol}.")
+        return historical_data
+    except Exception as e:
+        raise RuntimeError(f"Erreur lors de la récupération des données pour {stock_symbol}: {str(e)}")
+
+
+def get_chart_history(stock_symbol, start_date=None, end_date=None, interval="1d", max_points=500):
+    """
+    Retourne les clôtures d'un symbole prêtes à tracer, réduites à `max_points` points au plus
+    par l'algorithme LTTB (la forme de la courbe est conservée). Les séries sont mises en cache
+    par (symbole, plage, intervalle, nombre de points). Une plage sans barre (week-end, dates
+    futures) donne une série vide.
+
+    Paramètres:
+        stock_symbol (str): Le symbole boursier (exemple : 'AAPL').
+        start_date (str): La date de début (format : 'YYYY-MM-DD'), cinq ans en arrière si None.
+        end_date (str): La date de fin exclue (format : 'YYYY-MM-DD'), aujourd'hui inclus si None.
+        interval (str): '1d', '1wk' ou '1mo'.
+        max_points (int): Nombre maximal de points retournés (au moins 3), série complète si None.
+
+    Retourne:
+        dict: {'dates': [...], 'actualPrices': [...], 'total_points': nombre de points avant réduction}.
+
+    Raises:
+        RuntimeError: Si l'historique du symbole ne peut pas être lu.
+    """
+    key = (stock_symbol, start_date, end_date, interval, max_points)
+    return history_cache.get(key, lambda: _downsampled_history(*key))
+
+
+def _downsampled_history(stock_symbol, start_date, end_date, interval, max_points):
+    try:
+        bars = get_price_store().history(stock_symbol, start=start_date, end=end_date)
+    except Exception as e:
+        raise RuntimeError(f"Erreur lors de la récupération des données pour {stock_symbol}: {str(e)}")
+
+    closes = bars["Close"].dropna()
+    if CHART_INTERVALS[interval] is not None and not closes.empty:
+        closes = aggregate_prices(closes, CHART_INTERVALS[interval], "last")
+
+    selected = slice(None)
+    if max_points is not None:
+        with span("history.downsample"):
+            timestamps = closes.index.asi8 // 10**9
+            selected = lttb_indices(timestamps, closes.to_numpy(), max_points)
+    return {
+        "dates": closes.index[selected].strftime('%Y-%m-%d').tolist(),
+        "actualPrices": closes.to_numpy()[selected].tolist(),
+        "total_points": len(closes),
+    }
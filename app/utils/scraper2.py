@@ -1,9 +1,24 @@
-import yfinance as yf
+from app.utils.price_store import get_price_store
 
 def get_stock_data(stock_symbol):
-    stock = yf.Ticker(stock_symbol)
-    # Fetch historical data for the last 3 months
-    historical_data = stock.history(period="3mo")
+    # Historique des 3 derniers mois, servi par le stockage local de prix
+    historical_data = get_price_store().history(stock_symbol, period="3mo")
     prices = historical_data['Close'].tolist()  # List of closing prices
     return prices
 
+def get_recent_closes(stock_symbol, period="3mo"):
+    """
+    Retourne les clôtures récentes d'un symbole avec leurs dates, servies par le stockage local.
+
+    Paramètres:
+        stock_symbol (str): Le symbole boursier.
+        period (str): La période au format yfinance (3 mois par défaut).
+
+    Retourne:
+        dict: {"dates": [...] (format 'YYYY-MM-DD'), "prices": [...]}.
+    """
+    history = get_price_store().history(stock_symbol, period=period)
+    return {
+        "dates": history.index.strftime('%Y-%m-%d').tolist(),
+        "prices": history["Close"].tolist(),
+    }
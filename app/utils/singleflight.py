@@ -0,0 +1,126 @@
+import functools
+import threading
+
+# Regroupements nommés du processus (exposés par /cache-stats et /metrics)
+FLIGHTS = {}
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Regroupe les appels concurrents portant sur une même clé.
+
+    Le premier appelant exécute la fonction ; ceux qui arrivent pendant son exécution
+    attendent et reçoivent le même résultat (ou la même exception), sans relancer le calcul.
+    Le résultat est partagé tel quel entre les appelants : il ne doit pas être modifié.
+
+    Paramètres:
+        name (str): Nom sous lequel les compteurs sont publiés (regroupement anonyme si None).
+        timeout (float): Attente maximale par défaut des appelants regroupés, en secondes.
+    """
+
+    def __init__(self, name=None, timeout=None):
+        self.name = name
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.timeouts = 0
+        if name is not None:
+            FLIGHTS[name] = self
+
+    def do(self, key, fn, timeout=None):
+        """
+        Exécute `fn()` pour `key`, ou attend le résultat d'une exécution déjà en cours.
+
+        Paramètres:
+            key: La clé identifiant le calcul.
+            fn (callable): Fonction sans argument qui effectue le calcul.
+            timeout (float): Attente maximale si un appel est déjà en cours (celle du regroupement si None).
+
+        Retourne:
+            Le résultat de `fn()`.
+
+        Raises:
+            TimeoutError: Si l'appel en cours ne se termine pas dans le délai ; il se poursuit
+                pour les autres appelants.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            if not call.done.wait(timeout if timeout is not None else self.timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise TimeoutError(f"Appel en cours pour {key!r} non terminé dans le délai imparti")
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        """
+        Retourne les compteurs : exécutions, appels regroupés, échecs et délais dépassés.
+        """
+        with self._lock:
+            return {"executions": self.executions, "coalesced": self.coalesced, "errors": self.errors,
+                    "timeouts": self.timeouts, "in_flight": len(self._calls)}
+
+
+def coalesce(name, timeout=None):
+    """
+    Décorateur : les appels concurrents avec les mêmes arguments partagent une seule exécution.
+
+    Paramètres:
+        name (str): Nom du regroupement (compteurs dans /cache-stats et /metrics).
+        timeout (float): Attente maximale des appelants regroupés, en secondes.
+
+    Usage :
+        @coalesce("yfinance.news", timeout=10)
+        def fetch_news(stock_symbol):
+            ...
+    """
+    def decorator(fn):
+        flight = SingleFlight(name, timeout=timeout)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return flight.do((args, tuple(sorted(kwargs.items()))), lambda: fn(*args, **kwargs))
+
+        wrapper.flight = flight
+        return wrapper
+    return decorator
+
+
+def flight_stats():
+    """
+    Retourne les compteurs de tous les regroupements nommés du processus.
+    """
+    return {name: flight.stats() for name, flight in FLIGHTS.items()}
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from app.models.lstm import prediction_chart
+from app.utils.poller import get_snapshot
+
+# Fréquence de lecture de l'instantané du collecteur (un `stat` par lecture)
+STREAM_POLL_INTERVAL = float(os.getenv("STREAM_POLL_INTERVAL", "1"))
+# Commentaire envoyé aux clients inactifs pour que les proxys ne coupent pas la connexion
+STREAM_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT", "15"))
+# Durée maximale d'un flux : le navigateur se reconnecte seul (EventSource), ce qui répartit les clients entre workers
+STREAM_MAX_DURATION = float(os.getenv("STREAM_MAX_DURATION", "3600"))
+# Nombre maximal de flux ouverts par worker (avec des workers gthread, chaque flux occupe un thread :
+# gunicorn.conf.py en réserve la moitié aux autres requêtes)
+STREAM_MAX_SUBSCRIBERS = int(os.getenv("STREAM_MAX_SUBSCRIBERS", "2"))
+# Délai de reconnexion indiqué aux navigateurs, en millisecondes
+STREAM_RETRY_MS = 5000
+# Horizon des prédictions diffusées (celui du graphique de la page de prédiction)
+STREAM_HORIZON = 5
+
+
+def price_event(snapshot):
+    """
+    Construit l'événement diffusé à partir d'un instantané du collecteur : dernier prix
+    de chaque symbole et, pour les symboles précalculés, les données du graphique de prédiction.
+    """
+    symbols = {}
+    for symbol, values in snapshot["symbols"].items():
+        event = {"price": values.get("price")}
+        prediction = values.get("prediction")
+        if prediction and (values.get("recent_closes") or {}).get("prices"):
+            event["prediction"] = prediction_chart(values["recent_closes"],
+                                                   prediction["predictions"][:STREAM_HORIZON])
+        symbols[symbol] = event
+    return {"generated_at": snapshot["generated_at"], "symbols": symbols}
+
+
+def format_event(data, event_id, event="prices"):
+    """
+    Encode un événement au format Server-Sent Events.
+    """
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class StreamFullError(RuntimeError):
+    """
+    Levée lorsque le worker a atteint son nombre maximal de flux ouverts.
+    """
+
+
+class _Subscription:
+    # Flux d'un client : sa place est libérée à la fermeture de la réponse, même si elle n'a jamais été lue
+    def __init__(self, broadcaster, chunks):
+        self._broadcaster = broadcaster
+        self._chunks = chunks
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._chunks)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._chunks.close()
+        with self._broadcaster._condition:
+            self._broadcaster.subscribers -= 1
+
+
+class PriceBroadcaster:
+    """
+    Diffusion des prix et des prédictions aux navigateurs connectés à /stream/prices.
+
+    Un seul thread par processus surveille l'instantané publié par le collecteur (seul à
+    interroger Yahoo) et encode chaque nouvel événement une fois. Les clients ne
+    possèdent pas de file : ils attendent sur une condition partagée et envoient le
+    dernier événement, de sorte qu'un client lent saute les mises à jour intermédiaires
+    au lieu d'accumuler un retard. Le coût d'un client inactif se limite à son attente.
+
+    Le nombre de flux ouverts est borné (`max_subscribers`) : au-delà, `subscribe` lève
+    StreamFullError et la page se rabat sur des requêtes périodiques.
+    """
+
+    def __init__(self, source=get_snapshot, poll_interval=STREAM_POLL_INTERVAL, heartbeat=STREAM_HEARTBEAT,
+                 max_duration=STREAM_MAX_DURATION, max_subscribers=STREAM_MAX_SUBSCRIBERS):
+        self.source = source
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        self.max_duration = max_duration
+        self.max_subscribers = max_subscribers
+        self._event = None
+        self._event_id = None
+        self._version = 0
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.subscribers = 0
+        self.events = 0
+        self.rejected = 0
+
+    def poll(self):
+        """
+        Lit l'instantané et publie un événement s'il a changé depuis la dernière lecture.
+
+        Retourne:
+            bool: True si un nouvel événement a été publié.
+        """
+        snapshot = self.source()
+        if snapshot is None or str(snapshot["generated_at"]) == self._event_id:
+            return False
+        event_id = str(snapshot["generated_at"])
+        payload = format_event(price_event(snapshot), event_id)
+        with self._condition:
+            self._event, self._event_id = payload, event_id
+            self._version += 1
+            self.events += 1
+            self._condition.notify_all()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error(f"Échec de la diffusion des prix : {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """
+        Démarre le thread de surveillance (une seule fois par processus, y compris après un fork).
+        """
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="price-broadcaster", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def subscribe(self, last_event_id=None):
+        """
+        Ouvre le flux d'un client : l'événement courant (sauf s'il l'a déjà reçu, d'après
+        l'en-tête Last-Event-ID), puis chaque nouvel événement, avec un commentaire de
+        maintien de connexion en l'absence de mise à jour.
+
+        Paramètres:
+            last_event_id (str): Dernier identifiant reçu par le navigateur avant une reconnexion.
+
+        Retourne:
+            iterator: Les morceaux (bytes) de la réponse text/event-stream ; `close()` libère la place.
+
+        Raises:
+            StreamFullError: Si le worker sert déjà `max_subscribers` flux.
+        """
+        with self._condition:
+            if self.subscribers >= self.max_subscribers:
+                self.rejected += 1
+                raise StreamFullError(f"Nombre maximal de flux atteint ({self.max_subscribers}).")
+            self.subscribers += 1
+            version, event, event_id = self._version, self._event, self._event_id
+        self.start()
+        return _Subscription(self, self._chunks(version, event, event_id != last_event_id))
+
+    def _chunks(self, version, event, send_current):
+        yield f"retry: {STREAM_RETRY_MS}\n\n".encode()
+        if event is not None and send_current:
+            yield event
+        deadline = time.monotonic() + self.max_duration
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            with self._condition:
+                self._condition.wait_for(lambda: self._version != version or self._stop.is_set(),
+                                         timeout=self.heartbeat)
+                changed = self._version != version
+                version, event = self._version, self._event
+            yield event if changed else b": keepalive\n\n"
+
+    def stats(self):
+        with self._condition:
+            return {"subscribers": self.subscribers, "events": self.events, "rejected": self.rejected}
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_price_broadcaster():
+    """
+    Retourne le diffuseur de prix du processus.
+    """
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                _broadcaster = PriceBroadcaster()
+    return _broadcaster
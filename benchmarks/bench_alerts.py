@@ -0,0 +1,83 @@
+"""
+Mesure, en fonction du nombre d'alertes en attente :
+- le chargement des alertes par le moteur (`AlertEngine.sync` au démarrage ou après reprise
+  du verrou), puis le chargement incrémental d'un petit et d'un gros lot de nouvelles alertes ;
+- le temps d'évaluation d'un tick de prix, pour l'index trié (recherche dichotomique) et
+  pour un parcours linéaire de toutes les alertes.
+
+Usage : python -m benchmarks.bench_alerts [--sizes 100000,250000,500000] [--ticks 1000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from app.utils.alerts import ABOVE, BELOW, AlertEngine
+
+
+def insert_alerts(engine, rng, count, price=100.0):
+    rows = []
+    for _ in range(count):
+        threshold = rng.uniform(50, 150)
+        direction = ABOVE if threshold >= price else BELOW
+        rows.append(("AAPL", f"{len(rows)}@example.com", threshold, direction, time.time()))
+    with engine._connection() as conn:
+        conn.executemany(
+            "INSERT INTO alerts (symbol, email, threshold, direction, created_at) VALUES (?, ?, ?, ?, ?)", rows)
+    return [(threshold, direction) for _, _, threshold, direction, _ in rows]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def linear_scan(pending, price):
+    """Référence : on teste chaque alerte à chaque tick."""
+    return [p for p in pending if (p[1] == ABOVE and price >= p[0]) or (p[1] == BELOW and price <= p[0])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100000,250000,500000")
+    parser.add_argument("--ticks", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'alertes':>10}{'chargement (s)':>16}{'+10 (ms)':>10}{'+10 000 (ms)':>14}"
+          f"{'index (µs/tick)':>18}{'parcours (µs/tick)':>22}{'déclenchées':>14}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        rng = random.Random(0)
+        with tempfile.TemporaryDirectory() as directory:
+            engine = AlertEngine(os.path.join(directory, "alerts.sqlite3"), notify=lambda *args: None)
+            pending = insert_alerts(engine, rng, size)
+            load = timed(engine.sync)
+            pending += insert_alerts(engine, rng, 10)
+            small = timed(engine.sync) * 1e3
+            pending += insert_alerts(engine, rng, 10_000)
+            large = timed(engine.sync) * 1e3
+            book = engine.books["AAPL"]
+
+            # Marche aléatoire autour de 100 : chaque tick ne franchit qu'une petite fraction des seuils
+            prices = [100.0]
+            for _ in range(args.ticks - 1):
+                prices.append(prices[-1] + rng.gauss(0, 0.01))
+
+            triggered = 0
+            start = time.perf_counter()
+            for price in prices:
+                triggered += len(book.crossed(price))
+            indexed = (time.perf_counter() - start) / args.ticks * 1e6
+
+            scan_ticks = min(args.ticks, 50)
+            start = time.perf_counter()
+            for price in prices[:scan_ticks]:
+                linear_scan(pending, price)
+            scanned = (time.perf_counter() - start) / scan_ticks * 1e6
+
+        print(f"{size:>10}{load:>16.2f}{small:>10.1f}{large:>14.1f}{indexed:>18.1f}{scanned:>22.1f}{triggered:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Compare la prédiction de la liste de suivi symbole par symbole (N déroulements)
+à la prédiction groupée (un seul déroulement sur un tenseur (N, lookback, 1)).
+
+Usage : python -m benchmarks.bench_batch_prediction [--backend numpy|keras] [--symbols 8] [--repeat 50]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.models.lstm import MAX_HORIZON, forecast, forecast_batch
+from app.models.registry import LOADERS, warm_forecaster
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+    return np.median(timings), np.percentile(timings, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default="lstm_model.h5")
+    parser.add_argument("--backend", default="numpy", choices=sorted(LOADERS))
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--horizon", type=int, default=MAX_HORIZON)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    forecaster = LOADERS[args.backend](args.model_path)
+    warm_forecaster(forecaster, args.horizon)
+    rng = np.random.default_rng(0)
+    series = [(100 + np.cumsum(rng.normal(0, 1, 63))).tolist() for _ in range(args.symbols)]
+
+    one_by_one = measure(lambda: [forecast(forecaster, prices, args.horizon) for prices in series], args.repeat)
+    batched = measure(lambda: forecast_batch(forecaster, series, args.horizon), args.repeat)
+
+    print(f"{args.symbols} symboles, horizon {args.horizon}, moteur {args.backend}")
+    print(f"{'méthode':<20}{'médiane (ms)':>14}{'p95 (ms)':>12}")
+    print(f"{'symbole par symbole':<20}{one_by_one[0]:>14.2f}{one_by_one[1]:>12.2f}")
+    print(f"{'groupée':<20}{batched[0]:>14.2f}{batched[1]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
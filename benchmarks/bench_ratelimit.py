@@ -0,0 +1,73 @@
+"""
+Mesure le coût d'une vérification de limite de débit (stratégie fenêtre fixe de Flask-Limiter)
+avec le stockage SQLite partagé, sous contention : plusieurs processus (comme les workers
+gunicorn) vérifient en même temps, soit la même clé (un seul client), soit des clés distinctes.
+Le stockage en mémoire (un compteur par processus, non partagé) sert de référence.
+
+Usage : python -m benchmarks.bench_ratelimit [--processes 1,2,4,8] [--checks 20000]
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+import app.utils.ratelimit  # noqa: F401  (enregistre le schéma sqlite://)
+
+
+def worker(uri, checks, shared_key, start, results):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    # Limite jamais atteinte : chaque vérification incrémente le compteur
+    limit = parse(f"{checks * 100} per minute")
+    key = "client" if shared_key else f"client-{os.getpid()}"
+    limiter.hit(limit, key)
+    start.wait()
+    began = time.perf_counter()
+    for _ in range(checks):
+        limiter.hit(limit, key)
+    results.put((time.perf_counter() - began) / checks * 1e6)
+
+
+def run(uri, processes, checks, shared_key):
+    start = multiprocessing.Barrier(processes)
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=worker, args=(uri, checks, shared_key, start, results))
+               for _ in range(processes)]
+    for process in workers:
+        process.start()
+    timings = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", default="1,2,4,8")
+    parser.add_argument("--checks", type=int, default=20000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-ratelimit-")
+    print(f"{'processus':>10}{'mémoire (µs)':>15}{'sqlite, même clé (µs)':>24}{'sqlite, clés distinctes (µs)':>30}")
+    for processes in [int(p) for p in args.processes.split(",")]:
+        memory = run("memory://", processes, args.checks, shared_key=True)
+        same = run(f"sqlite:///{directory}/same-{processes}.sqlite3", processes, args.checks, shared_key=True)
+        distinct = run(f"sqlite:///{directory}/distinct-{processes}.sqlite3", processes, args.checks,
+                       shared_key=False)
+        print(f"{processes:>10}{memory:>15.1f}{same:>24.1f}{distinct:>30.1f}")
+
+    # Les limites sont bien communes : N processus x M vérifications sur la même clé
+    uri = f"sqlite:///{directory}/count.sqlite3"
+    run(uri, 4, 1000, shared_key=True)
+    storage = storage_from_string(uri)
+    limit = parse(f"{1000 * 100} per minute")
+    print(f"\nCompteur partagé après 4 x 1001 vérifications : {storage.get(limit.key_for('client'))}")
+
+
+if __name__ == "__main__":
+    main()
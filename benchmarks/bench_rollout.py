@@ -0,0 +1,67 @@
+"""
+Compare la latence de la boucle historique (cinq appels à `model.predict`) au
+déroulement compilé en un seul appel de graphe et au moteur NumPy.
+
+Usage : python -m benchmarks.bench_rollout [--model-path lstm_model.h5] [--repeat 50]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.models.keras_lstm import load_keras_forecaster
+from app.models.numpy_lstm import NumpyLSTM
+from app.models.registry import warm_forecaster
+
+
+def legacy_rollout(model, window, horizon):
+    """Boucle d'origine de `predict_lstm` : un `model.predict` et un `np.append` par jour."""
+    predictions = []
+    for _ in range(horizon):
+        prediction = model.predict(window, verbose=0)
+        predictions.append(prediction[0, 0])
+        window = np.append(window[:, 1:, :], [[[prediction[0, 0]]]], axis=1)
+    return np.array(predictions)
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+    return np.median(timings), np.percentile(timings, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default="lstm_model.h5")
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    forecaster = load_keras_forecaster(args.model_path)
+    warm_forecaster(forecaster, args.horizon)
+    window = np.random.default_rng(0).random((1, forecaster.lookback, 1)).astype(np.float32)
+
+    # Les deux chemins doivent produire les mêmes prédictions
+    expected = legacy_rollout(forecaster.model, window, args.horizon)
+    np.testing.assert_allclose(forecaster.rollout(window, args.horizon)[0], expected, rtol=1e-4, atol=1e-5)
+    engine = NumpyLSTM.from_h5(args.model_path)
+    np.testing.assert_allclose(engine.rollout(window, args.horizon)[0], expected, rtol=1e-4, atol=1e-5)
+
+    legacy = measure(lambda: legacy_rollout(forecaster.model, window, args.horizon), args.repeat)
+    compiled = measure(lambda: forecaster.rollout(window, args.horizon), args.repeat)
+    numpy_engine = measure(lambda: engine.rollout(window, args.horizon), args.repeat)
+
+    print(f"horizon={args.horizon} repeat={args.repeat}")
+    print(f"{'chemin':<22}{'médiane (ms)':>14}{'p95 (ms)':>12}")
+    print(f"{'boucle model.predict':<22}{legacy[0]:>14.2f}{legacy[1]:>12.2f}")
+    print(f"{'graphe compilé':<22}{compiled[0]:>14.2f}{compiled[1]:>12.2f}")
+    print(f"{'moteur NumPy':<22}{numpy_engine[0]:>14.2f}{numpy_engine[1]:>12.2f}")
+    print(f"gain (graphe compilé) : x{legacy[0] / compiled[0]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Remplaçant hors ligne de yfinance : barres OHLCV synthétiques et déterministes,
+métriques et actualités fixes. Utilisé par la suite de benchmarks (benchmarks/suite).
+
+Les prix d'un symbole sont générés une fois (marche aléatoire initialisée par le nom
+du symbole) sur tous les jours ouvrés depuis 2015 : deux exécutions voient exactement
+les mêmes données, sans accès réseau.
+"""
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+FIRST_DATE = "2015-01-01"
+
+_bars = {}
+
+
+def synthetic_bars(stock_symbol):
+    """
+    Retourne toutes les barres journalières synthétiques d'un symbole (jusqu'à aujourd'hui).
+    """
+    today = pd.Timestamp(datetime.now().date())
+    bars = _bars.get(stock_symbol)
+    if bars is None or bars.index[-1] < today - pd.offsets.BDay(1):
+        index = pd.bdate_range(FIRST_DATE, today, name="Date")
+        rng = np.random.default_rng(zlib.crc32(stock_symbol.encode()))
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+        spread = close * rng.uniform(0.002, 0.02, len(index))
+        bars = pd.DataFrame({
+            "Open": close + rng.uniform(-0.5, 0.5, len(index)) * spread,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 50_000_000, len(index)).astype(float),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        }, index=index)
+        _bars[stock_symbol] = bars
+    return bars
+
+
+def _period_start(period, end):
+    if period == "max":
+        return pd.Timestamp(FIRST_DATE)
+    if period == "ytd":
+        return pd.Timestamp(end.year, 1, 1)
+    if period.endswith("d"):
+        return None
+    if period.endswith("mo"):
+        return end - pd.DateOffset(months=int(period[:-2]))
+    return end - pd.DateOffset(years=int(period[:-1]))
+
+
+class FakeTicker:
+    """
+    Équivalent de `yfinance.Ticker` : `history`, `info` et `news`.
+    """
+
+    def __init__(self, stock_symbol):
+        self.ticker = stock_symbol
+
+    def history(self, period="1mo", interval="1d", start=None, end=None, **kwargs):
+        bars = synthetic_bars(self.ticker)
+        if start is not None:
+            bars = bars.loc[pd.Timestamp(start):]
+            if end is not None:
+                bars = bars.loc[:pd.Timestamp(end) - pd.Timedelta(days=1)]
+        elif period.endswith("d"):
+            bars = bars.tail(int(period[:-1]))
+        else:
+            bars = bars.loc[_period_start(period, bars.index[-1]):]
+        if interval != "1d":
+            rule = {"1wk": "W-FRI", "1mo": "MS"}.get(interval, "W-FRI")
+            bars = bars.resample(rule).agg({"Open": "first", "High": "max", "Low": "min", "Close": "last",
+                                            "Volume": "sum", "Dividends": "sum", "Stock Splits": "sum"}).dropna()
+        return bars.copy()
+
+    @property
+    def info(self):
+        seed = zlib.crc32(self.ticker.encode())
+        return {
+            "trailingPE": 20 + seed % 15,
+            "dividendYield": (seed % 30) / 1000,
+            "beta": 0.8 + (seed % 80) / 100,
+            "marketCap": 10 ** 12 + seed,
+        }
+
+    @property
+    def news(self):
+        return [
+            {
+                "uuid": f"{self.ticker}-{i}",
+                "title": f"Actualité {i} sur {self.ticker}",
+                "publisher": "Fake Market",
+                "link": f"https://example.com/{self.ticker}/{i}",
+                "providerPublishTime": 1_700_000_000 + i * 3600,
+                "type": "STORY",
+                "thumbnail": {"resolutions": [
+                    {"url": f"https://example.com/{self.ticker}/{i}/original.jpg", "width": 1200, "height": 800},
+                    {"url": f"https://example.com/{self.ticker}/{i}/140x140.jpg", "width": 140, "height": 140},
+                ]},
+            }
+            for i in range(10)
+        ]
+
+
+def download(tickers, period="5d", interval="1d", group_by="column", **kwargs):
+    """
+    Équivalent de `yfinance.download` pour plusieurs symboles (colonnes (champ, symbole)).
+    """
+    symbols = tickers.split() if isinstance(tickers, str) else list(tickers)
+    frames = {symbol: FakeTicker(symbol).history(period=period, interval=interval) for symbol in symbols}
+    data = pd.concat(frames, axis=1)
+    return data.swaplevel(axis=1).sort_index(axis=1)
+
+
+def install(monkeypatch):
+    """
+    Remplace yfinance par ce faux marché (les modules de l'application importent yfinance à l'usage).
+    """
+    import yfinance
+
+    monkeypatch.setattr(yfinance, "Ticker", FakeTicker)
+    monkeypatch.setattr(yfinance, "download", download)
@@ -0,0 +1,67 @@
+"""
+Rapport du temps de démarrage de l'application, façon `python -X importtime` :
+temps propre des imports regroupé par paquet de premier niveau, plus les modules lourds chargés.
+
+Usage : python -m benchmarks.import_time [--top 15] [--statement "from app import create_app; create_app()"]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+DEFAULT_STATEMENT = "from app import create_app; create_app()"
+
+# Sous-systèmes qui ne doivent être chargés qu'à la première utilisation
+HEAVY_MODULES = ["tensorflow", "keras", "sklearn", "yfinance", "pyrebase", "firebase_admin"]
+
+
+def measure_startup(statement=DEFAULT_STATEMENT, env=None):
+    """
+    Exécute `statement` dans un nouvel interpréteur avec `-X importtime`.
+
+    Paramètres:
+        statement (str): Le code de démarrage à mesurer.
+        env (dict): Variables d'environnement du processus (celles du processus courant par défaut).
+
+    Retourne:
+        dict: {"wall_seconds", "import_seconds", "packages": {paquet: secondes}, "heavy_modules": [...]}.
+    """
+    probe = f"{statement}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], capture_output=True, text=True,
+                            env=env or os.environ.copy(), check=True)
+    wall_seconds = time.perf_counter() - start
+
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1e6
+    loaded = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    return {
+        "wall_seconds": wall_seconds,
+        "import_seconds": sum(packages.values()),
+        "packages": dict(sorted(packages.items(), key=lambda item: -item[1])),
+        "heavy_modules": [module for module in loaded.split(",") if module],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--statement", default=DEFAULT_STATEMENT)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    report = measure_startup(args.statement)
+    print(f"Démarrage : {report['wall_seconds']:.2f}s (imports : {report['import_seconds']:.2f}s)")
+    print(f"{'paquet':<28}{'temps propre (ms)':>18}")
+    for package, seconds in list(report["packages"].items())[:args.top]:
+        print(f"{package:<28}{seconds * 1000:>18.1f}")
+    print(f"Modules lourds chargés : {', '.join(report['heavy_modules']) or 'aucun'}")
+
+
+if __name__ == "__main__":
+    main()
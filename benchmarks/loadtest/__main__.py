@@ -0,0 +1,3 @@
+from benchmarks.loadtest.harness import main
+
+main()
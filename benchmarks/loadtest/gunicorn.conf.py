@@ -0,0 +1,19 @@
+"""
+Configuration gunicorn du test de charge : celle du déploiement (gunicorn.conf.py à la racine,
+mêmes variables WEB_CONCURRENCY, GUNICORN_THREADS et PORT), avec yfinance redirigé vers
+le bouchon HTTP local. Lancée par `python -m benchmarks.loadtest`.
+"""
+import os
+import runpy
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+globals().update({name: value for name, value in runpy.run_path(os.path.join(ROOT, "gunicorn.conf.py")).items()
+                  if not name.startswith("_")})
+
+# Avant le préchargement de l'application : hérité par tous les workers
+from benchmarks.loadtest import yahoo_client  # noqa: E402
+
+yahoo_client.install()
@@ -0,0 +1,293 @@
+"""
+Test de charge de bout en bout : l'application est lancée sous gunicorn comme en production
+(Procfile, `run:app`), avec Yahoo Finance et Firebase remplacés par des bouchons HTTP locaux,
+puis des utilisateurs virtuels enchaînent un mélange réaliste de pages et d'appels JSON.
+
+Pour chaque configuration workers x threads et chaque nombre d'utilisateurs simultanés,
+le rapport donne le débit et les percentiles de latence par route ; la capacité retenue
+est le plus grand nombre d'utilisateurs dont le p99 global reste sous le budget.
+
+Usage :
+    python -m benchmarks.loadtest --configs 1x4,2x4,4x2 --users 1,8,32,64 --duration 20
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+from flask import Flask
+
+from benchmarks.loadtest.stubs import UpstreamStubs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+GUNICORN_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+
+# Clé de session de run.py : les cookies des utilisateurs virtuels sont signés avec elle
+SECRET_KEY = "mamapapa87."
+PROJECT_ID = "loadtest-project"
+
+# (nom, méthode, chemin, poids) : pages consultées par un utilisateur connecté
+ROUTE_MIX = [
+    ("GET /", "GET", "/", 3),
+    ("GET /stock-data", "GET", "/stock-data?symbol=AAPL", 2),
+    ("GET /prediction/chart", "GET", "/prediction/chart", 2),
+    ("GET /investisseur", "GET", "/investisseur", 2),
+    ("GET /news", "GET", "/news", 1),
+]
+
+
+def session_cookie(data, secret_key=SECRET_KEY):
+    """
+    Retourne la valeur du cookie de session Flask contenant `data`, signée avec `secret_key`.
+    """
+    app = Flask("loadtest")
+    app.secret_key = secret_key
+    return app.session_interface.get_signing_serializer(app).dumps(data)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentiles(latencies, points=(50, 90, 99)):
+    """
+    Retourne {"p50": ..., "p90": ..., "p99": ..., "max": ...} en millisecondes.
+    """
+    if not latencies:
+        return {f"p{point}": None for point in points} | {"max": None}
+    values = np.asarray(latencies) * 1000
+    return {f"p{point}": round(float(np.percentile(values, point)), 1) for point in points} | \
+        {"max": round(float(values.max()), 1)}
+
+
+def summarize(samples, duration):
+    """
+    Agrège les échantillons (route, durée en secondes, succès) par route et au total.
+
+    Retourne:
+        dict: {route: {"requests", "errors", "rps", "p50", "p90", "p99", "max"}}, avec la clé "total".
+    """
+    routes = {}
+    for route, elapsed, ok in samples:
+        routes.setdefault(route, ([], [0]))
+        routes[route][0].append(elapsed)
+        routes[route][1][0] += not ok
+    report = {}
+    for route, (latencies, errors) in sorted(routes.items()):
+        report[route] = {"requests": len(latencies), "errors": errors[0],
+                         "rps": round(len(latencies) / duration, 1), **percentiles(latencies)}
+    everything = [elapsed for _, elapsed, _ in samples]
+    report["total"] = {"requests": len(everything), "errors": sum(not ok for _, _, ok in samples),
+                       "rps": round(len(everything) / duration, 1), **percentiles(everything)}
+    return report
+
+
+class GunicornServer:
+    """
+    L'application sous gunicorn (configuration du déploiement), sur un port libre,
+    avec ses propres fichiers de données et les bouchons amont.
+    """
+
+    def __init__(self, workers, threads, stubs, poller=False):
+        self.workers = workers
+        self.threads = threads
+        self.port = free_port()
+        self.data_dir = tempfile.mkdtemp(prefix="loadtest-")
+        self.log_path = os.path.join(self.data_dir, "gunicorn.log")
+        self.env = dict(
+            os.environ,
+            PORT=str(self.port),
+            WEB_CONCURRENCY=str(workers),
+            GUNICORN_THREADS=str(threads),
+            LOADTEST_YAHOO_URL=stubs.url,
+            FIREBASE_CERTS_URL=f"{stubs.url}/firebase/certs",
+            FIREBASE_PROJECT_ID=stubs.firebase.project_id,
+            FIREBASE_API_KEY="loadtest",
+            SMTP_SERVER="127.0.0.1",
+            SMTP_PORT="25",
+            SMTP_EMAIL="loadtest@example.com",
+            SMTP_PASSWORD="loadtest",
+            POLLER_ENABLED="1" if poller else "0",
+            PRICE_STORE_PATH=os.path.join(self.data_dir, "prices.sqlite3"),
+            ALERTS_DB_PATH=os.path.join(self.data_dir, "alerts.sqlite3"),
+            RATELIMIT_STORAGE_URI=f"sqlite:///{self.data_dir}/ratelimit.sqlite3",
+            SNAPSHOT_PATH=os.path.join(self.data_dir, "market_snapshot.json"),
+            TF_CPP_MIN_LOG_LEVEL="3",
+        )
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout=120):
+        with open(self.log_path, "w") as log:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "-c", GUNICORN_CONFIG, "run:app"],
+                cwd=ROOT, env=self.env, stdout=log, stderr=subprocess.STDOUT,
+            )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn s'est arrêté au démarrage (journal : {self.log_path})")
+            try:
+                if requests.get(f"{self.url}/login", timeout=1).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"gunicorn n'a pas répondu en {timeout} s (journal : {self.log_path})")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def virtual_user(base_url, cookie, mix, deadline, samples, think_time=0.0, timeout=30.0, seed=None):
+    """
+    Boucle fermée d'un utilisateur connecté : une requête tirée du mélange, la réponse
+    lue en entier, une pause éventuelle (loi exponentielle de moyenne `think_time`), et ainsi de suite.
+    """
+    rng = random.Random(seed)
+    http = requests.Session()
+    http.cookies.set("session", cookie, domain="127.0.0.1")
+    weights = [weight for *_, weight in mix]
+    while time.perf_counter() < deadline:
+        route, method, path, _ = rng.choices(mix, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = http.request(method, base_url + path, timeout=timeout, allow_redirects=False)
+            ok = response.status_code < 300
+        except requests.RequestException:
+            ok = False
+        samples.append((route, time.perf_counter() - start, ok))
+        if think_time:
+            time.sleep(rng.expovariate(1 / think_time))
+
+
+def run_level(base_url, cookies, duration, mix=ROUTE_MIX, think_time=0.0):
+    """
+    Lance autant d'utilisateurs virtuels que de cookies pendant `duration` secondes.
+
+    Retourne:
+        dict: Le résumé par route (voir `summarize`).
+    """
+    samples = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=virtual_user, args=(base_url, cookie, mix, deadline, samples),
+                                kwargs={"think_time": think_time, "seed": index}, daemon=True)
+               for index, cookie in enumerate(cookies)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, time.perf_counter() - start)
+
+
+def run(configs, user_levels, duration, warmup=3.0, think_time=0.0, upstream_latency=0.05,
+        p99_budget_ms=1000.0, poller=False, log=print):
+    """
+    Exécute le test de charge pour chaque configuration et chaque niveau de charge.
+
+    Paramètres:
+        configs (list): Couples (workers, threads) de gunicorn.
+        user_levels (list): Nombres d'utilisateurs simultanés, croissants.
+        duration (float): Durée de mesure de chaque niveau, en secondes.
+        warmup (float): Durée de chauffe (non mesurée) avant le premier niveau.
+        think_time (float): Pause moyenne entre deux requêtes d'un utilisateur, en secondes.
+        upstream_latency (float): Latence simulée de Yahoo Finance, en secondes.
+        p99_budget_ms (float): p99 global au-delà duquel la charge n'est plus tenue.
+        poller (bool): Active le collecteur en arrière-plan (POLLER_ENABLED=1).
+
+    Retourne:
+        list: Un résultat par configuration : {"workers", "threads", "capacity", "levels": {utilisateurs: résumé}}.
+    """
+    stubs = UpstreamStubs(PROJECT_ID, latency=upstream_latency).start()
+    # Un idToken par utilisateur virtuel, vérifié par l'application comme un jeton Firebase
+    cookies = [session_cookie({"idToken": stubs.firebase.mint_token(f"user-{index}")})
+               for index in range(max(user_levels))]
+    results = []
+    try:
+        for workers, threads in configs:
+            server = GunicornServer(workers, threads, stubs, poller=poller).start()
+            log(f"\n=== {workers} worker(s) x {threads} thread(s) ===")
+            try:
+                run_level(server.url, cookies[:max(user_levels)], warmup, think_time=think_time)
+                levels, capacity = {}, 0
+                for users in user_levels:
+                    report = run_level(server.url, cookies[:users], duration, think_time=think_time)
+                    levels[users] = report
+                    log(format_report(users, report))
+                    if report["total"]["p99"] is not None and report["total"]["p99"] <= p99_budget_ms:
+                        capacity = users
+                results.append({"workers": workers, "threads": threads, "capacity": capacity, "levels": levels})
+            finally:
+                server.stop()
+    finally:
+        stubs.stop()
+    return results
+
+
+def format_report(users, report):
+    lines = [f"-- {users} utilisateur(s)",
+             f"{'route':<20} {'req':>7} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+    for route, row in report.items():
+        cells = [row[key] if row[key] is not None else "-" for key in ("p50", "p90", "p99", "max")]
+        lines.append(f"{route:<20} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8} "
+                     + " ".join(f"{cell:>8}" for cell in cells))
+    return "\n".join(lines)
+
+
+def format_summary(results, p99_budget_ms):
+    lines = [f"\nCapacité (p99 global <= {p99_budget_ms:.0f} ms) :"]
+    for result in results:
+        best = max(result["levels"].values(), key=lambda report: report["total"]["rps"])
+        lines.append(f"  {result['workers']} worker(s) x {result['threads']} thread(s) : "
+                     f"{result['capacity']} utilisateur(s), débit max {best['total']['rps']} req/s")
+    return "\n".join(lines)
+
+
+def parse_configs(value):
+    """
+    Lit '1x4,2x4' en [(1, 4), (2, 4)].
+    """
+    return [tuple(int(part) for part in item.lower().split("x")) for item in value.split(",") if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--configs", default="1x4,2x4,4x2", help="configurations workers x threads")
+    parser.add_argument("--users", default="1,8,32,64", help="nombres d'utilisateurs simultanés")
+    parser.add_argument("--duration", type=float, default=20.0, help="durée de chaque niveau (s)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="chauffe avant les mesures (s)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="pause moyenne entre deux requêtes (s)")
+    parser.add_argument("--upstream-latency", type=float, default=50.0, help="latence simulée de Yahoo (ms)")
+    parser.add_argument("--p99-budget", type=float, default=1000.0, help="p99 maximal tenu (ms)")
+    parser.add_argument("--poller", action="store_true", help="active le collecteur en arrière-plan")
+    parser.add_argument("--output", help="enregistre les résultats en JSON")
+    args = parser.parse_args(argv)
+
+    results = run(parse_configs(args.configs), sorted(int(users) for users in args.users.split(",")),
+                  args.duration, warmup=args.warmup, think_time=args.think_time,
+                  upstream_latency=args.upstream_latency / 1000, p99_budget_ms=args.p99_budget,
+                  poller=args.poller)
+    print(format_summary(results, args.p99_budget))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
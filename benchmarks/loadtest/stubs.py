@@ -0,0 +1,154 @@
+"""
+Services amont locaux du test de charge, servis par un seul serveur HTTP :
+
+- un équivalent de Yahoo Finance qui sert les données du faux marché (benchmarks/fake_market.py)
+  avec une latence configurable, interrogé par les workers via benchmarks/loadtest/yahoo_client.py ;
+- les certificats publics Firebase d'une clé de test, avec laquelle `FirebaseStub.mint_token`
+  signe des idTokens que l'application vérifie comme de vrais jetons.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from benchmarks import fake_market
+
+
+def frame_to_json(frame):
+    """
+    Sérialise des barres OHLCV ({"index": [dates ISO], "columns": [...], "data": [[...]]}).
+    """
+    return {
+        "index": [timestamp.isoformat() for timestamp in frame.index],
+        "columns": list(frame.columns),
+        "data": frame.to_numpy().tolist(),
+    }
+
+
+class FirebaseStub:
+    """
+    Clé RSA de test, son certificat auto-signé et les idTokens qu'elle signe.
+    """
+    kid = "loadtest"
+
+    def __init__(self, project_id):
+        self.project_id = project_id
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "loadtest")])
+        now = datetime.now(timezone.utc)
+        certificate = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(self.private_key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(days=1))
+            .not_valid_after(now + timedelta(days=1))
+            .sign(self.private_key, hashes.SHA256())
+        )
+        self.certs = {self.kid: certificate.public_bytes(serialization.Encoding.PEM).decode()}
+
+    def mint_token(self, uid, name=None, lifetime=3600):
+        """
+        Retourne un idToken signé pour l'utilisateur `uid`, valable `lifetime` secondes.
+        """
+        now = int(time.time())
+        claims = {
+            "iss": f"https://securetoken.google.com/{self.project_id}",
+            "aud": self.project_id,
+            "sub": uid,
+            "name": name or uid,
+            "iat": now,
+            "auth_time": now,
+            "exp": now + lifetime,
+        }
+        return jwt.encode(claims, self.private_key, algorithm="RS256", headers={"kid": self.kid})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        stubs = self.server.stubs
+
+        if parts == ["firebase", "certs"]:
+            return self._send_json(stubs.firebase.certs, {"Cache-Control": "public, max-age=3600"})
+
+        # Latence simulée d'un appel à Yahoo Finance
+        if stubs.latency:
+            time.sleep(stubs.latency)
+        stubs.count(parts[0])
+        if parts[0] == "history" and len(parts) == 2:
+            ticker = fake_market.FakeTicker(parts[1])
+            return self._send_json(frame_to_json(ticker.history(**query)))
+        if parts[0] == "download":
+            symbols = query.pop("symbols").split(",")
+            return self._send_json({symbol: frame_to_json(fake_market.FakeTicker(symbol).history(**query))
+                                    for symbol in symbols})
+        if parts[0] == "info" and len(parts) == 2:
+            return self._send_json(fake_market.FakeTicker(parts[1]).info)
+        if parts[0] == "news" and len(parts) == 2:
+            return self._send_json(fake_market.FakeTicker(parts[1]).news)
+        self.send_error(404)
+
+
+class UpstreamStubs:
+    """
+    Serveur HTTP local des bouchons Yahoo Finance et Firebase, exécuté dans un thread.
+
+    Paramètres:
+        project_id (str): Projet Firebase attendu par l'application (audience des jetons).
+        latency (float): Latence ajoutée à chaque appel Yahoo, en secondes.
+    """
+
+    def __init__(self, project_id, latency=0.05, host="127.0.0.1", port=0):
+        self.firebase = FirebaseStub(project_id)
+        self.latency = latency
+        self.calls = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.stubs = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, endpoint):
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="upstream-stubs", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
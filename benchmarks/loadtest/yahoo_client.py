@@ -0,0 +1,71 @@
+"""
+Remplaçant de yfinance pour le test de charge : chaque appel est une vraie requête HTTP
+vers le bouchon Yahoo local (benchmarks/loadtest/stubs.py), dont l'adresse est lue
+dans LOADTEST_YAHOO_URL. Installé dans le maître gunicorn par benchmarks/loadtest/gunicorn.conf.py.
+"""
+import os
+import threading
+
+import pandas as pd
+import requests
+
+_local = threading.local()
+
+
+def _get(path, params=None):
+    # Une session (connexions persistantes) par thread, comme le client HTTP de yfinance
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    response = session.get(os.environ["LOADTEST_YAHOO_URL"] + path, params=params, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def frame_from_json(payload):
+    frame = pd.DataFrame(payload["data"], index=pd.to_datetime(payload["index"]), columns=payload["columns"])
+    frame.index.name = "Date"
+    return frame
+
+
+class HttpTicker:
+    """
+    Équivalent de `yfinance.Ticker` : `history`, `info` et `news`.
+    """
+
+    def __init__(self, stock_symbol):
+        self.ticker = stock_symbol
+
+    def history(self, period="1mo", interval="1d", start=None, end=None, **kwargs):
+        params = {"period": period, "interval": interval}
+        if start is not None:
+            params.update(start=str(start), end=str(end) if end is not None else None)
+        return frame_from_json(_get(f"/history/{self.ticker}", params))
+
+    @property
+    def info(self):
+        return _get(f"/info/{self.ticker}")
+
+    @property
+    def news(self):
+        return _get(f"/news/{self.ticker}")
+
+
+def download(tickers, period="5d", interval="1d", group_by="column", **kwargs):
+    """
+    Équivalent de `yfinance.download` : un seul appel pour tous les symboles.
+    """
+    symbols = tickers.split() if isinstance(tickers, str) else list(tickers)
+    payload = _get("/download", {"symbols": ",".join(symbols), "period": period, "interval": interval})
+    data = pd.concat({symbol: frame_from_json(frame) for symbol, frame in payload.items()}, axis=1)
+    return data.swaplevel(axis=1).sort_index(axis=1)
+
+
+def install():
+    """
+    Remplace `yfinance.Ticker` et `yfinance.download` (importés à l'usage par l'application).
+    """
+    import yfinance
+
+    yfinance.Ticker = HttpTicker
+    yfinance.download = download
@@ -0,0 +1,24 @@
+from app.utils.scraper import get_chart_history
+from app.utils.aggregation import format_prices_with_month
+from app.utils.metrics import fetch_financial_metrics, get_financial_metrics, metrics_cache
+
+
+def bench_format_prices_with_month(measure):
+    history = get_chart_history("AAPL", start_date="2020-01-01", max_points=None)
+    prices = [{"date": date, "price": price} for date, price in zip(history["dates"], history["actualPrices"])]
+    measure(format_prices_with_month, prices, 2023)
+
+
+def bench_get_chart_history(measure):
+    get_chart_history("AAPL", start_date="2020-01-01", max_points=None)
+    measure(get_chart_history, "AAPL", start_date="2020-01-01", max_points=None)
+
+
+def bench_get_financial_metrics_cached(measure):
+    metrics_cache.invalidate()
+    get_financial_metrics("AAPL")
+    measure(get_financial_metrics, "AAPL")
+
+
+def bench_fetch_financial_metrics(measure):
+    measure(fetch_financial_metrics, "AAPL")
@@ -0,0 +1,29 @@
+from app.models import registry
+from app.models.lstm import predict_lstm, prediction_cache
+
+
+def reset_model_and_cache():
+    # Démarrage à froid : registre vidé (rechargement et préchauffage du modèle) et cache des prédictions vide
+    registry._registries.clear()
+    prediction_cache.invalidate()
+
+
+def bench_predict_lstm_cold(benchmark):
+    predict_lstm()
+    benchmark.pedantic(predict_lstm, setup=reset_model_and_cache, rounds=10)
+
+
+def bench_predict_lstm_warm(measure):
+    predict_lstm()
+    measure(predict_lstm)
+
+
+def bench_predict_lstm_uncached_forecast(measure):
+    # Modèle chargé mais prédiction recalculée : coût de la lecture des clôtures et du déroulement
+    predict_lstm()
+
+    def run():
+        prediction_cache.invalidate()
+        return predict_lstm()
+
+    measure(run)
@@ -0,0 +1,32 @@
+import pytest
+
+ROUTES = [
+    ("GET", "/", None),
+    ("GET", "/login", None),
+    ("GET", "/register", None),
+    ("GET", "/forgot_password", None),
+    ("GET", "/reset-password", None),
+    ("GET", "/financial-metrics/AAPL", None),
+    ("GET", "/cache-stats", None),
+    ("POST", "/set-alert/", {"email": "bench@example.com", "price": 1000.0, "symbol": "AAPL"}),
+    ("GET", "/stock-data", None),
+    ("GET", "/history/AAPL", None),
+    ("GET", "/prediction", None),
+    ("POST", "/prediction", None),
+    ("GET", "/prediction/chart", None),
+    ("GET", "/prediction/batch", None),
+    ("GET", "/model-info", None),
+    ("GET", "/investisseur", None),
+    ("GET", "/news", None),
+]
+
+
+@pytest.mark.parametrize("method, path, body", ROUTES, ids=[f"{method} {path}" for method, path, _ in ROUTES])
+def bench_route(measure, client, method, path, body):
+    def call():
+        response = client.open(path, method=method, json=body)
+        assert response.status_code < 400, response.data[:200]
+        return response
+
+    call()
+    measure(call)
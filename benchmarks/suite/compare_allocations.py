@@ -0,0 +1,40 @@
+"""
+Compare deux exécutions enregistrées de la suite (latence médiane et allocations tracemalloc).
+
+Usage : python -m benchmarks.suite.compare_allocations [ANCIEN.json NOUVEAU.json]
+(par défaut : les deux dernières exécutions de .benchmarks/)
+"""
+import glob
+import json
+import os
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        data = json.load(f)
+    return data["commit_info"].get("id", "")[:8], {bench["name"]: bench for bench in data["benchmarks"]}
+
+
+def ratio(old, new):
+    return f"{new / old:.2f}x" if old else "-"
+
+
+def main(argv):
+    paths = argv or sorted(glob.glob(os.path.join(".benchmarks", "*", "*.json")), key=os.path.getmtime)[-2:]
+    if len(paths) != 2:
+        sys.exit("Deux exécutions enregistrées sont nécessaires (python -m pytest benchmarks/suite).")
+    (old_commit, old), (new_commit, new) = load(paths[0]), load(paths[1])
+
+    print(f"{old_commit} -> {new_commit}")
+    print(f"{'benchmark':<46}{'médiane (ms)':>22}{'pic alloué (Kio)':>24}")
+    for name in sorted(set(old) & set(new)):
+        old_median, new_median = old[name]["stats"]["median"] * 1000, new[name]["stats"]["median"] * 1000
+        old_peak = old[name]["extra_info"].get("alloc_peak_kib")
+        new_peak = new[name]["extra_info"].get("alloc_peak_kib")
+        peak = f"{old_peak} -> {new_peak} ({ratio(old_peak, new_peak)})" if old_peak is not None else "-"
+        print(f"{name:<46}{f'{old_median:.2f} -> {new_median:.2f} ({ratio(old_median, new_median)})':>22}{peak:>24}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
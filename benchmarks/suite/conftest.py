@@ -0,0 +1,89 @@
+"""
+Suite de micro-benchmarks des chemins critiques, sur le faux marché de benchmarks/fake_market.py.
+
+Lancement (depuis la racine du dépôt, aucun accès réseau nécessaire) :
+
+    python -m pytest benchmarks/suite
+
+Chaque exécution est enregistrée en JSON dans .benchmarks/ (nommée d'après le commit) ;
+`pytest-benchmark compare` compare les latences et `python -m benchmarks.suite.compare_allocations`
+compare les allocations mesurées par tracemalloc (champ `extra_info`).
+"""
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+
+def pytest_configure(config):
+    # Configuration lue à l'import des modules de l'application : définie avant l'import des benchmarks,
+    # et seulement quand la suite est lancée (pas lors d'un `pytest` à la racine du dépôt)
+    if config.inipath is None or config.inipath.parent != Path(__file__).parent:
+        return
+    data_dir = tempfile.mkdtemp(prefix="bench-data-")
+    os.environ.update({
+        "SMTP_SERVER": "localhost",
+        "SMTP_PORT": "25",
+        "SMTP_EMAIL": "bench@example.com",
+        "SMTP_PASSWORD": "bench",
+        "FIREBASE_API_KEY": "bench",
+        "POLLER_ENABLED": "0",
+        "PRICE_STORE_PATH": os.path.join(data_dir, "prices.sqlite3"),
+        "ALERTS_DB_PATH": os.path.join(data_dir, "alerts.sqlite3"),
+        "RATELIMIT_STORAGE_URI": f"sqlite:///{data_dir}/ratelimit.sqlite3",
+        "SNAPSHOT_PATH": os.path.join(data_dir, "market_snapshot.json"),
+    })
+
+
+@pytest.fixture(scope="session", autouse=True)
+def market():
+    """Remplace yfinance par le faux marché pour toute la session."""
+    from benchmarks import fake_market
+
+    patch = pytest.MonkeyPatch()
+    fake_market.install(patch)
+    yield
+    patch.undo()
+
+
+@pytest.fixture(scope="session")
+def flask_app(market):
+    from app import create_app
+    from app.routes import limiter
+
+    app = create_app()
+    app.config.update(SECRET_KEY="bench", TESTING=True)
+    # La limite de débit de /set-alert/ bloquerait les itérations du benchmark
+    limiter.enabled = False
+    return app
+
+
+@pytest.fixture
+def client(flask_app):
+    client = flask_app.test_client()
+    with client.session_transaction() as session:
+        session["user"] = "bench"
+    return client
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    Mesure une fonction avec pytest-benchmark, puis ses allocations (tracemalloc) sur
+    un appel supplémentaire, enregistrées dans `extra_info` du rapport JSON.
+    """
+    def run(fn, *args, **kwargs):
+        result = benchmark(fn, *args, **kwargs)
+        tracemalloc.start()
+        try:
+            fn(*args, **kwargs)
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["alloc_peak_kib"] = round(peak / 1024, 1)
+        benchmark.extra_info["alloc_retained_kib"] = round(retained / 1024, 1)
+        return result
+
+    return run
@@ -0,0 +1,62 @@
+"""
+Configuration gunicorn : `gunicorn -c gunicorn.conf.py run:app`.
+
+L'application est préchargée dans le processus maître, qui charge aussi le modèle :
+les workers forkés partagent ces pages mémoire en lecture (copie sur écriture) au lieu
+de tout réimporter. Les threads (collecteur, envoi d'e-mails) ne survivent pas au fork :
+ils sont démarrés dans chaque worker, après le fork.
+
+Le flux /stream/prices (ouvert seulement si POLLER_ENABLED=1) garde sa connexion ouverte :
+avec les workers `gthread` (par défaut), chaque client connecté occupe un thread, et le nombre
+de flux par worker est donc limité à la moitié des threads (les clients suivants reçoivent une
+503 et interrogent le serveur périodiquement). Pour servir des milliers de navigateurs,
+utiliser des workers gevent (GUNICORN_WORKER_CLASS=gevent) : une coroutine par connexion,
+jusqu'à GUNICORN_WORKER_CONNECTIONS connexions par worker.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "2000"))
+# Lu par app/utils/stream.py au préchargement : les flux ne doivent pas occuper tous les threads
+os.environ.setdefault("STREAM_MAX_SUBSCRIBERS", str(worker_connections - 100 if worker_class == "gevent"
+                                                    else max(threads // 2, 1)))
+
+if worker_class == "gevent":
+    # Avant le préchargement : les verrous et files créés à l'import (pool de threads des
+    # appels Yahoo...) doivent être ceux de gevent, sinon ils bloquent tout le worker
+    from gevent import monkey
+
+    monkey.patch_all()
+preload_app = True
+
+
+def when_ready(server):
+    """Dans le maître, après le préchargement et avant le fork des workers."""
+    from app.models.registry import get_model_registry, ModelNotAvailableError
+    from app.utils.http_cache import precompress_static
+
+    try:
+        get_model_registry().get()
+    except ModelNotAvailableError as e:
+        server.log.warning(f"Modèle non préchargé : {e}")
+    # Versions compressées des ressources statiques (seuls les fichiers modifiés sont recompressés)
+    try:
+        written = precompress_static(server.app.wsgi().static_folder)
+        if written:
+            server.log.info(f"{len(written)} ressource(s) statique(s) précompressée(s)")
+    except OSError as e:
+        server.log.warning(f"Ressources statiques non précompressées : {e}")
+    # Les objets déjà chargés ne sont plus parcourus par le ramasse-miettes,
+    # qui sinon réécrirait leurs en-têtes et dupliquerait les pages partagées
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    """Dans chaque worker, après le fork et l'initialisation (monkey-patching de gevent compris)."""
+    from app import start_background_services
+
+    start_background_services(worker.wsgi)
@@ -0,0 +1,68 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Configuration lue à l'import des modules de l'application (routes, stockages) :
+# fichiers de données dans un répertoire temporaire, collecteur désactivé
+_data_dir = tempfile.mkdtemp(prefix="tests-data-")
+for _name, _value in {
+    "SMTP_SERVER": "localhost",
+    "SMTP_PORT": "25",
+    "SMTP_EMAIL": "test@example.com",
+    "SMTP_PASSWORD": "test",
+    "FIREBASE_API_KEY": "test",
+    "POLLER_ENABLED": "0",
+    "PRICE_STORE_PATH": os.path.join(_data_dir, "prices.sqlite3"),
+    "ALERTS_DB_PATH": os.path.join(_data_dir, "alerts.sqlite3"),
+    "SNAPSHOT_PATH": os.path.join(_data_dir, "market_snapshot.json"),
+    "RATELIMIT_STORAGE_URI": "memory://",
+    "ALERT_CHECK_INTERVAL": "3600",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+
+class FakePriceStore:
+    """
+    Stockage de prix en mémoire : barres journalières des jours ouvrés, de `first` à `last`.
+    """
+
+    def __init__(self, first="2021-01-04", last="2024-06-28"):
+        index = pd.bdate_range(first, last, name="Date")
+        closes = 100 + np.cumsum(np.sin(np.arange(len(index)) / 20))
+        self.bars = pd.DataFrame({"Open": closes, "High": closes + 1, "Low": closes - 1, "Close": closes,
+                                  "Volume": 1000}, index=index)
+        self.calls = []
+
+    def history(self, stock_symbol, start=None, end=None, period=None):
+        self.calls.append((stock_symbol, start, end))
+        bars = self.bars.loc[pd.Timestamp(start or "1980-01-01"):]
+        if end:
+            bars = bars.loc[:pd.Timestamp(end) - pd.Timedelta(days=1)]
+        return bars.copy()
+
+
+@pytest.fixture
+def price_store(monkeypatch):
+    from app.utils import scraper
+
+    store = FakePriceStore()
+    monkeypatch.setattr(scraper, "get_price_store", lambda: store)
+    scraper.history_cache.invalidate()
+    return store
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app
+
+    app = create_app()
+    app.config.update(SECRET_KEY="test", TESTING=True)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
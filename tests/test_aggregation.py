@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.aggregation import aggregate_prices, format_prices_with_month, prices_by_year
+
+
+@pytest.fixture
+def closes():
+    index = pd.bdate_range("2023-01-02", "2024-06-28")
+    return pd.Series(np.arange(len(index), dtype=float), index=index)
+
+
+def test_month_end_closes(closes):
+    """Le prix retenu pour chaque mois est le dernier jour de bourse du mois"""
+    records = format_prices_with_month(closes, year="2024")
+    assert [r["mois"] for r in records] == ["January", "February", "March", "April", "May", "June"]
+    assert records[0] == {"année": "2024", "date": "2024-01-01", "mois": "January",
+                          "prix": closes["2024-01-31"]}
+    assert records[-1]["prix"] == closes.iloc[-1]
+
+
+def test_prices_by_year_single_pass(closes):
+    """Plusieurs années sont agrégées ensemble puis regroupées par année"""
+    by_year = prices_by_year(closes, [2022, 2023, 2024])
+    assert by_year[2022] == []
+    assert len(by_year[2023]) == 12
+    assert len(by_year[2024]) == 6
+    assert by_year[2023][-1]["prix"] == closes["2023-12-29"]
+
+
+def test_other_frequencies_and_reductions(closes):
+    """Agrégations hebdomadaires, trimestrielles, moyennes et OHLC"""
+    weekly = aggregate_prices(closes, freq="W", years=[2024])
+    assert weekly.index[0] == pd.Timestamp("2024-01-05")
+    quarterly_mean = aggregate_prices(closes, freq="Q", how="mean", years=[2023])
+    assert quarterly_mean.iloc[0] == closes["2023-01":"2023-03"].mean()
+    records = format_prices_with_month(closes, year=2024, freq="Q", how="ohlc")
+    assert records[0]["date"] == "2024-01-01"
+    assert records[0]["open"] == closes["2024-01-01"]
+    assert records[0]["close"] == closes["2024-03-29"]
+
+
+def test_dated_dicts_accepted_and_undated_prices_rejected():
+    """Les prix datés sous forme de dictionnaires sont acceptés ; sans date, aucune date n'est inventée"""
+    records = format_prices_with_month([{"date": "2024-01-15", "price": 150},
+                                        {"date": "2024-01-31", "price": 155}], year="2024")
+    assert records == [{"année": "2024", "date": "2024-01-01", "mois": "January", "prix": 155.0}]
+    assert format_prices_with_month([150, 155], year="2024") == []
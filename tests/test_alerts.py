@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from app.utils.alerts import ABOVE, BELOW, Alert, AlertBook, AlertEngine, AlertWatcher
+
+
+def test_book_triggers_only_crossed_alerts():
+    """Seules les alertes franchies par le prix sont déclenchées, une seule fois"""
+    book = AlertBook()
+    for i, (threshold, direction) in enumerate([(110, ABOVE), (120, ABOVE), (90, BELOW), (80, BELOW)]):
+        book.add(i, Alert(email=f"{i}@example.com", price=threshold), direction)
+    assert book.crossed(100) == []
+    assert [a.price for _, a in book.crossed(115)] == [110]
+    assert [a.price for _, a in book.crossed(85)] == [90]
+    assert [a.price for _, a in book.crossed(125)] == [120]
+    assert book.crossed(125) == []
+    assert len(book) == 1
+
+
+def test_book_matches_linear_scan():
+    """La recherche dichotomique donne le même résultat qu'un parcours de toutes les alertes"""
+    rng = random.Random(0)
+    book = AlertBook()
+    pending = []
+    for i in range(2000):
+        alert = Alert(email=f"{i}@example.com", price=rng.uniform(50, 150))
+        direction = ABOVE if alert.price >= 100 else BELOW
+        book.add(i, alert, direction)
+        pending.append((i, alert, direction))
+    price = 100.0
+    for _ in range(200):
+        price += rng.uniform(-3, 3)
+        expected = {i for i, a, d in pending
+                    if (d == ABOVE and price >= a.price) or (d == BELOW and price <= a.price)}
+        pending = [p for p in pending if p[0] not in expected]
+        assert {i for i, _ in book.crossed(price)} == expected
+
+
+def test_book_batches_match_single_inserts():
+    """Lots copiés, fusionnés ou insérés un à un : même index qu'avec des ajouts individuels"""
+    rng = random.Random(1)
+    alerts = [(i, Alert(email=f"{i}@example.com", price=round(rng.uniform(50, 150))),
+               ABOVE if i % 2 else BELOW) for i in range(3000)]
+    single, batched = AlertBook(), AlertBook()
+    for i, alert, direction in alerts:
+        single.add(i, alert, direction)
+    for batch in (alerts[:1000], alerts[1000:2990], alerts[2990:]):
+        for direction in (ABOVE, BELOW):
+            batched.extend([(i, alert.email, alert.price) for i, alert, d in batch if d == direction], direction)
+
+    assert batched.keys == single.keys
+    for price in (100, 120, 70, 150, 50):
+        assert [i for i, _ in batched.crossed(price)] == [i for i, _ in single.crossed(price)]
+    assert len(batched) == len(single) == 0
+
+
+def test_engine_persists_and_notifies(tmp_path):
+    """Les alertes enregistrées sont chargées par le moteur, notifiées puis marquées déclenchées"""
+    notified = []
+    path = str(tmp_path / "alerts.sqlite3")
+    writer = AlertEngine(path, notify=lambda email, price, symbol: notified.append((email, price, symbol)))
+    assert writer.add(Alert(email="haut@example.com", price=200), current_price=190)[1] == ABOVE
+    assert writer.add(Alert(email="bas@example.com", price=180), current_price=190)[1] == BELOW
+    writer.add(Alert(email="msft@example.com", price=500, symbol="MSFT"), current_price=400)
+
+    engine = AlertEngine(path, notify=lambda email, price, symbol: notified.append((email, price, symbol)))
+    assert engine.on_tick("AAPL", 195) == []
+    assert [a.email for a in engine.on_tick("AAPL", 201)] == ["haut@example.com"]
+    assert notified == [("haut@example.com", 200.0, "AAPL")]
+    assert sorted(engine.active_symbols()) == ["AAPL", "MSFT"]
+
+    # Un nouveau moteur (redémarrage) ne recharge que les alertes encore actives
+    restarted = AlertEngine(path, notify=lambda email, price, symbol: notified.append((email, price, symbol)))
+    assert [a.email for a in restarted.on_tick("AAPL", 170)] == ["bas@example.com"]
+    assert restarted.active_symbols() == ["MSFT"]
+
+
+def test_alerts_are_evaluated_without_the_poller(app, client, monkeypatch):
+    """Configuration par défaut (collecteur désactivé) : une alerte enregistrée est évaluée et notifiée"""
+    from app.utils.alerts import get_alert_engine
+
+    assert "market_data_poller" not in app.extensions
+    watcher = app.extensions["alert_watcher"]
+    monkeypatch.setattr("app.routes.get_watchlist_quotes", lambda symbols, timeout=None: {"NFLX": 600.0})
+    response = client.post("/set-alert/", json={"email": "nflx@example.com", "price": 650, "symbol": "nflx"})
+    assert response.status_code == 202
+    assert watcher._thread is not None and watcher._thread.is_alive()
+
+    notified = []
+    monkeypatch.setattr(get_alert_engine(), "notify", lambda *args: notified.append(args))
+    prices = iter([640.0, 655.0])
+    monkeypatch.setattr("app.utils.alerts.get_watchlist_quotes",
+                        lambda symbols, timeout=None: {symbol: next(prices) for symbol in symbols})
+
+    assert watcher.check() == []
+    assert [alert.email for alert in watcher.check()] == ["nflx@example.com"]
+    assert notified == [("nflx@example.com", 650.0, "NFLX")]
+    assert "NFLX" not in get_alert_engine().active_symbols()
+
+
+def test_only_one_watcher_per_machine_evaluates(tmp_path):
+    """Le verrou de fichier réserve l'évaluation à un seul processus"""
+    engine = AlertEngine(str(tmp_path / "alerts.sqlite3"), notify=lambda *args: None)
+    lock_path = str(tmp_path / "alerts.lock")
+    first, second = AlertWatcher(engine, lock_path=lock_path), AlertWatcher(engine, lock_path=lock_path)
+
+    assert first.check() == []
+    assert second.check() is None
+    first.stop()
+    assert second.check() == []
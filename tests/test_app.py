@@ -95,7 +95,7 @@ def test_stock_data(client):
 def test_set_alert(client):
     """Test the alert creation (POST)"""
     response = client.post('/set-alert/', json={'email': 'testalert@example.com', 'price': 160})
-    assert response.status_code == 200
+    assert response.status_code == 202
     data = json.loads(response.data)
     assert data["message"] == "Alerte configurée avec succès !"
 
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.cache import TTLCache
+
+
+def test_fresh_entries_are_hits():
+    """Une entrée fraîche est servie sans rappeler la fonction de chargement"""
+    cache = TTLCache(ttl=60)
+    calls = []
+    loader = lambda: calls.append(1) or len(calls)
+    assert cache.get("AAPL", loader) == 1
+    assert cache.get("AAPL", loader) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_stale_entry_served_while_single_refresh_runs():
+    """Une entrée périmée est servie immédiatement et un seul rafraîchissement est lancé"""
+    cache = TTLCache(ttl=0.01)
+    cache.get("AAPL", lambda: "v1")
+    time.sleep(0.02)
+
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(1)
+        return "v2"
+
+    assert [cache.get("AAPL", slow_loader) for _ in range(5)] == ["v1"] * 5
+    release.set()
+    for _ in range(100):
+        if cache.stats()["refreshes"]:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 1
+    assert cache.stats()["stale_hits"] == 5
+    assert cache._data["AAPL"][0] == "v2"
+
+
+def test_failed_refresh_keeps_stale_value():
+    """Un rafraîchissement en échec conserve l'ancienne valeur"""
+    cache = TTLCache(ttl=0)
+    cache.get("AAPL", lambda: "v1")
+
+    def failing():
+        raise RuntimeError("Yahoo indisponible")
+
+    assert cache.get("AAPL", failing) == "v1"
+    for _ in range(100):
+        if cache.stats()["refresh_errors"]:
+            break
+        time.sleep(0.01)
+    assert cache.stats()["refresh_errors"] == 1
+    assert cache.get("AAPL", lambda: "v2") == "v1"
+
+
+def test_lru_eviction():
+    """Le cache est borné et évince l'entrée la moins récemment utilisée"""
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.get("AAPL", lambda: 1)
+    cache.get("MSFT", lambda: 2)
+    cache.get("AAPL", lambda: 1)
+    cache.get("NVDA", lambda: 3)
+    assert list(cache._data) == ["AAPL", "NVDA"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_miss_errors_propagate():
+    """Une erreur de chargement sans valeur en cache est propagée et rien n'est mis en cache"""
+    cache = TTLCache(ttl=60)
+    with pytest.raises(RuntimeError):
+        cache.get("AAPL", lambda: (_ for _ in ()).throw(RuntimeError("erreur")))
+    assert cache.stats()["size"] == 0
+
+
+def test_concurrent_misses_load_once():
+    """Des absences simultanées d'une même clé ne déclenchent qu'un seul chargement"""
+    cache = TTLCache(ttl=60)
+    release = threading.Event()
+    calls, results = [], []
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(1)
+        return "v1"
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get("AAPL", slow_loader))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while cache._flight.executions + cache._flight.coalesced < 5:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == ["v1"] * 5
+    assert cache.stats()["coalesced"] == 4
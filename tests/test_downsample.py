@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from app.utils.downsample import lttb_indices
+
+
+def test_short_series_is_returned_unchanged():
+    """Une série qui tient dans le nombre de points demandé n'est pas réduite"""
+    assert lttb_indices([1, 2, 3], [5.0, 6.0, 7.0], 500).tolist() == [0, 1, 2]
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    """La série réduite garde ses extrémités, son pic et son creux"""
+    x = np.arange(1260, dtype=float)
+    y = np.sin(x / 100) * 10 + 100
+    y[700] = 150.0
+    y[300] = 40.0
+
+    selected = lttb_indices(x, y, 50)
+
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 1259
+    assert np.all(np.diff(selected) > 0)
+    assert {300, 700} <= set(selected.tolist())
+
+
+def test_invalid_threshold_is_rejected():
+    """Au moins trois points sont nécessaires (les deux extrémités et un groupe)"""
+    with pytest.raises(ValueError):
+        lttb_indices(np.arange(10), np.arange(10), 2)
@@ -0,0 +1,110 @@
+import datetime
+import time
+
+import jwt
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from app.utils.firebase_auth import InvalidIdTokenError, PublicKeyCache, TokenVerifier
+
+PROJECT_ID = "test-project"
+
+
+def make_key_pair():
+    """Clé RSA locale et certificat auto-signé, à la place des certificats publics de Google"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.test")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(1).not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+            .sign(key, hashes.SHA256()))
+    return key, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class FakeCerts:
+    def __init__(self, max_age=3600):
+        self.max_age = max_age
+        self.certs = {}
+        self.keys = {}
+        self.calls = 0
+        self.rotate("kid-1")
+
+    def rotate(self, kid):
+        self.keys[kid], self.certs[kid] = make_key_pair()
+
+    def __call__(self):
+        self.calls += 1
+        return dict(self.certs), self.max_age
+
+
+def make_token(certs, kid="kid-1", audience=PROJECT_ID, lifetime=3600, **claims):
+    now = int(time.time())
+    payload = {"iss": f"https://securetoken.google.com/{audience}", "aud": audience, "sub": "uid-1",
+               "iat": now, "auth_time": now, "exp": now + lifetime, "name": "alice", **claims}
+    return jwt.encode(payload, certs.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def certs():
+    return FakeCerts()
+
+
+def test_valid_token_is_verified_once(certs):
+    """Un idToken valide est vérifié localement, puis servi depuis le cache sans nouvelle vérification"""
+    verifier = TokenVerifier(PROJECT_ID, keys=PublicKeyCache(fetch=certs))
+    token = make_token(certs)
+    assert verifier.verify(token)["name"] == "alice"
+    assert verifier.verify(token)["sub"] == "uid-1"
+    assert certs.calls == 1
+    assert verifier.stats()["hits"] == 1
+    assert verifier.stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"lifetime": -3600},
+    {"audience": "other-project"},
+    {"sub": ""},
+])
+def test_invalid_tokens_are_rejected(certs, kwargs):
+    """Un jeton expiré, destiné à un autre projet ou sans sujet est refusé"""
+    verifier = TokenVerifier(PROJECT_ID, keys=PublicKeyCache(fetch=certs))
+    with pytest.raises(InvalidIdTokenError):
+        verifier.verify(make_token(certs, **kwargs))
+
+
+def test_forged_signature_is_rejected(certs):
+    """Un jeton signé par une autre clé que celle annoncée est refusé"""
+    verifier = TokenVerifier(PROJECT_ID, keys=PublicKeyCache(fetch=certs))
+    forged_key, _ = make_key_pair()
+    token = jwt.encode({"sub": "uid-1", "aud": PROJECT_ID, "iat": int(time.time()), "exp": int(time.time()) + 60,
+                        "iss": f"https://securetoken.google.com/{PROJECT_ID}"},
+                       forged_key, algorithm="RS256", headers={"kid": "kid-1"})
+    with pytest.raises(InvalidIdTokenError):
+        verifier.verify(token)
+
+
+def test_certs_follow_cache_control_and_rotation(certs):
+    """Les certificats sont retéléchargés à l'expiration de Cache-Control ou pour une clé inconnue"""
+    now = [1000.0]
+    keys = PublicKeyCache(fetch=certs, clock=lambda: now[0], min_refresh_interval=60)
+    keys.get("kid-1")
+    keys.get("kid-1")
+    assert certs.calls == 1
+
+    # Rotation : une clé inconnue déclenche un rechargement, limité à un par minute
+    certs.rotate("kid-2")
+    with pytest.raises(InvalidIdTokenError):
+        keys.get("kid-2")
+    now[0] += 61
+    keys.get("kid-2")
+    assert certs.calls == 2
+    with pytest.raises(InvalidIdTokenError):
+        keys.get("kid-inconnu")
+    assert certs.calls == 2
+
+    now[0] += certs.max_age
+    keys.get("kid-1")
+    assert certs.calls == 3
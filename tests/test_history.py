@@ -0,0 +1,53 @@
+def test_history_downsamples_the_range(client, price_store):
+    """La série est réduite à `max_points` points, bornes de la plage conservées"""
+    response = client.get("/history/aapl?start=2022-01-01&end=2024-01-01&max_points=100")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    closes = price_store.bars.loc["2022-01-01":"2023-12-31", "Close"]
+    assert data["stock_symbol"] == "AAPL" and data["interval"] == "1d"
+    assert data["total_points"] == len(closes)
+    assert len(data["dates"]) == len(data["actualPrices"]) == 100
+    assert data["dates"][0] == "2022-01-03" and data["dates"][-1] == "2023-12-29"
+    assert data["actualPrices"][-1] == closes.iloc[-1]
+    assert response.last_modified.date().isoformat() == "2023-12-29"
+    assert price_store.calls == [("AAPL", "2022-01-01", "2024-01-01")]
+
+
+def test_history_weekly_interval(client, price_store):
+    """Les clôtures hebdomadaires sont agrégées avant la réduction"""
+    data = client.get("/history/AAPL?start=2023-01-01&end=2024-01-01&interval=1wk").get_json()
+
+    assert data["total_points"] == len(data["dates"]) == 52
+
+
+def test_history_empty_range(client, price_store):
+    """Une plage valide sans barre (week-end, dates futures) donne une série vide, sans Last-Modified"""
+    for query in ("start=2024-01-06&end=2024-01-08", "start=2030-01-01", "start=2030-01-01&interval=1mo"):
+        response = client.get(f"/history/AAPL?{query}")
+
+        assert response.status_code == 200, query
+        data = response.get_json()
+        assert data["dates"] == data["actualPrices"] == [] and data["total_points"] == 0
+        assert response.last_modified is None and response.headers["ETag"]
+
+
+def test_history_rejects_invalid_parameters(client, price_store):
+    """Dates, intervalle ou nombre de points invalides : 400 sans lecture des prix"""
+    for query in ("start=2024-13-01", "start=2024-02-01&end=2024-01-01", "interval=1h",
+                  "max_points=2", "max_points=10000", "max_points=abc"):
+        response = client.get(f"/history/AAPL?{query}")
+        assert response.status_code == 400, query
+        assert "error" in response.get_json()
+    assert price_store.calls == []
+
+
+def test_history_revalidates_with_etag(client, price_store):
+    """Un client qui possède déjà la série reçoit un 304 sans corps, servi depuis le cache"""
+    url = "/history/AAPL?start=2023-01-01&max_points=50"
+    first = client.get(url)
+
+    revalidated = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+
+    assert revalidated.status_code == 304 and revalidated.data == b""
+    assert len(price_store.calls) == 1
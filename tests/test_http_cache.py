@@ -0,0 +1,82 @@
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+from flask import Flask, render_template_string
+
+from app.utils import http_cache
+from app.utils.http_cache import conditional_json, precompress_static
+
+LAST_BAR = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def app(tmp_path):
+    vendor = tmp_path / "assets" / "vendor"
+    vendor.mkdir(parents=True)
+    (vendor / "lib.js").write_text("function f() { return 1; }\n" * 2000)
+    app = Flask(__name__, static_folder=str(tmp_path))
+    http_cache.init_app(app)
+
+    @app.route("/data")
+    def data():
+        return conditional_json({"prices": list(range(1000))}, last_modified=LAST_BAR)
+
+    @app.route("/page")
+    def page():
+        return render_template_string("<script src=\"{{ url_for('static', filename='assets/vendor/lib.js') }}\">"
+                                      "</script>" + "<p>page</p>" * 200)
+
+    return app
+
+
+def test_json_is_revalidated_with_etag_and_last_bar_date(app):
+    """Une réponse déjà reçue est revalidée par une 304 sans corps"""
+    client = app.test_client()
+    first = client.get("/data")
+
+    assert first.headers["Last-Modified"] == "Tue, 02 Jan 2024 00:00:00 GMT"
+    assert "no-cache" in first.headers["Cache-Control"]
+    again = client.get("/data", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_json_is_gzipped_when_accepted(app, monkeypatch):
+    """Le corps est compressé si le client l'accepte, et l'ETag faible reste valide en revalidation"""
+    monkeypatch.setattr(http_cache, "brotli", None)
+    client = app.test_client()
+    response = client.get("/data", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert b'"prices"' in gzip.decompress(response.data)
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"].startswith("W/")
+    again = client.get("/data", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_pages_get_an_etag(app):
+    """Les pages HTML sont revalidables"""
+    client = app.test_client()
+    etag = client.get("/page").headers["ETag"]
+    assert client.get("/page", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_vendor_assets_are_precompressed_and_immutable(app):
+    """Les ressources versionnées sont servies précompressées et déclarées immuables"""
+    written = precompress_static(app.static_folder)
+    assert any(path.endswith("lib.js.gz") for path in written)
+    assert precompress_static(app.static_folder) == []
+
+    client = app.test_client()
+    url = client.get("/page").data.decode().split('"')[1]
+    assert "?v=" in url
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.mimetype == "text/javascript"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "no-cache" not in response.headers["Cache-Control"]
+    assert gzip.decompress(response.data).startswith(b"function f()")
+    response.close()
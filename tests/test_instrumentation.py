@@ -0,0 +1,67 @@
+import pytest
+from flask import Flask
+
+from app.utils import instrumentation
+from app.utils.instrumentation import Histogram, IN_FLIGHT, REQUESTS, SPAN_ERRORS, SPAN_SECONDS, render_metrics, span
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Les effectifs sont cumulés par borne, avec +Inf, somme et nombre"""
+    histogram = Histogram("test_latency_seconds", "Durées de test.", ["stage"], buckets=(0.1, 1.0))
+    try:
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value, "load")
+        lines = histogram.render()
+    finally:
+        del instrumentation.METRICS["test_latency_seconds"]
+
+    assert lines[:2] == ["# HELP test_latency_seconds Durées de test.", "# TYPE test_latency_seconds histogram"]
+    assert 'test_latency_seconds_bucket{stage="load",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{stage="load",le="1.0"} 3' in lines
+    assert 'test_latency_seconds_bucket{stage="load",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_sum{stage="load"} 4.25' in lines
+    assert 'test_latency_seconds_count{stage="load"} 4' in lines
+
+
+def test_span_records_duration_and_errors():
+    """Une étape est mesurée même si elle lève, et l'échec est compté"""
+    _, _, before = SPAN_SECONDS.snapshot("test.span")
+    with span("test.span"):
+        pass
+    with pytest.raises(ValueError):
+        with span("test.span"):
+            raise ValueError("échec")
+
+    _, _, after = SPAN_SECONDS.snapshot("test.span")
+    assert after - before == 2
+    assert 'app_span_errors_total{span="test.span"} 1' in SPAN_ERRORS.render()
+
+
+def test_disabled_span_is_a_noop(monkeypatch):
+    """Instrumentation désactivée : aucune observation"""
+    monkeypatch.setattr(instrumentation, "ENABLED", False)
+    with span("test.disabled"):
+        pass
+    assert SPAN_SECONDS.snapshot("test.disabled")[2] == 0
+
+
+def test_requests_are_counted_per_route():
+    """Les requêtes sont comptées par modèle d'URL et la jauge revient à zéro"""
+    app = Flask(__name__)
+    instrumentation.init_app(app)
+    seen = {}
+
+    @app.route("/test-items/<item>")
+    def item(item):
+        seen["in_flight"] = IN_FLIGHT._values.get(("/test-items/<item>",))
+        return item
+
+    client = app.test_client()
+    client.get("/test-items/a")
+    client.get("/test-items/b")
+
+    assert seen["in_flight"] == 1
+    assert IN_FLIGHT._values[("/test-items/<item>",)] == 0
+    assert REQUESTS._values[("/test-items/<item>", "GET", "200")] == 2
+    assert instrumentation.REQUEST_SECONDS.snapshot("/test-items/<item>", "GET")[2] == 2
+    assert 'http_requests_total{route="/test-items/<item>",method="GET",status="200"} 2' in render_metrics()
@@ -0,0 +1,49 @@
+import os
+import threading
+
+from app.utils.leader import LeaderThread
+
+
+class Counter(LeaderThread):
+    thread_name = "counter"
+
+    def __init__(self, lock_path):
+        super().__init__(lock_path)
+        self.runs = 0
+        self.ran = threading.Event()
+
+    def _run(self):
+        if self._acquire_leadership():
+            self.runs += 1
+        self.ran.set()
+        self._stop.wait()
+
+
+def test_started_once_per_process(tmp_path):
+    """Un seul thread par processus, quel que soit le nombre d'appels à start"""
+    task = Counter(str(tmp_path / "task.lock"))
+    task.start()
+    thread = task._thread
+    task.start()
+    assert task.ran.wait(5)
+    assert task._thread is thread and thread.name == "counter" and task.runs == 1
+    task.stop()
+    assert not thread.is_alive()
+
+
+def test_restarted_after_fork(tmp_path):
+    """Dans un processus enfant, start relance le thread avec son propre descripteur de verrou"""
+    task = Counter(str(tmp_path / "task.lock"))
+    task.start()
+    assert task.ran.wait(5)
+    inherited = task._lock_file
+
+    task._pid = os.getpid() + 1  # simule un fork : le thread appartient à un autre processus
+    task._stop.set()
+    task._thread.join(5)
+    task.ran.clear()
+    task.start()
+    assert task.ran.wait(5)
+    assert task._lock_file is not inherited and task._thread.is_alive()
+    task.stop()
+
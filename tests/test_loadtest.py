@@ -0,0 +1,52 @@
+import functools
+
+import pytest
+
+from app.utils.firebase_auth import PublicKeyCache, TokenVerifier, fetch_public_certs
+from benchmarks.loadtest import yahoo_client
+from benchmarks.loadtest.harness import parse_configs, summarize
+from benchmarks.loadtest.stubs import UpstreamStubs
+
+
+@pytest.fixture
+def stubs():
+    stubs = UpstreamStubs("loadtest-project", latency=0).start()
+    yield stubs
+    stubs.stop()
+
+
+def test_stub_tokens_are_verified_like_firebase_tokens(stubs):
+    """Les idTokens du bouchon sont vérifiés avec les certificats qu'il publie"""
+    keys = PublicKeyCache(fetch=functools.partial(fetch_public_certs, f"{stubs.url}/firebase/certs"))
+    verifier = TokenVerifier("loadtest-project", keys=keys)
+
+    claims = verifier.verify(stubs.firebase.mint_token("user-1", name="Alice"))
+
+    assert claims["sub"] == "user-1"
+    assert claims["name"] == "Alice"
+
+
+def test_http_ticker_reads_the_stub_market(stubs, monkeypatch):
+    """Le remplaçant de yfinance passe par HTTP et restitue les barres et le téléchargement groupé"""
+    monkeypatch.setenv("LOADTEST_YAHOO_URL", stubs.url)
+
+    history = yahoo_client.HttpTicker("AAPL").history(period="5d")
+    data = yahoo_client.download(["AAPL", "MSFT"], period="5d")
+
+    assert len(history) == 5
+    assert list(history.columns[:4]) == ["Open", "High", "Low", "Close"]
+    assert data["Close"].columns.tolist() == ["AAPL", "MSFT"]
+    assert stubs.calls == {"history": 1, "download": 1}
+
+
+def test_summary_reports_percentiles_per_route():
+    """Débit, erreurs et percentiles sont calculés par route et au total"""
+    samples = [("GET /", i / 1000, True) for i in range(1, 101)] + [("GET /news", 0.5, False)]
+
+    report = summarize(samples, duration=10)
+
+    assert report["GET /"]["requests"] == 100
+    assert report["GET /"]["p50"] == pytest.approx(50.5)
+    assert report["GET /news"]["errors"] == 1
+    assert report["total"]["rps"] == 10.1
+    assert parse_configs("1x4,2X2") == [(1, 4), (2, 2)]
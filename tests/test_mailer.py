@@ -0,0 +1,78 @@
+import socket
+import time
+
+import pytest
+
+from app.utils.mailer import MailDispatcher
+
+aiosmtpd = pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller  # noqa: E402
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield handler, controller
+    controller.stop()
+
+
+def test_burst_is_batched_over_one_connection(smtp_server):
+    """Une rafale d'alertes est envoyée sur une seule session SMTP"""
+    handler, controller = smtp_server
+    dispatcher = MailDispatcher("127.0.0.1", controller.port, sender="alertes@example.com",
+                                workers=1, use_starttls=False)
+    for i in range(10):
+        assert dispatcher.submit(f"client{i}@example.com", 150.0 + i, "MSFT")
+    dispatcher.start()
+    dispatcher.join()
+    dispatcher.stop()
+
+    assert len(handler.messages) == 10
+    assert handler.messages[0].rcpt_tos == ["client0@example.com"]
+    assert b"l'action MSFT a atteint votre seuil : $150.0" in handler.messages[0].content
+    assert b"Subject: Alerte de prix MSFT !" in handler.messages[0].content
+    assert len(handler.sessions) == 1
+    assert dispatcher.stats()["connections"] == 1
+    assert dispatcher.stats()["sent"] == 10
+
+
+def test_retry_with_backoff_after_server_outage():
+    """Les envois sont retentés avec un délai croissant lorsque le serveur est indisponible"""
+    port = free_port()
+    dispatcher = MailDispatcher("127.0.0.1", port, sender="alertes@example.com", workers=1,
+                                use_starttls=False, max_retries=4, backoff=0.05, timeout=1)
+    dispatcher.submit("client@example.com", 150.0)
+    dispatcher.start()
+    time.sleep(0.1)
+
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        dispatcher.join()
+    finally:
+        dispatcher.stop()
+        controller.stop()
+
+    assert len(handler.messages) == 1
+    assert dispatcher.stats()["retries"] >= 1
+    assert dispatcher.stats()["failed"] == 0
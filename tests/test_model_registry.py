@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from app.models.registry import ModelRegistry, ModelNotAvailableError
+
+
+def fake_loader(path):
+    with open(path) as f:
+        return {"weights": f.read()}
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / "model.bin"
+    path.write_text("v1")
+    return str(path)
+
+
+def test_registry_loads_once(model_file):
+    """Le modèle n'est chargé qu'une fois pour des appels répétés"""
+    registry = ModelRegistry(model_file, loader=fake_loader, warmer=None, check_interval=60)
+    first = registry.get()
+    for _ in range(10):
+        assert registry.get() is first
+    assert registry.loads == 1
+    stats = registry.stats()
+    assert stats["loaded"] is True
+    assert stats["version"] == first.version
+    assert stats["load_seconds"] >= 0
+
+
+def test_registry_hot_swaps_on_file_change(model_file):
+    """Un nouvel artefact est chargé quand le fichier change, l'ancien handle reste utilisable"""
+    registry = ModelRegistry(model_file, loader=fake_loader, warmer=None, check_interval=0)
+    old = registry.get()
+    with open(model_file, "w") as f:
+        f.write("v2-plus-long")
+    os.utime(model_file, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+    new = registry.get()
+    assert new is not old
+    assert new.model == {"weights": "v2-plus-long"}
+    assert old.model == {"weights": "v1"}
+    assert new.version != old.version
+
+
+def test_registry_keeps_serving_when_reload_fails(model_file):
+    """Si le nouvel artefact est illisible, l'ancien modèle continue d'être servi"""
+    calls = {"n": 0}
+
+    def flaky_loader(path):
+        calls["n"] += 1
+        if calls["n"] > 1:
+            raise OSError("fichier corrompu")
+        return fake_loader(path)
+
+    registry = ModelRegistry(model_file, loader=flaky_loader, warmer=None, check_interval=0)
+    old = registry.get()
+    with open(model_file, "w") as f:
+        f.write("corrompu")
+    os.utime(model_file, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+    assert registry.get() is old
+    assert registry.stats()["last_error"] == "fichier corrompu"
+
+
+def test_registry_concurrent_first_load(model_file):
+    """Des threads concurrents déclenchent un seul chargement"""
+    def slow_loader(path):
+        time.sleep(0.05)
+        return fake_loader(path)
+
+    registry = ModelRegistry(model_file, loader=slow_loader, warmer=None, check_interval=60)
+    handles = []
+    threads = [threading.Thread(target=lambda: handles.append(registry.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert registry.loads == 1
+    assert all(h is handles[0] for h in handles)
+
+
+def test_registry_uses_published_metadata_version(model_file):
+    """La version publiée par l'entraînement est utilisée si elle correspond au fichier"""
+    from app.models.registry import file_version
+
+    metadata_path = os.path.splitext(model_file)[0] + ".json"
+    with open(metadata_path, "w") as f:
+        json.dump({"version": "lstm-20240101T000000", "sha256": file_version(model_file)}, f)
+    registry = ModelRegistry(model_file, loader=fake_loader, warmer=None)
+    assert registry.get().version == "lstm-20240101T000000"
+
+
+def test_registry_fails_fast_without_artifact(tmp_path):
+    """Sans artefact publié, le registre échoue immédiatement au lieu d'entraîner"""
+    registry = ModelRegistry(str(tmp_path / "absent.h5"), loader=fake_loader, warmer=None)
+    with pytest.raises(ModelNotAvailableError):
+        registry.get()
+
+
+def test_registry_reloads_when_file_is_replaced_during_load(model_file):
+    """Un artefact publié pendant le chargement n'est pas associé aux anciens poids"""
+    calls = []
+
+    def racing_loader(path):
+        model = fake_loader(path)
+        if not calls:
+            # Publication concurrente : le fichier change après la lecture des poids
+            with open(model_file, "w") as f:
+                f.write("v2-plus-long")
+            os.utime(model_file, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        calls.append(path)
+        return model
+
+    registry = ModelRegistry(model_file, loader=racing_loader, warmer=None, check_interval=60)
+    handle = registry.get()
+
+    from app.models.registry import file_version
+    assert len(calls) == 2
+    assert handle.model == {"weights": "v2-plus-long"}
+    assert handle.version == file_version(model_file)
+    assert handle.signature == registry._signature()
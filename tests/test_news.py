@@ -0,0 +1,106 @@
+import pytest
+
+from app.utils.news import NewsCache, normalize_news_item
+
+
+def old_item(i):
+    return {"uuid": f"u{i}", "title": f"Titre {i}", "publisher": "Reuters", "link": f"https://example.com/{i}",
+            "providerPublishTime": 1_700_000_000 + i * 60, "type": "STORY",
+            "thumbnail": {"resolutions": [{"url": "https://example.com/big.jpg", "width": 1200, "height": 800},
+                                          {"url": "https://example.com/small.jpg", "width": 140, "height": 140}]}}
+
+
+def test_both_yahoo_formats_are_normalized():
+    """L'ancien format et le nouveau (champs imbriqués sous `content`) donnent les mêmes champs"""
+    new = {"id": "abc", "content": {"id": "abc", "title": "Apple", "pubDate": "2023-11-14T22:13:20Z",
+                                    "provider": {"displayName": "Yahoo Finance"},
+                                    "canonicalUrl": {"url": "https://finance.yahoo.com/abc"},
+                                    "clickThroughUrl": None, "summary": "…" * 500}}
+
+    assert normalize_news_item(new) == {"uuid": "abc", "title": "Apple", "link": "https://finance.yahoo.com/abc",
+                                        "publisher": "Yahoo Finance", "time": 1_700_000_000, "thumbnail": None}
+    assert normalize_news_item(old_item(0)) == {"uuid": "u0", "title": "Titre 0", "link": "https://example.com/0",
+                                                "publisher": "Reuters", "time": 1_700_000_000,
+                                                "thumbnail": "https://example.com/small.jpg"}
+    assert normalize_news_item({"title": "sans identifiant"}) is None
+
+
+def test_items_are_deduplicated_and_merged_incrementally():
+    """Seules les actualités inconnues sont ajoutées ; celles sorties du flux restent disponibles"""
+    cache = NewsCache(fetch=None)
+
+    assert cache.merge("AAPL", [old_item(i) for i in range(3)]) == 3
+    assert cache.merge("AAPL", [old_item(i) for i in range(2, 5)]) == 2
+    page = cache.page("AAPL")
+
+    assert [item["title"] for item in page["news"]] == [f"Titre {i}" for i in (4, 3, 2, 1, 0)]
+    assert set(page["news"][0]) == {"title", "link", "publisher", "time"}
+    assert page["latest"] == 1_700_000_240
+
+
+def test_since_and_before_cursors():
+    """`since` ne retourne que les nouvelles actualités, `next_before` parcourt les plus anciennes"""
+    cache = NewsCache(fetch=None)
+    cache.merge("AAPL", [old_item(i) for i in range(5)])
+
+    first = cache.page("AAPL", limit=2, fields=("uuid",))
+    assert first["news"] == [{"uuid": "u4"}, {"uuid": "u3"}]
+    second = cache.page("AAPL", limit=2, before=first["next_before"], fields=("uuid",))
+    assert second["news"] == [{"uuid": "u2"}, {"uuid": "u1"}]
+    last = cache.page("AAPL", limit=2, before=second["next_before"], fields=("uuid",))
+    assert last["news"] == [{"uuid": "u0"}] and last["next_before"] is None
+
+    assert cache.page("AAPL", since=first["latest"])["news"] == []
+    cache.merge("AAPL", [old_item(i) for i in range(7)])
+    assert [item["uuid"] for item in cache.page("AAPL", since=first["latest"], fields=("uuid",))["news"]] == ["u6", "u5"]
+
+
+def test_refresh_is_throttled_and_keeps_entries_on_failure(monkeypatch):
+    """Yahoo n'est rappelé qu'après l'intervalle, et une erreur n'efface pas les actualités connues"""
+    now = [0.0]
+    monkeypatch.setattr("app.utils.news.time.monotonic", lambda: now[0])
+    calls = []
+
+    def fetch(symbol):
+        calls.append(symbol)
+        if len(calls) > 1:
+            raise RuntimeError("Yahoo indisponible")
+        return [old_item(0)]
+
+    cache = NewsCache(fetch=fetch, refresh_interval=300)
+    cache.refresh("AAPL")
+    cache.refresh("AAPL")
+    assert calls == ["AAPL"]
+
+    now[0] = 301.0
+    assert cache.refresh("AAPL") == 0
+    assert len(calls) == 2
+    assert cache.page("AAPL")["news"][0]["title"] == "Titre 0"
+    with pytest.raises(RuntimeError):
+        cache.refresh("MSFT")
+
+
+def test_failed_refresh_backs_off(monkeypatch):
+    """Pendant une panne, l'échec est mémorisé : Yahoo n'est rappelé qu'une fois l'intervalle écoulé"""
+    now = [0.0]
+    monkeypatch.setattr("app.utils.news.time.monotonic", lambda: now[0])
+    calls = []
+
+    def fetch(symbol):
+        calls.append(now[0])
+        if len(calls) > 1:
+            raise RuntimeError("Yahoo indisponible")
+        return [old_item(0)]
+
+    cache = NewsCache(fetch=fetch, refresh_interval=300)
+    cache.refresh("AAPL")
+    now[0] = 301.0
+    cache.refresh("AAPL")
+    for now[0] in (302.0, 450.0, 600.0):
+        assert cache.refresh("AAPL") == 0
+        assert cache.page("AAPL")["news"][0]["title"] == "Titre 0"
+    assert calls == [0.0, 301.0]
+
+    now[0] = 602.0
+    cache.refresh("AAPL")
+    assert calls == [0.0, 301.0, 602.0]
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.models.numpy_lstm import NumpyLSTM
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "lstm_model.h5")
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return NumpyLSTM.from_h5(MODEL_PATH)
+
+
+def test_numpy_engine_reads_model(engine):
+    """Le moteur NumPy lit l'architecture et les poids du modèle sauvegardé"""
+    assert engine.lookback == 5
+    assert len(engine.layers) == 3
+    windows = np.random.default_rng(0).random((4, 5, 1))
+    assert engine.predict(windows).shape == (4, 1)
+    assert engine.rollout(windows, 7).shape == (4, 7)
+
+
+def test_rollout_matches_step_by_step_predictions(engine):
+    """Le déroulement équivaut à la boucle d'origine (une prédiction réinjectée par jour)"""
+    window = np.random.default_rng(1).random((1, 5, 1)).astype(np.float32)
+    expected = []
+    current = window
+    for _ in range(5):
+        prediction = engine.predict(current)
+        expected.append(prediction[0, 0])
+        current = np.append(current[:, 1:, :], [[[prediction[0, 0]]]], axis=1)
+    np.testing.assert_allclose(engine.rollout(window, 5)[0], expected, rtol=1e-6)
+
+
+def test_numpy_engine_matches_keras(engine):
+    """Les prédictions NumPy sont équivalentes à celles de Keras"""
+    pytest.importorskip("tensorflow")
+    from app.models.keras_lstm import load_keras_forecaster
+
+    keras = load_keras_forecaster(MODEL_PATH)
+    windows = np.random.default_rng(2).random((16, 5, 1)).astype(np.float32)
+    np.testing.assert_allclose(engine.predict(windows), keras.model(windows, training=False).numpy(), atol=1e-5)
+    np.testing.assert_allclose(engine.rollout(windows, 5), keras.rollout(windows, 5), atol=1e-5)
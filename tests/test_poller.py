@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from app.utils import poller
+from app.models.registry import ModelNotAvailableError
+from app.utils.poller import MarketDataPoller, SnapshotReader, write_snapshot
+
+
+class FakeRegistry:
+    def __init__(self, handle=None):
+        self.handle = handle
+
+    def get(self):
+        if self.handle is None:
+            raise ModelNotAvailableError("Aucun modèle publié")
+        return self.handle
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    monkeypatch.setattr(poller, "get_watchlist_quotes", lambda symbols, timeout: {"AAPL": 190.0})
+    monkeypatch.setattr(poller, "fetch_financial_metrics", lambda symbol: {"beta": 1.2})
+    monkeypatch.setattr(MarketDataPoller, "_recent_closes",
+                        lambda self, symbol: {"dates": ["2024-01-02"], "prices": [185.0]})
+    monkeypatch.setattr(MarketDataPoller, "_news", lambda self, symbol: [{"title": "Apple"}])
+    monkeypatch.setattr(MarketDataPoller, "_evaluate_alerts", lambda self, quotes: None)
+    monkeypatch.setattr(poller, "get_model_registry", lambda path="lstm_model.h5": FakeRegistry())
+
+
+def test_refresh_publishes_snapshot(tmp_path, fake_upstream):
+    """Le collecteur publie un instantané lisible par les workers"""
+    path = str(tmp_path / "snapshot.json")
+    MarketDataPoller(["AAPL", "MSFT"], snapshot_path=path).refresh()
+    snapshot = SnapshotReader(path, max_age=60).get()
+    assert snapshot["symbols"]["AAPL"]["price"] == 190.0
+    assert snapshot["symbols"]["MSFT"]["price"] is None
+    assert snapshot["symbols"]["AAPL"]["metrics"] == {"beta": 1.2}
+    assert snapshot["news"]["AAPL"] == [{"title": "Apple"}]
+
+
+def test_failed_items_keep_previous_values(tmp_path, fake_upstream, monkeypatch):
+    """Une valeur dont la récupération échoue conserve celle de l'instantané précédent"""
+    path = str(tmp_path / "snapshot.json")
+    MarketDataPoller(["AAPL"], snapshot_path=path).refresh()
+    monkeypatch.setattr(poller, "get_watchlist_quotes", lambda symbols, timeout: {})
+    snapshot = MarketDataPoller(["AAPL"], snapshot_path=path).refresh()
+    assert snapshot["symbols"]["AAPL"]["price"] == 190.0
+
+
+def test_reader_decodes_only_on_change_and_rejects_stale(tmp_path):
+    """Le lecteur ne redécode le fichier que s'il change et ignore un instantané trop ancien"""
+    path = str(tmp_path / "snapshot.json")
+    reader = SnapshotReader(path, max_age=60)
+    assert reader.get() is None
+    write_snapshot({"generated_at": time.time(), "symbols": {}, "news": {}}, path)
+    first = reader.get()
+    assert reader.get() is first
+    write_snapshot({"generated_at": time.time() - 120, "symbols": {}, "news": {}}, path)
+    assert reader.get() is None
+
+
+def test_single_leader_per_host(tmp_path):
+    """Un seul collecteur obtient le verrou de la machine"""
+    path = str(tmp_path / "snapshot.json")
+    leader = MarketDataPoller(["AAPL"], snapshot_path=path)
+    follower = MarketDataPoller(["AAPL"], snapshot_path=path)
+    assert leader._acquire_leadership()
+    assert not follower._acquire_leadership()
+    leader.stop()
+    assert follower._acquire_leadership()
+    follower.stop()
+
+
+def test_prediction_precomputed_once_per_bar(tmp_path, fake_upstream, monkeypatch):
+    """La prédiction n'est recalculée que lorsque la dernière barre change"""
+    handle = type("Handle", (), {"model": None, "version": "v1"})()
+    monkeypatch.setattr(poller, "get_model_registry", lambda path="lstm_model.h5": FakeRegistry(handle))
+    calls = []
+    monkeypatch.setattr(poller, "forecast", lambda model, prices, horizon: calls.append(1) or [200.0] * horizon)
+    path = str(tmp_path / "snapshot.json")
+    collector = MarketDataPoller(["AAPL"], snapshot_path=path)
+    collector.refresh()
+    snapshot = collector.refresh()
+    assert len(calls) == 1
+    assert snapshot["symbols"]["AAPL"]["prediction"]["key"] == ["AAPL", "2024-01-02", 185.0, "v1"]
+
+    monkeypatch.setattr(MarketDataPoller, "_recent_closes",
+                        lambda self, symbol: {"dates": ["2024-01-03"], "prices": [187.0]})
+    collector.refresh()
+    assert len(calls) == 2
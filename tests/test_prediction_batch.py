@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from app.models import lstm
+from app.models.lstm import predict_lstm_batch, prediction_cache
+
+
+class FakeForecaster:
+    lookback = 5
+
+    def __init__(self):
+        self.batches = []
+
+    def rollout(self, window, horizon):
+        # Prédit la dernière valeur normalisée de chaque fenêtre
+        self.batches.append(window.shape)
+        return np.repeat(window[:, -1, 0:1], horizon, axis=1)
+
+
+class FakeHandle:
+    def __init__(self, model, version):
+        self.model = model
+        self.version = version
+
+
+@pytest.fixture
+def models(monkeypatch):
+    handles = {}
+
+    class FakeRegistry:
+        def __init__(self, path):
+            self.path = path
+
+        def get(self):
+            return handles.setdefault(self.path, FakeHandle(FakeForecaster(), f"v-{self.path}"))
+
+    monkeypatch.setattr(lstm, "get_model_registry", FakeRegistry)
+    prediction_cache.invalidate()
+    return handles
+
+
+def closes(start):
+    return {"dates": [f"2024-02-{day:02d}" for day in range(1, 21)],
+            "prices": [start + i for i in range(20)]}
+
+
+def test_watchlist_predicted_in_one_model_call(models):
+    """Les symboles partageant le modèle sont prédits en un seul déroulement, chacun avec sa propre normalisation"""
+    recent = {"AAPL": closes(100.0), "MSFT": closes(400.0), "NVDA": closes(800.0)}
+    result = predict_lstm_batch(["AAPL", "MSFT", "NVDA"], horizon=3, recent_closes=recent)
+    assert models["lstm_model.h5"].model.batches == [(3, 5, 1)]
+    assert result["predictions"]["AAPL"] == pytest.approx([119.0] * 3)
+    assert result["predictions"]["NVDA"] == pytest.approx([819.0] * 3)
+    assert len(result["dates"]) == 3
+
+    # Deuxième appel : tout est servi par le cache
+    predict_lstm_batch(["AAPL", "MSFT", "NVDA"], horizon=5, recent_closes=recent)
+    assert models["lstm_model.h5"].model.batches == [(3, 5, 1)]
+
+
+def test_symbol_model_and_errors(models, tmp_path, monkeypatch):
+    """Un symbole avec son propre modèle est prédit par celui-ci ; les données insuffisantes sont signalées"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "lstm_model_TSLA.h5").write_text("")
+    recent = {"AAPL": closes(100.0), "TSLA": closes(200.0),
+              "META": {"dates": ["2024-02-01"], "prices": [500.0]}}
+    result = predict_lstm_batch(["AAPL", "TSLA", "META"], recent_closes=recent)
+    assert models["lstm_model.h5"].model.batches == [(1, 5, 1)]
+    assert models["lstm_model_TSLA.h5"].model.batches == [(1, 5, 1)]
+    assert set(result["predictions"]) == {"AAPL", "TSLA"}
+    assert "META" in result["errors"]
+
+
+def test_invalid_horizon_is_rejected(models, client):
+    """Horizon nul, hors plage ou non entier : 400 sans appel au modèle, au lieu d'une valeur remplacée"""
+    for request in ({"query_string": {"horizon": "0"}}, {"query_string": {"horizon": "31"}},
+                    {"query_string": {"horizon": "abc"}}, {"json": {"horizon": 0}}, {"json": {"horizon": 2.5}},
+                    {"json": {"horizon": "x"}}):
+        response = client.post("/prediction/batch", **request)
+        assert response.status_code == 400, request
+        assert "Horizon invalide" in response.get_json()["error"]
+    for query in ("horizon=0", "horizon=-3", "horizon=abc"):
+        assert client.get(f"/prediction/chart?{query}").status_code == 400, query
+    assert models == {}
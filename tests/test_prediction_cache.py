@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from app.models import lstm
+from app.models.lstm import get_forecast, prediction_cache
+
+
+class FakeForecaster:
+    lookback = 5
+
+    def __init__(self):
+        self.calls = 0
+
+    def rollout(self, window, horizon):
+        self.calls += 1
+        return np.repeat(window[:, -1, 0:1], horizon, axis=1)
+
+
+class FakeHandle:
+    def __init__(self, model, version):
+        self.model = model
+        self.version = version
+
+
+class FakeRegistry:
+    def __init__(self, handle):
+        self.handle = handle
+
+    def get(self):
+        return self.handle
+
+
+@pytest.fixture
+def model(monkeypatch):
+    forecaster = FakeForecaster()
+    handle = FakeHandle(forecaster, "v1")
+    monkeypatch.setattr(lstm, "get_model_registry", lambda path="lstm_model.h5": FakeRegistry(handle))
+    prediction_cache.invalidate()
+    return handle
+
+
+def closes(last_date="2024-03-01", last_price=110.0):
+    return {"dates": [f"2024-02-{day:02d}" for day in range(1, 20)] + [last_date],
+            "prices": [100.0 + i for i in range(19)] + [last_price]}
+
+
+def test_prediction_computed_once_per_bar_and_model(model):
+    """La prédiction est calculée une fois par (symbole, dernière barre, version du modèle)"""
+    first = get_forecast("AAPL", closes(), horizon=5)
+    assert get_forecast("AAPL", closes(), horizon=3) == first[:3]
+    assert model.model.calls == 1
+    assert first == pytest.approx([110.0] * 5)
+
+    get_forecast("AAPL", closes("2024-03-04", 112.0))
+    model.version = "v2"
+    get_forecast("AAPL", closes("2024-03-04", 112.0))
+    assert model.model.calls == 3
+
+
+def test_precomputed_prediction_used_only_if_key_matches(model):
+    """La prédiction précalculée par le collecteur n'est servie que si elle correspond aux données et au modèle"""
+    precomputed = {"key": ["AAPL", "2024-03-01", 110.0, "v1"], "predictions": [1.0, 2.0, 3.0]}
+    assert get_forecast("AAPL", closes(), horizon=2, precomputed=precomputed) == [1.0, 2.0]
+    assert model.model.calls == 0
+
+    model.version = "v2"
+    assert get_forecast("AAPL", closes(), horizon=2, precomputed=precomputed) == pytest.approx([110.0, 110.0])
+    assert model.model.calls == 1
+
+
+def test_prediction_chart_is_revalidated_over_get(model, client, monkeypatch):
+    """La page récupère le graphique en GET : une copie à jour est revalidée par une 304 sans recalcul"""
+    monkeypatch.setattr("app.routes.get_recent_closes", lambda symbol: closes())
+    first = client.get("/prediction/chart")
+
+    assert first.status_code == 200
+    assert first.get_json()["predictions"] == pytest.approx([110.0] * 5)
+    again = client.get("/prediction/chart", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert model.model.calls == 1
+
+    # Nouvelle barre : nouvelle version du graphique
+    monkeypatch.setattr("app.routes.get_recent_closes", lambda symbol: closes("2024-03-04", 112.0))
+    assert client.get("/prediction/chart", headers={"If-None-Match": first.headers["ETag"]}).status_code == 200
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.price_store import PriceStore
+
+
+def make_bars(start, end):
+    index = pd.bdate_range(start, end, inclusive="left", tz="America/New_York")
+    close = np.arange(len(index), dtype=float) + 100
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": 1000.0, "Stock Splits": 0.0}, index=index)
+
+
+class FakeFetcher:
+    def __init__(self, today="2024-03-01"):
+        self.today = today
+        self.calls = []
+
+    def __call__(self, stock_symbol, start, end=None):
+        self.calls.append((stock_symbol, start, end))
+        return make_bars(start, end or self.today)
+
+
+@pytest.fixture
+def fetcher():
+    return FakeFetcher()
+
+
+def test_repeat_queries_are_served_locally(tmp_path, fetcher):
+    """Une deuxième lecture de la même plage ne retélécharge rien"""
+    store = PriceStore(str(tmp_path / "prices.sqlite3"), fetcher=fetcher, refresh_interval=3600)
+    first = store.history("AAPL", start="2024-01-01", end="2024-02-01")
+    second = store.history("AAPL", start="2024-01-10", end="2024-01-20")
+    assert len(fetcher.calls) == 1
+    assert len(first) == 23
+    assert second.index[0] == pd.Timestamp("2024-01-10")
+    assert second.index[-1] == pd.Timestamp("2024-01-19")
+
+
+def test_only_missing_tail_is_fetched(tmp_path, fetcher):
+    """Seule la fin manquante depuis la dernière barre stockée est téléchargée"""
+    store = PriceStore(str(tmp_path / "prices.sqlite3"), fetcher=fetcher, refresh_interval=0)
+    store.history("AAPL", start="2024-01-01")
+    fetcher.today = "2024-03-08"
+    data = store.history("AAPL", start="2024-01-01")
+    assert fetcher.calls[-1] == ("AAPL", "2024-02-29", None)
+    assert data.index[-1] == pd.Timestamp("2024-03-07")
+
+
+def test_missing_head_is_fetched(tmp_path, fetcher):
+    """Une plage plus ancienne que l'historique stocké déclenche le téléchargement du début manquant"""
+    store = PriceStore(str(tmp_path / "prices.sqlite3"), fetcher=fetcher, refresh_interval=3600)
+    store.history("AAPL", start="2024-02-01")
+    data = store.history("AAPL", start="2024-01-01")
+    assert fetcher.calls[-1] == ("AAPL", "2024-01-01", "2024-02-01")
+    assert data.index[0] == pd.Timestamp("2024-01-01")
+
+
+def test_local_data_served_when_upstream_fails(tmp_path, fetcher):
+    """Si Yahoo est indisponible, les données déjà stockées sont servies"""
+    store = PriceStore(str(tmp_path / "prices.sqlite3"), fetcher=fetcher, refresh_interval=0)
+    store.history("AAPL", start="2024-01-01")
+
+    def failing(*args):
+        raise ConnectionError("Yahoo indisponible")
+
+    store.fetcher = failing
+    assert not store.history("AAPL", start="2024-01-01").empty
+    with pytest.raises(ConnectionError):
+        store.history("MSFT", start="2024-01-01")
@@ -0,0 +1,36 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils import quotes
+
+
+def test_batched_quotes_from_download(monkeypatch):
+    """Un seul appel groupé fournit le dernier cours de chaque symbole"""
+    index = pd.bdate_range("2024-01-01", periods=3)
+    columns = pd.MultiIndex.from_product([["Close", "Open"], ["AAPL", "MSFT"]])
+    data = pd.DataFrame(np.arange(12, dtype=float).reshape(3, 4), index=index, columns=columns)
+    data.loc[index[-1], ("Close", "MSFT")] = np.nan
+    calls = []
+    monkeypatch.setattr("yfinance.download", lambda symbols, **kwargs: calls.append(symbols) or data)
+    assert quotes.get_quotes(["AAPL", "MSFT"]) == {"AAPL": 8.0, "MSFT": 5.0}
+    assert calls == [["AAPL", "MSFT"]]
+
+
+def test_watchlist_quotes_are_partial_on_slow_symbol(monkeypatch):
+    """Un symbole lent ou en erreur n'empêche pas de renvoyer les autres cours"""
+    monkeypatch.setattr(quotes, "get_quotes", lambda symbols: {"AAPL": 190.0})
+
+    def get_last_price(symbol):
+        if symbol == "TSLA":
+            time.sleep(1)
+        if symbol == "META":
+            raise ValueError("symbole inconnu")
+        return 100.0
+
+    monkeypatch.setattr(quotes, "get_last_price", get_last_price)
+    start = time.perf_counter()
+    result = quotes.get_watchlist_quotes(["AAPL", "MSFT", "TSLA", "META"], timeout=0.2)
+    assert time.perf_counter() - start < 0.8
+    assert result == {"AAPL": 190.0, "MSFT": 100.0}
@@ -0,0 +1,67 @@
+import multiprocessing
+
+from flask import Flask
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from app.utils.ratelimit import SQLiteStorage
+
+
+def hit_many(uri, count):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    limit = parse("1000 per minute")
+    for _ in range(count):
+        limiter.hit(limit, "client")
+
+
+def test_counter_resets_when_window_expires(tmp_path, monkeypatch):
+    """Le compteur s'incrémente dans la fenêtre et repart de zéro après son expiration"""
+    storage = storage_from_string(f"sqlite:///{tmp_path}/limits.sqlite3")
+    assert isinstance(storage, SQLiteStorage)
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.ratelimit.time.time", lambda: now[0])
+
+    assert storage.incr("k", 60) == 1
+    assert storage.incr("k", 60, amount=2) == 3
+    assert storage.get("k") == 3
+    assert storage.get_expiry("k") == 1060.0
+
+    now[0] = 1061.0
+    assert storage.get("k") == 0
+    assert storage.incr("k", 60) == 1
+    assert storage.get_expiry("k") == 1121.0
+
+
+def test_limits_are_shared_across_processes(tmp_path):
+    """Des processus distincts (workers gunicorn) partagent les mêmes compteurs"""
+    uri = f"sqlite:///{tmp_path}/limits.sqlite3"
+    processes = [multiprocessing.Process(target=hit_many, args=(uri, 50)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    storage = storage_from_string(uri)
+    assert storage.get(parse("1000 per minute").key_for("client")) == 150
+
+
+def test_flask_limiter_uses_sqlite_storage(tmp_path):
+    """Deux applications (deux workers) sur le même fichier appliquent une seule limite"""
+    def make_app():
+        app = Flask(__name__)
+        app.config["RATELIMIT_STORAGE_URI"] = f"sqlite:///{tmp_path}/limits.sqlite3"
+        limiter = Limiter(get_remote_address, app=app)
+
+        @app.post("/set-alert/")
+        @limiter.limit("3 per minute")
+        def set_alert():
+            return "ok"
+        return app
+
+    first, second = make_app().test_client(), make_app().test_client()
+    statuses = [client.post("/set-alert/").status_code for client in (first, second, first, second)]
+
+    assert statuses == [200, 200, 200, 429]
@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+from app.utils.singleflight import FLIGHTS, SingleFlight, coalesce, flight_stats
+
+
+def run_together(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_concurrent_calls_share_one_execution():
+    """Les appels simultanés sur une même clé partagent une seule exécution"""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls, results = [], []
+
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return 42
+
+    threads = run_together(8, lambda: results.append(flight.do("AAPL", slow)))
+    while flight.executions + flight.coalesced < 8:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [42] * 8
+    assert flight.coalesced == 7
+
+
+def test_error_is_propagated_to_waiters_and_not_cached():
+    """L'exception est transmise aux appelants en attente, et l'appel suivant recalcule"""
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(1)
+        raise RuntimeError("Yahoo indisponible")
+
+    def call():
+        try:
+            flight.do("AAPL", failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = run_together(3, call)
+    while flight.executions + flight.coalesced < 3:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert flight.do("AAPL", lambda: "ok") == "ok"
+    assert flight.stats()["errors"] == 1
+
+
+def test_waiter_times_out_while_leader_finishes():
+    """Un appelant regroupé abandonne après son délai ; l'appel en cours aboutit pour son initiateur"""
+    flight = SingleFlight(timeout=0.01)
+    release = threading.Event()
+    results = []
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("AAPL", lambda: release.wait(1) and 42)))
+    leader.start()
+    while flight.executions < 1:
+        pass
+    with pytest.raises(TimeoutError):
+        flight.do("AAPL", lambda: 0)
+    release.set()
+    leader.join()
+
+    assert results == [42]
+    assert flight.stats()["timeouts"] == 1
+
+
+def test_coalesce_decorator_keys_on_arguments():
+    """Le décorateur regroupe par arguments et publie ses compteurs sous son nom"""
+    release = threading.Event()
+    calls = []
+
+    @coalesce("test.fetch")
+    def fetch(symbol, period="5d"):
+        calls.append((symbol, period))
+        release.wait(1)
+        return f"{symbol}-{period}"
+
+    results = []
+    threads = run_together(4, lambda: results.append(fetch("AAPL", period="1mo")))
+    other = threading.Thread(target=lambda: results.append(fetch("MSFT")))
+    other.start()
+    while fetch.flight.executions + fetch.flight.coalesced < 5:
+        pass
+    release.set()
+    for thread in threads + [other]:
+        thread.join()
+
+    try:
+        assert sorted(calls) == [("AAPL", "1mo"), ("MSFT", "5d")]
+        assert sorted(results) == ["AAPL-1mo"] * 4 + ["MSFT-5d"]
+        assert flight_stats()["test.fetch"]["coalesced"] == 3
+    finally:
+        del FLIGHTS["test.fetch"]
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from benchmarks.import_time import measure_startup
+
+# Budget de démarrage d'un worker (import de l'application et create_app), en secondes
+STARTUP_BUDGET = float(os.getenv("STARTUP_BUDGET", "4"))
+
+
+@pytest.fixture(scope="module")
+def report():
+    env = {**os.environ, "SMTP_SERVER": "localhost", "SMTP_PORT": "25", "SMTP_EMAIL": "test@example.com",
+           "SMTP_PASSWORD": "test", "FIREBASE_API_KEY": "test", "POLLER_ENABLED": "0"}
+    return measure_startup(env=env)
+
+
+def test_heavy_subsystems_are_lazy(report):
+    """TensorFlow, scikit-learn, yfinance et Firebase ne sont pas importés au démarrage"""
+    assert report["heavy_modules"] == []
+
+
+def test_startup_within_budget(report):
+    """Le démarrage de l'application tient dans le budget"""
+    assert report["wall_seconds"] < STARTUP_BUDGET, report["packages"]
+
+
+class FakeService:
+    def __init__(self):
+        self.starts = 0
+
+    def start(self):
+        self.starts += 1
+
+
+def test_background_services_started_once_per_process():
+    """Repli à la première requête seulement ; rien à faire si post_worker_init les a démarrés"""
+    from app import create_app, start_background_services
+
+    app = create_app()
+    service = app.extensions["alert_watcher"] = FakeService()
+    client = app.test_client()
+    for _ in range(3):
+        client.get("/metrics")
+    assert service.starts == 1
+
+    app = create_app()
+    service = app.extensions["alert_watcher"] = FakeService()
+    start_background_services(app)
+    app.test_client().get("/metrics")
+    assert service.starts == 1
@@ -0,0 +1,37 @@
+def test_stock_data_returns_one_list_per_year(client, price_store):
+    """Une lecture unique de la plage, découpée en une liste de mois par année"""
+    response = client.get("/stock-data?symbol=aapl&years=2022,2023")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["stock_symbol"] == "AAPL"
+    assert data["today_price"] == price_store.bars["Close"].iloc[-1]
+    assert len(data["2022_prices"]) == 12 and len(data["2023_prices"]) == 12
+    assert data["2023_prices"][0] == {"année": "2023", "date": "2023-01-01", "mois": "January",
+                                      "prix": price_store.bars.loc["2023-01", "Close"].iloc[-1]}
+    assert price_store.calls == [("AAPL", "2022-01-01", None)]
+
+
+def test_stock_data_weekly_ohlc(client, price_store):
+    """Les autres fréquences et réductions passent par le même chemin"""
+    data = client.get("/stock-data?years=2023&freq=W&how=ohlc").get_json()
+
+    assert len(data["2023_prices"]) == 52
+    assert {"open", "high", "low", "close"} <= set(data["2023_prices"][0])
+
+
+def test_stock_data_year_without_bars(client, price_store):
+    """Une année sans barre donne une liste vide, sans faire échouer les autres"""
+    data = client.get("/stock-data?years=2019,2024").get_json()
+
+    assert data["2019_prices"] == []
+    assert len(data["2024_prices"]) == 6
+    assert price_store.calls == [("AAPL", "2019-01-01", None)]
+
+
+def test_stock_data_rejects_invalid_parameters(client, price_store):
+    """Années ou agrégation invalides : 400 sans lecture des prix"""
+    for query in ("years=abc", "years=1900", "years=" + ",".join(str(y) for y in range(2000, 2015)),
+                  "freq=D", "how=median"):
+        assert client.get(f"/stock-data?{query}").status_code == 400, query
+    assert price_store.calls == []
@@ -0,0 +1,134 @@
+import json
+import threading
+
+import pytest
+
+from app.utils.stream import PriceBroadcaster, StreamFullError, price_event
+
+
+def make_snapshot(generated_at, price):
+    return {
+        "generated_at": generated_at,
+        "symbols": {
+            "AAPL": {"price": price, "recent_closes": {"dates": ["2024-01-02"], "prices": [price - 1]},
+                     "prediction": {"key": ["AAPL"], "predictions": [price + i for i in range(30)]}},
+            "MSFT": {"price": 400.0, "recent_closes": None, "prediction": None},
+        },
+        "news": {},
+    }
+
+
+def parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return fields["id"], json.loads(fields["data"])
+
+
+class Source:
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot
+
+    def __call__(self):
+        return self.snapshot
+
+
+def test_price_event_contains_prices_and_prediction_chart():
+    """L'événement porte le prix de chaque symbole et le graphique des symboles précalculés"""
+    event = price_event(make_snapshot(1.0, 190.0))
+
+    assert event["symbols"]["MSFT"] == {"price": 400.0}
+    prediction = event["symbols"]["AAPL"]["prediction"]
+    assert prediction["predictions"] == [190.0, 191.0, 192.0, 193.0, 194.0]
+    assert prediction["actualPrices"] == [189.0]
+    assert len(prediction["dates"]) == 11
+
+
+def test_poll_publishes_only_new_snapshots():
+    """Un instantané déjà diffusé n'est pas réencodé"""
+    source = Source()
+    broadcaster = PriceBroadcaster(source=source)
+
+    assert not broadcaster.poll()
+    source.snapshot = make_snapshot(1.0, 190.0)
+    assert broadcaster.poll()
+    assert not broadcaster.poll()
+    assert broadcaster.events == 1
+
+
+def test_subscriber_receives_current_then_new_events():
+    """Un client reçoit l'événement courant, puis les suivants dès leur publication"""
+    source = Source(make_snapshot(1.0, 190.0))
+    broadcaster = PriceBroadcaster(source=source, poll_interval=3600, heartbeat=5)
+    broadcaster.poll()
+    stream = broadcaster.subscribe()
+
+    assert next(stream).startswith(b"retry:")
+    assert parse(next(stream))[0] == "1.0"
+
+    source.snapshot = make_snapshot(2.0, 191.0)
+    threading.Timer(0.05, broadcaster.poll).start()
+    event_id, data = parse(next(stream))
+    assert event_id == "2.0"
+    assert data["symbols"]["AAPL"]["price"] == 191.0
+    assert broadcaster.stats()["subscribers"] == 1
+
+    stream.close()
+    broadcaster.stop()
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+def test_reconnection_skips_event_already_received():
+    """Après reconnexion (Last-Event-ID), l'événement déjà reçu n'est pas renvoyé ; seul le maintien de connexion suit"""
+    broadcaster = PriceBroadcaster(source=Source(make_snapshot(1.0, 190.0)), poll_interval=3600, heartbeat=0.01)
+    broadcaster.poll()
+    stream = broadcaster.subscribe(last_event_id="1.0")
+
+    next(stream)
+    assert next(stream) == b": keepalive\n\n"
+    stream.close()
+    broadcaster.stop()
+
+
+def test_subscribers_are_capped_per_worker():
+    """Au-delà du nombre maximal de flux, l'abonnement est refusé ; une place libérée est réutilisable"""
+    broadcaster = PriceBroadcaster(source=Source(), poll_interval=3600, max_subscribers=2)
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+    with pytest.raises(StreamFullError):
+        broadcaster.subscribe()
+    # Une réponse fermée sans avoir été lue libère aussi sa place
+    first.close()
+    first.close()
+    third = broadcaster.subscribe()
+    assert broadcaster.stats() == {"subscribers": 2, "events": 0, "rejected": 1}
+
+    second.close()
+    third.close()
+    broadcaster.stop()
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+def test_stream_is_not_offered_without_the_poller(app, client):
+    """Collecteur désactivé (configuration par défaut) : pas de flux sur les pages, et la route répond 503"""
+    assert not app.config["STREAM_ENABLED"]
+    assert client.get("/stream/prices").status_code == 503
+    assert b"EventSource" not in client.get("/prediction").data
+
+
+def test_stream_answers_503_when_full(app, client, monkeypatch):
+    """Nombre maximal de flux atteint : 503 immédiate au lieu d'occuper un thread"""
+    from app.utils import stream
+
+    broadcaster = PriceBroadcaster(source=Source(), poll_interval=3600, max_subscribers=1)
+    monkeypatch.setattr(stream, "_broadcaster", broadcaster)
+    monkeypatch.setitem(app.config, "STREAM_ENABLED", True)
+
+    opened = client.get("/stream/prices", buffered=False)
+    assert opened.status_code == 200
+    assert b"EventSource" in client.get("/prediction").data
+    refused = client.get("/stream/prices")
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "60"
+
+    opened.close()
+    broadcaster.stop()
+    assert broadcaster.stats()["subscribers"] == 0
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.train import build_training_set
+
+
+def test_build_training_set_windows():
+    """Les fenêtres d'entraînement associent les 5 jours précédents au prix du jour"""
+    prices = [float(p) for p in range(10, 30)]
+    X_train, y_train, scaler = build_training_set(prices)
+    assert X_train.shape == (15, 5, 1)
+    assert y_train.shape == (15,)
+    data = scaler.transform(np.array(prices).reshape(-1, 1))[:, 0]
+    np.testing.assert_allclose(X_train[0, :, 0], data[0:5])
+    np.testing.assert_allclose(y_train[0], data[5])
+    np.testing.assert_allclose(X_train[-1, :, 0], data[-6:-1])
+
+
+def test_train_lstm_writes_versioned_artifact(tmp_path, monkeypatch):
+    """L'entraînement produit un artefact versionné et ses métadonnées, puis le publie"""
+    pytest.importorskip("tensorflow")
+    import json
+    from app.models import train
+    from app.models.registry import ModelRegistry
+    from app.models.keras_lstm import load_keras_forecaster
+
+    index = pd.bdate_range("2024-01-01", periods=40)
+    history = pd.DataFrame({"Close": np.linspace(100, 140, len(index))}, index=index)
+
+    class FakeTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, period):
+            return history
+
+    monkeypatch.setattr("yfinance.Ticker", FakeTicker)
+    model_path = str(tmp_path / "lstm_model.h5")
+    metadata = train.train_lstm(epochs=1, artifacts_dir=str(tmp_path / "models"), model_path=model_path)
+
+    assert metadata["training_start"] == "2024-01-01"
+    assert metadata["samples"] == 35
+    with open(tmp_path / "models" / f"{metadata['version']}.json") as f:
+        assert json.load(f)["loss"] == metadata["loss"]
+    registry = ModelRegistry(model_path, loader=load_keras_forecaster, warmer=None)
+    assert registry.get().version == metadata["version"]